@@ -4,6 +4,11 @@
 
 import mpmath
 
+try:
+    import numpy
+except ImportError:
+    collect_ignore = ['mpmath/libfpnp.py']
+
 
 def pytest_report_header(config):
     print("mpmath backend: %s" % mpmath.libmp.backend.BACKEND)
@@ -34,3 +39,5 @@ def reset_mp_globals():
     mpmath.mp.shortest_str = False
     mpmath.iv.prec = mpmath.mp.prec
     mpmath.iv.pretty = False
+    mpmath.ball.prec = mpmath.mp.prec
+    mpmath.ball.pretty = False
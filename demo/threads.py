@@ -0,0 +1,57 @@
+"""
+Stress test for the memoization tables shared between threads.
+
+Many threads evaluate functions that use the libmp caches (Bernoulli
+numbers, Taylor coefficients of gamma, logarithms, ...) at varying
+precisions, each with its own context.  The results are compared with
+those computed by a single thread, and the timings for both are shown.
+
+Run with:
+
+    python threads.py [threads] [rounds] [budget]
+
+where budget (in bytes) limits the memory used by the caches, which
+makes the threads evict each other's entries.
+
+"""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+import mpmath
+
+
+def work(index, rounds):
+    ctx = mpmath.MPContext()
+    res = []
+    for r in range(rounds):
+        ctx.dps = 15 + 7*((index + r) % 20)
+        x = ctx.mpf(index + r + 1)/7
+        res.append((ctx.gamma(x), ctx.loggamma(x + 10), ctx.zeta(x + 2),
+                    ctx.bernoulli(2*(r % 40)), ctx.exp(x), ctx.log(x),
+                    ctx.cos(x), ctx.atan(x), +ctx.pi, +ctx.euler))
+    return res
+
+
+def main(nthreads=16, rounds=20, budget=None):
+    mpmath.cache_clear()
+    mpmath.set_cache_budget(budget)
+    t0 = perf_counter()
+    expected = [work(i, rounds) for i in range(nthreads)]
+    t1 = perf_counter()
+    print("1 thread:   %.3f s" % (t1 - t0))
+    mpmath.cache_clear()
+    t0 = perf_counter()
+    with ThreadPoolExecutor(max_workers=nthreads) as tpe:
+        results = list(tpe.map(work, range(nthreads), [rounds]*nthreads))
+    t1 = perf_counter()
+    print("%i threads: %.3f s" % (nthreads, t1 - t0))
+    assert results == expected, "results differ"
+    for name, info in sorted(mpmath.cache_info().items()):
+        print("%-20s %s" % (name, info))
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:]]
+    main(*args)
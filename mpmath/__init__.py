@@ -9,10 +9,12 @@
 from .ctx_fp import FPContext
 from .ctx_mp import MPContext
 from .ctx_iv import MPIntervalContext
+from .ctx_ball import MPBallContext
 
 fp = FPContext()
 mp = MPContext()
 iv = MPIntervalContext()
+ball = MPBallContext()
 
 fp._mp = mp
 mp._mp = mp
@@ -22,6 +24,9 @@
 mp._iv = iv
 fp._iv = iv
 iv._iv = iv
+ball._mp = mp
+ball._fp = fp
+ball._iv = iv
 
 make_mpf = mp.make_mpf
 make_mpc = mp.make_mpc
@@ -33,6 +38,14 @@
 autoprec = mp.autoprec
 maxcalls = mp.maxcalls
 memoize = mp.memoize
+profile = mp.profile
+cache_info = mp.cache_info
+cache_clear = mp.cache_clear
+set_cache_budget = mp.set_cache_budget
+set_cache_dir = mp.set_cache_dir
+set_constant_workers = mp.set_constant_workers
+vectorize = mp.vectorize
+parallel_map = mp.parallel_map
 
 mag = mp.mag
 
@@ -65,10 +78,6 @@
 
 nint_distance = mp.nint_distance
 
-plot = mp.plot
-cplot = mp.cplot
-splot = mp.splot
-
 odefun = mp.odefun
 
 jacobian = mp.jacobian
@@ -94,18 +103,27 @@
 
 mpmathify = convert = mp.convert
 mpc = mp.mpc
+vector = mp.vector
 
 mpi = iv._mpi
+mpb = ball.mpf
 
 nstr = mp.nstr
 nprint = mp.nprint
 chop = mp.chop
 
+dumps = mp.dumps
+loads = mp.loads
+dump = mp.dump
+load = mp.load
+iterload = mp.iterload
+
 fneg = mp.fneg
 fadd = mp.fadd
 fsub = mp.fsub
 fmul = mp.fmul
 fdiv = mp.fdiv
+fma = mp.fma
 fprod = mp.fprod
 
 quad = mp.quad
@@ -119,10 +137,6 @@
 invlapstehfest = mp.invlapstehfest
 invlapdehoog = mp.invlapdehoog
 
-pslq = mp.pslq
-identify = mp.identify
-findpoly = mp.findpoly
-
 richardson = mp.richardson
 shanks = mp.shanks
 levin = mp.levin
@@ -194,9 +208,11 @@
 mpf = mp.mpf
 j = mp.j
 exp = mp.exp
+exp_many = mp.exp_many
 expj = mp.expj
 expjpi = mp.expjpi
 ln = mp.ln
+log_many = mp.log_many
 im = mp.im
 re = mp.re
 inf = mp.inf
@@ -263,6 +279,7 @@
 sinc = mp.sinc
 sincpi = mp.sincpi
 cos_sin = mp.cos_sin
+cos_sin_many = mp.cos_sin_many
 cospi_sinpi = mp.cospi_sinpi
 fabs = mp.fabs
 re = mp.re
@@ -455,6 +472,16 @@
 fft = mp.fft
 invfft = mp.invfft
 
+# Constant recognition and plotting are imported on first use
+_lazy_names = ['pslq', 'identify', 'findpoly', 'plot', 'cplot', 'splot']
+
+def __getattr__(name):
+    if name in _lazy_names:
+        value = getattr(mp, name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module 'mpmath' has no attribute %r" % name)
+
 
 # Hack to guard against setting module properties instead of 'mp', Issue #657
 class _MPMathModule(types.ModuleType):
@@ -471,3 +498,6 @@ def _helper(self, *args, prop=''):
 
 sys.modules[__name__].__class__ = _MPMathModule
 del functools, sys, types, _MPMathModule
+
+__all__ = [name for name in globals()
+           if not name.startswith('_')] + _lazy_names
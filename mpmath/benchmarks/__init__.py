@@ -0,0 +1,163 @@
+"""
+Benchmarks for the core arithmetic and some of the numerical algorithms.
+
+The suite (see mpmath.benchmarks.suite) times the low-level functions
+of libmp (arithmetic on real and complex numbers, elementary
+functions), the summation of hypergeometric series, numerical
+integration and summation, and linear algebra at a range of
+precisions.  Results are saved as JSON, so that the timings of two
+commits, or of the python and gmpy backends, can be compared.  Run
+
+    python -m mpmath.benchmarks --help
+
+for the command line interface.  The format of the result files is
+
+    {"format": 1,
+     "mpmath": version, "python": version, "platform": platform,
+     "commit": git commit or null, "date": ISO date,
+     "results": {backend: {benchmark: {prec: seconds per call}}}}
+
+where the precisions are strings, as required by JSON.
+"""
+
+import datetime
+import os
+import platform
+import subprocess
+import timeit
+
+from .. import __version__
+from ..libmp import BACKEND
+
+
+FORMAT = 1
+
+# Default precisions in bits
+PRECISIONS = [53, 113, 333, 1000, 3333, 10000, 33333, 100000]
+
+# Registered benchmarks, as name -> (setup, maxprec)
+benchmarks = {}
+
+
+def benchmark(name, maxprec=None, precs=()):
+    """
+    Decorator registering a benchmark under the given name.  The
+    decorated function takes the precision in bits and returns the
+    function of no arguments to be timed.  It is not run at
+    precisions above maxprec.  By default, it is also run at the
+    additional precisions precs.
+    """
+    def register(setup):
+        benchmarks[name] = setup, maxprec, tuple(precs)
+        return setup
+    return register
+
+
+def measure(func, min_time=0.2, repeat=3):
+    """
+    Return the time in seconds for one call of func: the best of repeat
+    measurements of as many calls as needed to take at least min_time
+    seconds.  A function for which a single call takes longer is only
+    timed once.  It is called once beforehand, so that caches of
+    precomputed values are filled.
+    """
+    func()
+    timer = timeit.Timer(func)
+    number = 1
+    while 1:
+        t = timer.timeit(number)
+        if t >= min_time:
+            break
+        number *= 2 if t > min_time/10 else 10
+    best = t/number
+    if number > 1:
+        for _ in range(repeat - 1):
+            best = min(best, timer.timeit(number)/number)
+    return best
+
+
+def select(pattern=None, precs=None):
+    """
+    Return the list of (name, prec) pairs to run: all the registered
+    benchmarks whose name contains pattern, at the given precisions
+    (PRECISIONS and their additional precisions by default) up to their
+    maximum precision.
+    """
+    from . import suite
+    return [(name, prec)
+            for name, (setup, maxprec, extra) in benchmarks.items()
+            if pattern is None or pattern in name
+            for prec in (precs or PRECISIONS + list(extra))
+            if maxprec is None or prec <= maxprec]
+
+
+def run(pattern=None, precs=None, min_time=0.2, repeat=3, log=None):
+    """
+    Run the selected benchmarks (see select()) with the current backend
+    and return a dict mapping each benchmark name to a dict mapping
+    precisions, as strings, to times.  With log given, it is called
+    with (name, prec, seconds) after every measurement.
+    """
+    results = {}
+    for name, prec in select(pattern, precs):
+        setup = benchmarks[name][0]
+        t = measure(setup(prec), min_time, repeat)
+        results.setdefault(name, {})[str(prec)] = t
+        if log is not None:
+            log(name, prec, t)
+    return results
+
+
+def child_env():
+    """Return the environment for a child process that should import
+    this copy of mpmath."""
+    env = os.environ.copy()
+    path = os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__))))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [path,
+                                                      env.get('PYTHONPATH')]))
+    return env
+
+
+def git_commit():
+    """Return the git commit of the source tree of mpmath, or None."""
+    path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        out = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=path,
+                             capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if out.returncode:
+        return None
+    return out.stdout.strip()
+
+
+def report(results):
+    """Return a dict with the results of run() for the current backend
+    and a description of the environment, to be saved as JSON."""
+    return {'format': FORMAT,
+            'mpmath': __version__,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'commit': git_commit(),
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'results': {BACKEND: results}}
+
+
+def compare(old, new, threshold=1.1):
+    """
+    Compare two reports (as returned by report(), possibly with several
+    backends).  Return a list of tuples (backend, name, prec, old time,
+    new time, ratio) for every measurement present in both, and the
+    list of those whose ratio new/old exceeds threshold.
+    """
+    rows = []
+    for backend, results in sorted(new['results'].items()):
+        old_results = old['results'].get(backend, {})
+        for name, times in sorted(results.items()):
+            old_times = old_results.get(name, {})
+            for prec, t in sorted(times.items(), key=lambda x: int(x[0])):
+                if prec in old_times:
+                    t0 = old_times[prec]
+                    rows.append((backend, name, int(prec), t0, t, t/t0))
+    return rows, [row for row in rows if row[5] > threshold]
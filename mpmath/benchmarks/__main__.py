@@ -0,0 +1,135 @@
+"""
+Run the benchmarks of mpmath and compare the timings.
+
+Examples:
+
+    python -m mpmath.benchmarks -o old.json
+    python -m mpmath.benchmarks -b all -p 53,1000 -k libmpf -o new.json
+    python -m mpmath.benchmarks -c old.json new.json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+from ..libmp import BACKEND
+from . import child_env, compare, report, run
+
+
+parser = argparse.ArgumentParser(description=__doc__,
+                                 prog='python -m mpmath.benchmarks',
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument('-o', '--output', metavar='FILE',
+                    help="save the results as JSON to FILE ('-' for stdout)")
+parser.add_argument('-k', metavar='PATTERN',
+                    help='only run the benchmarks whose name contains PATTERN')
+parser.add_argument('-p', '--prec', metavar='PRECS',
+                    help='comma-separated list of precisions in bits')
+parser.add_argument('-b', '--backend', default='current',
+                    choices=['current', 'python', 'gmpy', 'gmp', 'all'],
+                    help='backends to run the benchmarks with (default: the '
+                         'one in use)')
+parser.add_argument('--min-time', type=float, default=0.2,
+                    help='minimal duration of a measurement in seconds')
+parser.add_argument('--repeat', type=int, default=3,
+                    help='number of measurements of fast functions')
+parser.add_argument('-c', '--compare', nargs='+', metavar='FILE',
+                    help='compare the results in FILE with those of a new '
+                         'run, or with those in a second FILE')
+parser.add_argument('--threshold', type=float, default=1.1,
+                    help='ratio of times above which a benchmark is reported '
+                         'as slower (default: 1.1)')
+
+
+def log(name, prec, t):
+    print("%-28s %7i %12.3e" % (name, prec, t), file=sys.stderr)
+
+
+def run_backend(backend, args):
+    """Run the benchmarks in a new process using the given backend.
+    Return the report, or None if the backend is not available."""
+    env = child_env()
+    if backend == 'python':
+        env['MPMATH_NOGMPY'] = '1'
+    else:
+        env.pop('MPMATH_NOGMPY', None)
+    out = subprocess.run([sys.executable, '-c',
+                          'from mpmath.libmp import BACKEND; print(BACKEND)'],
+                         env=env, stdout=subprocess.PIPE, text=True)
+    if out.stdout.strip() != backend:
+        return None
+    cmd = [sys.executable, '-m', 'mpmath.benchmarks', '-o', '-',
+           '--min-time', str(args.min_time), '--repeat', str(args.repeat)]
+    if args.k:
+        cmd += ['-k', args.k]
+    if args.prec:
+        cmd += ['-p', args.prec]
+    out = subprocess.run(cmd, env=env, stdout=subprocess.PIPE, text=True,
+                         check=True)
+    return json.loads(out.stdout)
+
+
+def main(args):
+    precs = None
+    if args.prec:
+        precs = [int(p) for p in args.prec.split(',')]
+    if args.compare and len(args.compare) > 2:
+        parser.error('at most two files can be compared')
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+    else:
+        if args.backend == 'current':
+            backends = [BACKEND]
+        elif args.backend == 'all':
+            backends = ['python', 'gmpy', 'gmp']
+        else:
+            backends = [args.backend]
+        new = None
+        for backend in backends:
+            if backend == BACKEND:
+                res = report(run(args.k, precs, args.min_time, args.repeat,
+                                 log))
+            else:
+                res = run_backend(backend, args)
+                if res is None:
+                    print("backend %s is not available" % backend,
+                          file=sys.stderr)
+                    continue
+            if new is None:
+                new = res
+            else:
+                new['results'].update(res['results'])
+        if new is None:
+            return 1
+        if args.output == '-':
+            json.dump(new, sys.stdout, indent=1, sort_keys=True)
+        elif args.output:
+            with open(args.output, 'w') as f:
+                json.dump(new, f, indent=1, sort_keys=True)
+    if args.compare:
+        with open(args.compare[0]) as f:
+            old = json.load(f)
+        rows, slower = compare(old, new, args.threshold)
+        print("old: %s (%s)" % (old.get('commit'), old.get('date')))
+        print("new: %s (%s)" % (new.get('commit'), new.get('date')))
+        print()
+        print("%-8s %-28s %7s %12s %12s %7s" % ("backend", "benchmark",
+                                               "prec", "old", "new", "ratio"))
+        for backend, name, prec, t0, t, ratio in rows:
+            if ratio > args.threshold:
+                mark = '  slower'
+            elif ratio < 1/args.threshold:
+                mark = '  faster'
+            else:
+                mark = ''
+            print("%-8s %-28s %7i %12.3e %12.3e %7.2f%s" % (backend, name,
+                                                          prec, t0, t, ratio,
+                                                          mark))
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no branch
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,221 @@
+"""
+Benchmark definitions.
+
+Each benchmark is registered with the benchmark() decorator under a
+name of the form <module>.<function>.  Its setup function receives the
+precision in bits, prepares the operands, and returns the function to
+be timed.  Operands have full-precision mantissas, so that the cost of
+the arithmetic is representative.
+"""
+
+import subprocess
+import sys
+
+from ..ctx_ball import MPBallContext
+from ..ctx_iv import MPIntervalContext
+from ..ctx_mp import MPContext
+from ..libmp.backend import MPQ
+from ..libmp.libelefun import mpf_atan, mpf_cos_sin, mpf_exp, mpf_log, pi_fixed
+from ..libmp.libmpc import mpc_div, mpc_exp, mpc_mul, mpc_sqrt
+from ..libmp.libmpf import (from_int, mpf_add, mpf_div, mpf_mul, mpf_sqrt,
+                            prec_to_dps, round_nearest, to_str)
+from . import benchmark, child_env
+
+
+rnd = round_nearest
+
+
+def _real(prec, k=0):
+    """A number with a full mantissa of prec bits."""
+    return mpf_div(mpf_sqrt(from_int(2+k), prec), from_int(3), prec)
+
+
+def _complex(prec):
+    return _real(prec), _real(prec, 1)
+
+
+def _context(prec):
+    ctx = MPContext()
+    ctx.prec = prec
+    return ctx
+
+
+# Benchmarks that do not depend on the precision are run only at 53 bits
+
+@benchmark('import.mpmath', maxprec=53)
+def bench_import(prec):
+    # Time of a new process that imports mpmath
+    env = child_env()
+    cmd = [sys.executable, '-c', 'import mpmath']
+    return lambda: subprocess.run(cmd, env=env, check=True)
+
+
+# Real and complex arithmetic
+
+@benchmark('libmpf.mpf_add')
+def bench_mpf_add(prec):
+    x, y = _real(prec), _real(prec, 1)
+    return lambda: mpf_add(x, y, prec, rnd)
+
+
+@benchmark('libmpf.mpf_mul')
+def bench_mpf_mul(prec):
+    x, y = _real(prec), _real(prec, 1)
+    return lambda: mpf_mul(x, y, prec, rnd)
+
+
+# Also above DIVISION_CUTOFF, where the python backend divides using a
+# Newton reciprocal
+@benchmark('libmpf.mpf_div', precs=[333333, 1000000])
+def bench_mpf_div(prec):
+    x, y = _real(prec), _real(prec, 1)
+    return lambda: mpf_div(x, y, prec, rnd)
+
+
+@benchmark('libmpf.mpf_sqrt')
+def bench_mpf_sqrt(prec):
+    x = _real(prec)
+    return lambda: mpf_sqrt(x, prec, rnd)
+
+
+@benchmark('libmpf.to_str')
+def bench_to_str(prec):
+    x = _real(prec)
+    dps = prec_to_dps(prec)
+    return lambda: to_str(x, dps)
+
+
+@benchmark('libmpc.mpc_mul')
+def bench_mpc_mul(prec):
+    z, w = _complex(prec), _complex(prec)[::-1]
+    return lambda: mpc_mul(z, w, prec, rnd)
+
+
+@benchmark('libmpc.mpc_div')
+def bench_mpc_div(prec):
+    z, w = _complex(prec), _complex(prec)[::-1]
+    return lambda: mpc_div(z, w, prec, rnd)
+
+
+@benchmark('libmpc.mpc_sqrt')
+def bench_mpc_sqrt(prec):
+    z = _complex(prec)
+    return lambda: mpc_sqrt(z, prec, rnd)
+
+
+@benchmark('libmpc.mpc_exp')
+def bench_mpc_exp(prec):
+    z = _complex(prec)
+    return lambda: mpc_exp(z, prec, rnd)
+
+
+# Elementary functions
+
+@benchmark('libelefun.mpf_exp')
+def bench_mpf_exp(prec):
+    x = _real(prec)
+    return lambda: mpf_exp(x, prec, rnd)
+
+
+@benchmark('libelefun.mpf_log')
+def bench_mpf_log(prec):
+    x = _real(prec, 5)
+    return lambda: mpf_log(x, prec, rnd)
+
+
+@benchmark('libelefun.mpf_cos_sin')
+def bench_mpf_cos_sin(prec):
+    x = _real(prec, 5)
+    return lambda: mpf_cos_sin(x, prec, rnd)
+
+
+@benchmark('libelefun.mpf_atan')
+def bench_mpf_atan(prec):
+    x = _real(prec, 5)
+    return lambda: mpf_atan(x, prec, rnd)
+
+
+@benchmark('libelefun.pi_fixed')
+def bench_pi_fixed(prec):
+    # pi is memoized, so compute it with the undecorated function
+    f = pi_fixed.__wrapped__
+    return lambda: f(prec)
+
+
+# Higher-level algorithms
+
+@benchmark('ctx_mp.hypsum', maxprec=10000)
+def bench_hypsum(prec):
+    ctx = _context(prec)
+    a, b, z = ctx.mpf(1)/3, ctx.mpf(2)/3, ctx.mpf(5)/4
+    return lambda: ctx.hypsum(1, 1, ('R', 'R'), [a, b], z)
+
+
+@benchmark('ctx_mp.hypsum_rational', maxprec=10000)
+def bench_hypsum_rational(prec):
+    ctx = _context(prec)
+    a, b = MPQ(1, 3), MPQ(2, 3)
+    z = ctx.mpf(5)/4
+    return lambda: ctx.hypsum(1, 1, ('Q', 'Q'), [a, b], z)
+
+
+@benchmark('ctx_mp.hypsum_many', maxprec=3333)
+def bench_hypsum_many(prec):
+    ctx = _context(prec)
+    a, b = ctx.mpf(1)/3, ctx.mpf(2)/3
+    zs = [ctx.mpf(k)/20 for k in range(-50, 50)]
+    return lambda: ctx.hypsum(1, 1, ('R', 'R'), [a, b], zs)
+
+
+@benchmark('quadrature.quad', maxprec=3333)
+def bench_quad(prec):
+    ctx = _context(prec)
+    f = lambda x: ctx.exp(-x*x)
+    return lambda: ctx.quad(f, [0, 1])
+
+
+@benchmark('extrapolation.nsum', maxprec=333)
+def bench_nsum(prec):
+    ctx = _context(prec)
+    f = lambda k: 1/k**2
+    return lambda: ctx.nsum(f, [1, ctx.inf])
+
+
+def _lu_solve(ctx):
+    n = 10
+    A = ctx.matrix(n, n)
+    for i in range(n):
+        for j in range(n):
+            A[i, j] = ctx.one/(i + j + 1) + (i == j)
+    b = ctx.matrix([ctx.sqrt(i + 2) for i in range(n)])
+    return lambda: ctx.lu_solve(A, b)
+
+
+@benchmark('linalg.lu_solve', maxprec=10000)
+def bench_lu_solve(prec):
+    return _lu_solve(_context(prec))
+
+
+@benchmark('ctx_iv.lu_solve', maxprec=10000)
+def bench_iv_lu_solve(prec):
+    ctx = MPIntervalContext()
+    ctx.prec = prec
+    return _lu_solve(ctx)
+
+
+@benchmark('ctx_ball.lu_solve', maxprec=10000)
+def bench_ball_lu_solve(prec):
+    ctx = MPBallContext()
+    ctx.prec = prec
+    return _lu_solve(ctx)
+
+
+@benchmark('eigen.eig', maxprec=1000)
+def bench_eig(prec):
+    ctx = _context(prec)
+    n = 6
+    A = ctx.matrix(n, n)
+    for i in range(n):
+        for j in range(n):
+            A[i, j] = ctx.sqrt(i + 2*j + 1)
+    return lambda: ctx.eig(A)
@@ -0,0 +1,64 @@
+"""
+Compute quadrature nodes and save them in the on-disk store, so that
+later processes calling quad() at the same precisions load them
+instead of computing them again.
+
+Examples:
+
+    python -m mpmath.calculus -d ~/.cache/mpmath --dps 500,1000
+    python -m mpmath.calculus --prec 4000 -m gauss-legendre -j 4
+"""
+
+import argparse
+import os
+import sys
+
+from ..libmp import dps_to_prec, libstore
+from .quadrature import prebuild_nodes
+
+
+parser = argparse.ArgumentParser(description=__doc__,
+                                 prog='python -m mpmath.calculus',
+                                 formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument('-d', '--dir',
+                    help='directory of the store (default: the value of '
+                         'MPMATH_CACHE_DIR)')
+parser.add_argument('--dps', metavar='DPS',
+                    help='comma-separated list of precisions in digits')
+parser.add_argument('-p', '--prec', metavar='PRECS',
+                    help='comma-separated list of precisions in bits')
+parser.add_argument('-m', '--method', action='append',
+                    choices=['tanh-sinh', 'gauss-legendre'],
+                    help='quadrature method (default: both)')
+parser.add_argument('--maxdegree', type=int,
+                    help='highest degree (default: the one used by quad())')
+parser.add_argument('-j', '--workers', type=int, default=1,
+                    help='number of worker processes')
+
+
+def main():
+    args = parser.parse_args()
+    path = args.dir or os.environ.get('MPMATH_CACHE_DIR')
+    if not path:
+        parser.error('no store directory given')
+    precs = []
+    if args.prec:
+        precs += [int(p) for p in args.prec.split(',')]
+    if args.dps:
+        precs += [dps_to_prec(int(d)) for d in args.dps.split(',')]
+    if not precs:
+        parser.error('no precision given')
+    libstore.set_store(path)
+    methods = args.method or ['tanh-sinh', 'gauss-legendre']
+    try:
+        for method, degree, prec, t in prebuild_nodes(precs, methods,
+                                                      args.maxdegree,
+                                                      args.workers):
+            print("%-16s degree %3i  prec %7i  %10.3f s" % (method, degree,
+                                                            prec, t))
+    except ValueError as exc:
+        parser.error(str(exc))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
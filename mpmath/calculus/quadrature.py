@@ -1,4 +1,26 @@
 import math
+import warnings
+
+from ..libmp import MPZ, libcache, libstore
+from ..libmp.libcache import MemoCache
+from ..usertools import _executor_map
+
+
+# Nodes for standard intervals computed at this precision (in bits)
+# or higher are kept in the on-disk store, if it is enabled
+NODE_STORE_MIN_PREC = 1000
+
+# Nodes for the standard interval [-1, 1] of all quadrature rules,
+# keyed by (rule, degree, prec). The entries count towards the memory
+# budget set with set_cache_budget()
+quad_nodes_cache = MemoCache('quad_nodes_cache')
+
+# Nodes transformed to other intervals, keyed by (rule, a, b, degree,
+# prec). Only the TRANSFORMED_NODES_MAX most recently used intervals
+# are kept, so that integrating over many different intervals does not
+# fill the memory
+quad_transformed_cache = MemoCache('quad_transformed_cache')
+TRANSFORMED_NODES_MAX = 32
 
 
 class QuadratureRule:
@@ -13,17 +35,49 @@ class QuadratureRule:
     passing it as the *method* argument.
 
     :class:`QuadratureRule` instances are supposed to be singletons.
+
+    Subclasses may set the attribute *name*, which identifies their
+    nodes in the on-disk store (see :func:`~mpmath.set_cache_dir`).
+
+    Nodes for the standard interval are kept in the cache named
+    ``'quad_nodes_cache'`` (see :func:`~mpmath.cache_info`), and
+    transformed to other intervals when they are used. The transformed
+    nodes for the most recently used intervals are kept in the cache
+    ``'quad_transformed_cache'``.
     """
 
+    name = None
+
     def __init__(self, ctx):
         self.ctx = ctx
-        self.transformed_cache = {}
+
+    @property
+    def transformed_cache(self):
+        """
+        A dict mapping ``(a, b, degree, prec)`` to the cached nodes of
+        this rule. Deprecated: use :func:`~mpmath.cache_info` to inspect
+        the caches.
+        """
+        warnings.warn("transformed_cache is deprecated, the nodes are "
+                      "kept in the caches reported by cache_info()",
+                      DeprecationWarning, stacklevel=2)
+        nodes = {}
+        for key, value in list(quad_nodes_cache.items()):
+            if key[0] is self:
+                nodes[(-1, 1) + key[1:]] = value
+        for key, value in list(quad_transformed_cache.items()):
+            if key[0] is self:
+                nodes[key[1:]] = value
+        return nodes
 
     def clear(self):
         """
         Delete cached node data.
         """
-        self.transformed_cache = {}
+        with libcache.lock:
+            for cache in [quad_nodes_cache, quad_transformed_cache]:
+                for key in [key for key in cache if key[0] is self]:
+                    del cache[key]
 
     def calc_nodes(self, degree, prec, verbose=False):
         r"""
@@ -37,34 +91,60 @@ def calc_nodes(self, degree, prec, verbose=False):
     def get_nodes(self, a, b, degree, prec, verbose=False):
         """
         Return nodes for given interval, degree and precision. The
-        nodes are retrieved from a cache if already computed;
-        otherwise they are computed by calling
+        nodes for `[-1, 1]` are retrieved from a cache if already
+        computed; otherwise they are computed by calling
         :func:`~mpmath.calculus.quadrature.QuadratureRule.calc_nodes`
-        and are then cached.
+        and are then cached. They are then transformed to `[a, b]`
+        with :func:`~mpmath.calculus.quadrature.QuadratureRule.transform_nodes`;
+        the transformed nodes for the most recently used intervals are
+        cached as well.
 
         Subclasses should probably not implement this method, but just
         implement :func:`~mpmath.calculus.quadrature.QuadratureRule.calc_nodes`
         for the actual node computation.
         """
-        key = (a, b, degree, prec)
-        if key in self.transformed_cache:
-            return self.transformed_cache[key]
-        orig = self.ctx.prec
+        ctx = self.ctx
+        orig = ctx.prec
         try:
-            self.ctx.prec = prec+20
-            # Get nodes on standard interval
-            stdkey = (-1, 1, degree, prec)
-            if stdkey in self.transformed_cache:
-                nodes = self.transformed_cache[stdkey]
-            else:
-                nodes = self.calc_nodes(degree, prec, verbose)
-                self.transformed_cache[stdkey] = nodes
+            ctx.prec = prec+20
+            # Constants such as pi can't be used as keys, as their
+            # value depends on the precision
+            tkey = (self, +ctx.convert(a), +ctx.convert(b), degree, prec)
+            nodes = quad_transformed_cache.get(tkey)
+            if nodes is not None:
+                return nodes
+            key = (self, degree, prec)
+            nodes = quad_nodes_cache.get(key)
+            if nodes is None:
+                nodes = self._standard_nodes(degree, prec, verbose)
+                quad_nodes_cache[key] = nodes
             # Transform to general interval
             nodes = self.transform_nodes(nodes, a, b, verbose)
-            if key not in self.transformed_cache:
-                self.transformed_cache[key] = nodes
         finally:
-            self.ctx.prec = orig
+            ctx.prec = orig
+        with libcache.lock:
+            quad_transformed_cache[tkey] = nodes
+            if len(quad_transformed_cache) > TRANSFORMED_NODES_MAX:
+                ticks = quad_transformed_cache._ticks
+                oldest = min((k for k in quad_transformed_cache if k != tkey),
+                             key=lambda k: ticks.get(k, 0))
+                del quad_transformed_cache[oldest]
+        return nodes
+
+    def _standard_nodes(self, degree, prec, verbose=False):
+        # Nodes for [-1, 1], from the on-disk store if possible
+        ctx = self.ctx
+        if (self.name is None or prec < NODE_STORE_MIN_PREC or
+                libstore.store_dir is None or not hasattr(ctx, 'dumps')):
+            return self.calc_nodes(degree, prec, verbose)
+        key = 'quad-%s-%i' % (self.name, degree)
+        data = libstore.read(key, prec, lambda data: ctx.loads(bytes(data)))
+        if data is not None:
+            xs, ws = data
+            return list(zip(xs, ws))
+        nodes = self.calc_nodes(degree, prec, verbose)
+        libstore.write(key, prec, ctx.dumps([[x for x, w in nodes],
+                                             [w for x, w in nodes]]))
         return nodes
 
     def transform_nodes(self, nodes, a, b, verbose=False):
@@ -194,7 +274,8 @@ def estimate_error(self, results, prec, epsilon):
         D4 = min(0, max(D1**2/D2, 2*D1, D3))
         return self.ctx.mpf(10) ** int(D4)
 
-    def summation(self, f, points, prec, epsilon, max_degree, verbose=False):
+    def summation(self, f, points, prec, epsilon, max_degree, verbose=False,
+                  executor=None, node_cache=None):
         """
         Main integration function. Computes the 1D integral over
         the interval specified by *points*. For each subinterval,
@@ -203,6 +284,15 @@ def summation(self, f, points, prec, epsilon, max_degree, verbose=False):
 
         :func:`~mpmath.calculus.quadrature.QuadratureRule.summation` transforms each subintegration to
         the standard interval and then calls :func:`~mpmath.calculus.quadrature.QuadratureRule.sum_next`.
+
+        If an *executor* (see :mod:`concurrent.futures`) is given,
+        *f* is first evaluated at all the nodes of each degree
+        concurrently, and :func:`~mpmath.calculus.quadrature.QuadratureRule.sum_next`
+        is given a function that looks up the computed values.
+
+        If a dict is given as *node_cache*, the nodes transformed to
+        each subinterval are kept in it, which saves transforming them
+        again when integrating repeatedly over the same *points*.
         """
         ctx = self.ctx
         I = total_err = ctx.zero
@@ -213,18 +303,28 @@ def summation(self, f, points, prec, epsilon, max_degree, verbose=False):
             # XXX: we could use a single variable transformation,
             # but this is not good in practice. We get better accuracy
             # by having 0 as an endpoint.
-            if (a, b) == (ctx.ninf, ctx.inf):
-                _f = f
-                f = lambda x: _f(-x) + _f(x)
+            symmetric = (a, b) == (ctx.ninf, ctx.inf)
+            g = f
+            if symmetric:
+                g = lambda x: f(-x) + f(x)
                 a, b = (ctx.zero, ctx.inf)
             results = []
             err = ctx.zero
             for degree in range(1, max_degree+1):
-                nodes = self.get_nodes(a, b, degree, prec, verbose)
+                if node_cache is None:
+                    nodes = self.get_nodes(a, b, degree, prec, verbose)
+                else:
+                    key = (a, b, degree, prec)
+                    nodes = node_cache.get(key)
+                    if nodes is None:
+                        nodes = self.get_nodes(a, b, degree, prec, verbose)
+                        node_cache[key] = nodes
                 if verbose:
                     print("Integrating from %s to %s (degree %s of %s)" % \
                         (ctx.nstr(a), ctx.nstr(b), degree, max_degree))
-                result = self.sum_next(f, nodes, degree, prec, results, verbose)
+                if executor is not None:
+                    g = self._evaluate_nodes(f, nodes, symmetric, executor)
+                result = self.sum_next(g, nodes, degree, prec, results, verbose)
                 results.append(result)
                 if degree > 1:
                     err = self.estimate_error(results, prec, epsilon)
@@ -239,6 +339,29 @@ def summation(self, f, points, prec, epsilon, max_degree, verbose=False):
                 print("Failed to reach full accuracy. Estimated error:", ctx.nstr(total_err))
         return I, total_err
 
+    def _evaluate_nodes(self, f, nodes, symmetric, executor):
+        # Evaluates f at the abscissas of the nodes (and their negatives
+        # if symmetric) with the executor, and returns a function that
+        # looks up the values, or calls f for other points.
+        ctx = self.ctx
+        xs = [x for x, w in nodes]
+        if symmetric:
+            xs += [-x for x in xs]
+        ys = _executor_map(ctx, executor, f, xs)
+        if symmetric:
+            n = len(nodes)
+            values = dict(zip(xs, [ys[k] + ys[n+k] for k in range(n)]))
+            fallback = lambda x: f(-x) + f(x)
+        else:
+            values = dict(zip(xs, ys))
+            fallback = f
+        def g(x):
+            try:
+                return values[x]
+            except KeyError:
+                return fallback(x)
+        return g
+
     def sum_next(self, f, nodes, degree, prec, previous, verbose=False):
         r"""
         Evaluates the step sum `\sum w_k f(x_k)` where the *nodes* list
@@ -286,6 +409,8 @@ class TanhSinh(QuadratureRule):
 
     """
 
+    name = 'tanh-sinh'
+
     def sum_next(self, f, nodes, degree, prec, previous, verbose=False):
         """
         Step sum for tanh-sinh quadrature of degree `m`. We exploit the
@@ -380,6 +505,134 @@ def calc_nodes(self, degree, prec, verbose=False):
         return nodes
 
 
+def _legendre_root_guess(n, j):
+    # Tricomi's asymptotic formula for the j-th largest root of P_n
+    t = math.pi*(4*j-1)/(4*n+2)
+    s = math.sin(t)
+    return (1 - (n-1)/(8.0*n**3) - (39-28/s**2)/(384.0*n**4))*math.cos(t)
+
+def _to_float(X, wp):
+    if wp > 60:
+        X >>= wp-60
+        wp = 60
+    return math.ldexp(int(X), -wp)
+
+def _from_float(x, wp):
+    return MPZ(int(math.ldexp(x, 60))) << (wp-60)
+
+def _newton(f, X, wp, guard):
+    """
+    Solves f(X) = 0 by Newton iteration, starting from a guess with
+    about 20 correct bits. f(X, b) must return the value and the
+    derivative, in fixed point with b bits, at X (with b bits). Each
+    iteration is assumed to lose up to *guard* bits to rounding
+    errors and to the curvature of f.
+    """
+    b = min(64 + guard, wp)
+    X >>= wp-b
+    for i in range(10):
+        u, du = f(X, b)
+        if not du:
+            break
+        delta = (u << b) // du
+        X -= delta
+        if abs(delta) < (1 << (b//2)):
+            break
+    steps = [wp]
+    while steps[-1] > 2*(b-guard):
+        steps.append(steps[-1]//2 + guard)
+    for c in steps[::-1]:
+        if c > b:
+            X <<= c-b
+            b = c
+            u, du = f(X, b)
+            X -= (u << b) // du
+    return X << (wp-b)
+
+def _legendre_series(d, S, b):
+    # Evaluates sum(d[k]*S**k) and its derivative with respect to S
+    p = d[-1]
+    q = 0
+    for k in range(len(d)-2, -1, -1):
+        q = ((q*S) >> b) + p
+        p = ((p*S) >> b) + d[k]
+    return p, q
+
+def _legendre_recurrence(n, X, b):
+    # Evaluates P_n and its derivative at X using the three-term
+    # recurrence
+    ONE = MPZ(1) << b
+    t1 = ONE
+    t2 = 0
+    for k in range(1, n+1):
+        t1, t2 = ((2*k-1)*((X*t1) >> b) - (k-1)*t2)//k, t1
+    d = (n*(((X*t1) >> b) - t2) << b) // (((X*X) >> b) - ONE)
+    return t1, d
+
+def _legendre_roots(n, wp, verbose=False):
+    """
+    Returns the nonnegative roots of the Legendre polynomial `P_n`
+    in increasing order, as pairs (X, D) of fixed-point numbers with
+    wp fractional bits where D is the derivative `P_n'(x)`.
+
+    The roots are found by marching from `x = 0` to the right along
+    Taylor expansions of `P_n` obtained from the Legendre differential
+    equation (Glaser, Liu & Rokhlin), at a cost independent of `n` per
+    root. The few roots closest to 1, where the expansions converge
+    too slowly, are found by Newton iteration on the three-term
+    recurrence instead.
+    """
+    ONE = MPZ(1) << wp
+    N1 = n*(n+1)
+    m = n//2
+    roots = []
+    if n % 2:
+        U0 = 0
+        U1 = (-1)**m * ((n*math.comb(n-1, m)) << wp >> (n-1))
+        roots.append((MPZ(0), U1))
+    else:
+        U0 = (-1)**m * (math.comb(n, m) << wp >> n)
+        U1 = 0
+    X0 = MPZ(0)
+    j = m
+    while j:
+        x0 = _to_float(X0, wp)
+        h = _legendre_root_guess(n, j) - x0
+        ratio = h/(1-x0)
+        if ratio > 0.5 or wp > n*math.log2(1/ratio):
+            break
+        H = _from_float(h, wp)
+        Q = ONE - ((X0*X0) >> wp)
+        A = (((2*X0*H) >> wp) << wp) // Q
+        B = (((H*H) >> wp) << wp) // Q
+        d = [U0, (U1*H) >> wp]
+        k = 0
+        while abs(d[-1]) >> 8 or abs(d[-2]) >> 8:
+            d.append(((A*(k+1)**2*d[k+1] + (k*(k+1)-N1)*B*d[k]) >> wp)
+                // ((k+1)*(k+2)))
+            k += 1
+        def f(S, b):
+            s = wp-b
+            e = [c >> s for c in d]
+            while len(e) > 2 and not e[-1]:
+                e.pop()
+            return _legendre_series(e, S, b)
+        S = _newton(f, ONE, wp, 2*len(d).bit_length() + 8)
+        U0, D = _legendre_series(d, S, wp)
+        U1 = (D << wp) // H
+        X0 += (S*H) >> wp
+        roots.append((X0, U1))
+        if verbose and j % 30 == 15:
+            print("Computing nodes (%i of %i)" % (m-j+1, m))
+        j -= 1
+    while j:
+        X = _newton(lambda X, b: _legendre_recurrence(n, X, b),
+            _from_float(_legendre_root_guess(n, j), wp), wp,
+            2*n.bit_length() + 8)
+        roots.append((X, _legendre_recurrence(n, X, wp)[1]))
+        j -= 1
+    return roots
+
 class GaussLegendre(QuadratureRule):
     r"""
     This class implements Gauss-Legendre quadrature, which is
@@ -404,52 +657,175 @@ class GaussLegendre(QuadratureRule):
 
     """
 
+    name = 'gauss-legendre'
+
     def calc_nodes(self, degree, prec, verbose=False):
         r"""
         Calculates the abscissas and weights for Gauss-Legendre
         quadrature of degree of given degree (actually `3 \cdot 2^m`).
         """
         ctx = self.ctx
-        # It is important that the epsilon is set lower than the
-        # "real" epsilon
-        epsilon = ctx.ldexp(1, -prec-8)
-        # Fairly high precision might be required for accurate
-        # evaluation of the roots
-        orig = ctx.prec
-        ctx.prec = int(prec*1.5)
         if degree == 1:
+            orig = ctx.prec
+            ctx.prec = int(prec*1.5)
             x = ctx.sqrt(ctx.mpf(3)/5)
             w = ctx.mpf(5)/9
             nodes = [(-x,w),(ctx.zero,ctx.mpf(8)/9),(x,w)]
             ctx.prec = orig
             return nodes
+        return self.legendre_nodes(3*2**(degree-1), prec, verbose)
+
+    def legendre_nodes(self, n, prec, verbose=False):
+        r"""
+        Returns the `n` abscissas and weights of the Gauss-Legendre
+        rule on `[-1, 1]`, accurate to *prec* bits. The nodes come in
+        pairs `(x, w), (-x, w)` ordered by decreasing `x`, preceded by
+        the node at 0 if `n` is odd.
+
+        The roots of `P_n` are computed with `O(n)` total work
+        rather than `O(n^2)`, so that rules of very high degree are
+        cheap to generate.
+        """
+        ctx = self.ctx
+        wp = prec + 2*n.bit_length() + 20
         nodes = []
-        n = 3*2**(degree-1)
-        upto = n//2 + 1
-        for j in range(1, upto):
-            # Asymptotic formula for the roots
-            r = ctx.mpf(math.cos(math.pi*(j-0.25)/(n+0.5)))
-            # Newton iteration
-            while 1:
-                t1, t2 = 1, 0
-                # Evaluates the Legendre polynomial using its defining
-                # recurrence relation
-                for j1 in range(1,n+1):
-                    t3, t2, t1 = t2, t1, ((2*j1-1)*r*t1 - (j1-1)*t2)/j1
-                t4 = n*(r*t1-t2)/(r**2-1)
-                a = t1/t4
-                r = r - a
-                if abs(a) < epsilon:
-                    break
-            x = r
-            w = 2/((1-r**2)*t4**2)
-            if verbose  and j % 30 == 15:
-                print("Computing nodes (%i of %i)" % (j, upto))
-            nodes.append((x, w))
-            nodes.append((-x, w))
-        ctx.prec = orig
+        for X, D in reversed(_legendre_roots(n, wp, verbose)):
+            Q = (MPZ(1) << (2*wp)) - X*X
+            x = +ctx.ldexp(X, -wp)
+            w = +ctx.ldexp((MPZ(1) << (5*wp+1)) // (Q*D*D), -wp)
+            if X:
+                nodes.append((x, w))
+                nodes.append((-x, w))
+            else:
+                nodes.insert(0, (x, w))
         return nodes
 
+def _prebuild_task(task):
+    from mpmath import mp
+    from timeit import default_timer as clock
+    method, degree, prec, path = task
+    libstore.set_store(path)
+    rule = mp._tanh_sinh if method == 'tanh-sinh' else mp._gauss_legendre
+    t = clock()
+    rule.get_nodes(-1, 1, degree, prec)
+    rule.clear()
+    return clock() - t
+
+
+def prebuild_nodes(precs, methods=('tanh-sinh', 'gauss-legendre'),
+                   maxdegree=None, workers=1):
+    """
+    Compute the nodes of the given quadrature methods on the standard
+    interval, for each precision (in bits) in *precs* and each degree
+    up to *maxdegree* (by default, the maximum degree used by
+    :func:`~mpmath.quad` at that precision), so that they are saved in
+    the on-disk store for later processes.  Node sets already in the
+    store are skipped.  The work is divided among *workers* processes.
+    Return an iterator over the tuples ``(method, degree, prec, time)``
+    of the computed node sets, in the order of completion.
+    """
+    from mpmath import mp
+    path = libstore.store_dir
+    if path is None:
+        raise ValueError("the on-disk store is not enabled")
+    tasks = []
+    for prec in precs:
+        prec = int(prec)
+        if prec < NODE_STORE_MIN_PREC:
+            raise ValueError("nodes are only stored for a precision of "
+                             "at least %i bits" % NODE_STORE_MIN_PREC)
+        for method in methods:
+            rule = {'tanh-sinh': mp._tanh_sinh,
+                    'gauss-legendre': mp._gauss_legendre}[method]
+            for degree in range(1, (maxdegree or rule.guess_degree(prec))+1):
+                key = 'quad-%s-%i' % (method, degree)
+                if prec not in libstore.precisions(key):
+                    tasks.append((method, degree, prec, path))
+    # The most expensive tasks first, for a better balance of the work
+    tasks.sort(key=lambda task: (task[2] << task[1]), reverse=True)
+    times = mp.parallel_map(_prebuild_task, tasks, workers=workers,
+                            stream=True, ordered=False)
+    for i, t in times:
+        yield tasks[i][:3] + (t,)
+
+
+class _Integrand:
+    """
+    Integrand for the first variable of a multiple integral: the
+    integral of *f* over the remaining variables.  It can be pickled
+    (if *f* can), so that it can be evaluated by worker processes.
+    """
+
+    def __init__(self, rule, f, points, prec, epsilon, m, node_cache=None):
+        self.rule = rule
+        self.f = f
+        self.points = points
+        self.prec = prec
+        self.epsilon = epsilon
+        self.m = m
+        # The same intervals are integrated over for every x, so the
+        # transformed nodes are kept for the lifetime of the integrand
+        if node_cache is None:
+            node_cache = {}
+        self.node_cache = node_cache
+
+    def __call__(self, x):
+        f = self.f
+        g = lambda *y: f(x, *y)
+        points = self.points
+        if len(points) > 1:
+            g = _Integrand(self.rule, g, points[1:], self.prec, self.epsilon,
+                           self.m, self.node_cache)
+        return self.rule.summation(g, points[0], self.prec, self.epsilon,
+                                   self.m, node_cache=self.node_cache)[0]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['node_cache'] = {}
+        rule = self.rule
+        ctx = rule.ctx
+        if rule is ctx._tanh_sinh:
+            state['rule'] = 'tanh-sinh'
+        elif rule is ctx._gauss_legendre:
+            state['rule'] = 'gauss-legendre'
+        else:
+            state['rule'] = type(rule)
+        # The global contexts are sent by name.  Clones of mp are
+        # replaced by mp, which is given their settings along with the
+        # points (see _executor_map()), so that the results are of the
+        # types dumps() handles.  Other contexts are sent by type and
+        # precision.
+        import mpmath
+        for name in ('mp', 'fp', 'iv', 'ball'):
+            if getattr(mpmath, name) is ctx:
+                state['ctx'] = name
+                break
+        else:
+            if isinstance(ctx, type(mpmath.mp)):
+                state['ctx'] = 'mp'
+            else:
+                state['ctx'] = type(ctx), ctx.prec
+        return state
+
+    def __setstate__(self, state):
+        import mpmath
+        ctx = state.pop('ctx')
+        if isinstance(ctx, str):
+            ctx = getattr(mpmath, ctx)
+        else:
+            cls, prec = ctx
+            ctx = cls()
+            ctx.prec = prec
+        rule = state['rule']
+        if rule == 'tanh-sinh':
+            state['rule'] = ctx._tanh_sinh
+        elif rule == 'gauss-legendre':
+            state['rule'] = ctx._gauss_legendre
+        else:
+            state['rule'] = rule(ctx)
+        self.__dict__.update(state)
+
+
 class QuadratureMethods:
 
     def __init__(ctx, *args, **kwargs):
@@ -457,7 +833,7 @@ def __init__(ctx, *args, **kwargs):
         ctx._tanh_sinh = TanhSinh(ctx)
 
     def quad(ctx, f, *points, method='tanh-sinh', verbose=False,
-             maxdegree=None, error=False):
+             maxdegree=None, error=False, executor=None, workers=None):
         r"""
         Computes a single, double or triple integral over a given
         1D interval, 2D rectangle, or 3D cuboid. A basic example::
@@ -511,6 +887,8 @@ def quad(ctx, f, *points, method='tanh-sinh', verbose=False,
             quitting.
         *verbose*
             Print details about progress.
+        *executor*, *workers*
+            Evaluate the integrand concurrently (see below).
 
         **Algorithms**
 
@@ -528,7 +906,12 @@ def quad(ctx, f, *points, method='tanh-sinh', verbose=False,
         At high precision, computing the nodes and weights for the
         integration can be expensive (more expensive than computing the
         function values). To make repeated integrations fast, nodes
-        are automatically cached.
+        are automatically cached. The nodes for the standard interval
+        `[-1, 1]` are transformed to the actual interval; the transformed
+        nodes are only kept for the most recently used intervals. The
+        memory used by the caches can be inspected with
+        :func:`~mpmath.cache_info` and limited with
+        :func:`~mpmath.set_cache_budget`.
 
         The advantages of the tanh-sinh algorithm are that it tends to
         handle endpoint singularities well, and that the nodes are cheap
@@ -716,6 +1099,32 @@ def quad(ctx, f, *points, method='tanh-sinh', verbose=False,
             >>> quad(f, [-100, 0, 100])   # Also good
             3.12159332021646
 
+        **Concurrent evaluation**
+
+        For expensive integrands, nearly all the time is spent
+        evaluating `f` at the nodes of the quadrature rule, and these
+        evaluations are independent.  With ``workers=n``, the nodes of
+        each degree are evaluated concurrently by a pool of *n*
+        processes, which use the working precision of
+        :func:`~mpmath.quad` (as in :func:`~mpmath.parallel_map`).
+        Alternatively, an existing
+        :class:`~concurrent.futures.ProcessPoolExecutor` can be passed
+        as *executor*; it is not shut down afterwards.  Other executors,
+        such as thread pools, are only accepted by ``fp.quad``: threads
+        would share the working precision, which mpmath's functions
+        change while they run.  The degrees are still tried one after
+        another, and the error estimates and the decision to stop are
+        the same as in the serial computation::
+
+            >>> mp.dps = 30
+            >>> quad(mp.erf, [0, 1], workers=2) == quad(mp.erf, [0, 1])
+            True
+
+        For multiple integrals, the inner integrals are computed for all
+        the nodes of the first variable concurrently.  To be sent to
+        worker processes, *f* must be picklable, e.g. a function of
+        ``mp`` or a function defined at the top level of a module.
+
         **References**
 
         1. [Weisstein]_ http://mathworld.wolfram.com/DoubleIntegral.html
@@ -736,26 +1145,28 @@ def quad(ctx, f, *points, method='tanh-sinh', verbose=False,
         epsilon = ctx.eps/8
         m = maxdegree or rule.guess_degree(prec)
         points = [ctx._as_points(p) for p in points]
+        if dim not in (1, 2, 3):
+            raise NotImplementedError("quadrature must have dim 1, 2 or 3")
+        pool = None
+        if workers is not None:
+            if executor is not None:
+                raise ValueError("executor and workers can't be specified together")
+            from concurrent.futures import ProcessPoolExecutor
+            executor = pool = ProcessPoolExecutor(workers)
         try:
             ctx.prec += 20
-            if dim == 1:
-                v, err = rule.summation(f, points[0], prec, epsilon, m, verbose)
-            elif dim == 2:
-                v, err = rule.summation(lambda x: \
-                        rule.summation(lambda y: f(x,y), \
-                        points[1], prec, epsilon, m)[0],
-                    points[0], prec, epsilon, m, verbose)
-            elif dim == 3:
-                v, err = rule.summation(lambda x: \
-                        rule.summation(lambda y: \
-                            rule.summation(lambda z: f(x,y,z), \
-                            points[2], prec, epsilon, m)[0],
-                        points[1], prec, epsilon, m)[0],
-                    points[0], prec, epsilon, m, verbose)
+            if dim > 1:
+                f = _Integrand(rule, f, points[1:], prec, epsilon, m)
+            if executor is None:
+                v, err = rule.summation(f, points[0], prec, epsilon, m,
+                                        verbose)
             else:
-                raise NotImplementedError("quadrature must have dim 1, 2 or 3")
+                v, err = rule.summation(f, points[0], prec, epsilon, m,
+                                        verbose, executor=executor)
         finally:
             ctx.prec = orig
+            if pool is not None:
+                pool.shutdown()
         if error:
             return +v, err
         return +v
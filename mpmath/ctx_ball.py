@@ -0,0 +1,556 @@
+import numbers
+import sys
+
+from . import function_docs, libmp
+from .libmp import (ComplexResult, dps_to_prec, from_float, from_int, fzero,
+                    int_types, mpf_le, prec_to_dps, repr_dps, round_ceiling,
+                    round_floor, round_nearest, round_up)
+from .libmp.libmpb import (RAD_PREC, mpb_abs, mpb_abs_lower, mpb_abs_upper, mpb_add, mpb_atan, mpb_atan2,
+                           mpb_contains, mpb_cos, mpb_div, mpb_eq, mpb_ne, mpb_exp,
+                           mpb_factorial, mpb_fma, mpb_from_mpf, mpb_from_mpi,
+                           mpb_from_str, mpb_gamma, mpb_ge, mpb_gt,
+                           mpb_indeterminate, mpb_is_int, mpb_le, mpb_log,
+                           mpb_loggamma, mpb_lt, mpb_mul, mpb_neg,
+                           mpb_overlap, mpb_pos, mpb_pow, mpb_rgamma, mpb_sin,
+                           mpb_sqrt, mpb_sub, mpb_tan, mpb_to_mpi, mpb_to_str,
+                           mpb_zero, mpcb_abs, mpcb_add, mpcb_cos, mpcb_div,
+                           mpcb_exp, mpcb_factorial, mpcb_fma, mpcb_gamma,
+                           mpcb_log, mpcb_loggamma, mpcb_mul, mpcb_neg,
+                           mpcb_pos, mpcb_pow, mpcb_rgamma, mpcb_sin,
+                           mpcb_sqrt, mpcb_sub, mpcb_tan, mag_add,
+                           mag_from_mpf, mag_is_inf, mag_to_mpf, mag_zero)
+from .libmp.libmpc import mpc_hash
+from .libmp.libmpf import mpf_hash, mpf_shift
+from .matrices.matrices import _matrix
+
+
+from .ctx_base import StandardBaseContext
+
+
+new = object.__new__
+
+# pickling support
+def _make_mpf(x):
+    from mpmath import ball
+    return ball.make_mpf(x)
+
+def _make_mpc(x):
+    from mpmath import ball
+    return ball.make_mpc(x)
+
+
+class ballmpf:
+    """
+    Ball arithmetic class. Precision is controlled by ball.prec.
+    """
+
+    def __new__(cls, x=0, rad=None):
+        ctx = cls.ctx
+        x = ctx.convert(x)
+        if rad is None:
+            return x
+        m, r = x._mpb_
+        rm, rr = ctx.convert(rad)._mpb_
+        return ctx.make_mpf((m, mag_add(r, mag_add(mag_from_mpf(rm), rr))))
+
+    def cast(self, cls, f_convert):
+        m, r = self._mpb_
+        if not r[0]:
+            return cls(f_convert(m))
+        raise ValueError
+
+    def __int__(self):
+        return self.cast(int, libmp.to_int)
+
+    def __float__(self):
+        return self.cast(float, libmp.to_float)
+
+    def __complex__(self):
+        return self.cast(complex, libmp.to_float)
+
+    def __hash__(self):
+        m, r = self._mpb_
+        if not r[0]:
+            return mpf_hash(m)
+        else:
+            return hash(self._mpb_)
+
+    @property
+    def real(self): return self
+
+    @property
+    def imag(self): return self.ctx.zero
+
+    def conjugate(self): return self
+
+    @property
+    def mid(self):
+        m, r = self._mpb_
+        return self.ctx.make_mpf((m, mag_zero))
+
+    @property
+    def rad(self):
+        m, r = self._mpb_
+        return self.ctx.make_mpf((mag_to_mpf(r), mag_zero))
+
+    @property
+    def a(self):
+        a, b = mpb_to_mpi(self._mpb_, self.ctx.prec)
+        return self.ctx.make_mpf((a, mag_zero))
+
+    @property
+    def b(self):
+        a, b = mpb_to_mpi(self._mpb_, self.ctx.prec)
+        return self.ctx.make_mpf((b, mag_zero))
+
+    @property
+    def _mpi_(self):
+        return mpb_to_mpi(self._mpb_, self.ctx.prec)
+
+    @property
+    def _mpcb_(self):
+        return self._mpb_, mpb_zero
+
+    def overlap(self, t):
+        t = self.ctx.convert(t)
+        if hasattr(t, '_mpcb_') and not hasattr(t, '_mpb_'):
+            return self.ctx.mpc(self).overlap(t)
+        return mpb_overlap(self._mpb_, t._mpb_)
+
+    def __contains__(self, t):
+        t = self.ctx.convert(t)
+        if not hasattr(t, '_mpb_'):
+            return t.imag == 0 and t.real in self
+        return mpb_contains(self._mpb_, t._mpb_)
+
+    def __str__(self):
+        return mpb_to_str(self._mpb_, prec_to_dps(self.ctx.prec) + 3)
+
+    def __repr__(self):
+        if self.ctx.pretty:
+            return str(self)
+        m, r = self._mpb_
+        m = libmp.to_str(m, repr_dps(self.ctx.prec))
+        if not r[0]:
+            return "mpb(%r)" % m
+        r = libmp.to_str(mag_to_mpf(r), repr_dps(RAD_PREC), rnd=round_up)
+        return "mpb(%r, %r)" % (m, r)
+
+    def __reduce__(self):
+        return _make_mpf, (self._mpb_,)
+
+    def _compare(s, t, cmpfun):
+        if not hasattr(t, "_mpb_"):
+            try:
+                t = s.ctx.convert(t)
+            except:
+                return NotImplemented
+            if not hasattr(t, "_mpb_"):
+                return NotImplemented
+        return cmpfun(s._mpb_, t._mpb_, s.ctx.prec)
+
+    def __eq__(s, t): return s._compare(t, mpb_eq)
+    def __ne__(s, t): return s._compare(t, mpb_ne)
+    def __lt__(s, t): return s._compare(t, mpb_lt)
+    def __le__(s, t): return s._compare(t, mpb_le)
+    def __gt__(s, t): return s._compare(t, mpb_gt)
+    def __ge__(s, t): return s._compare(t, mpb_ge)
+
+    def __abs__(self):
+        return self.ctx.make_mpf(mpb_abs(self._mpb_, self.ctx.prec))
+    def __pos__(self):
+        return self.ctx.make_mpf(mpb_pos(self._mpb_, self.ctx.prec))
+    def __neg__(self):
+        return self.ctx.make_mpf(mpb_neg(self._mpb_, self.ctx.prec))
+
+    def ae(s, t, rel_eps=None, abs_eps=None):
+        return s.ctx.almosteq(s, t, rel_eps, abs_eps)
+
+class ballmpc:
+
+    def __new__(cls, re=0, im=0):
+        re = cls.ctx.convert(re)
+        im = cls.ctx.convert(im)
+        if not hasattr(re, "_mpb_") or not hasattr(im, "_mpb_"):
+            return re + im*cls.ctx.j
+        y = new(cls)
+        y._mpcb_ = re._mpb_, im._mpb_
+        return y
+
+    def __hash__(self):
+        (a, r), (b, s) = self._mpcb_
+        if not r[0] and not s[0]:
+            return mpc_hash((a, b))
+        else:
+            return hash(self._mpcb_)
+
+    def __repr__(s):
+        if s.ctx.pretty:
+            return str(s)
+        return "ball.mpc(%s, %s)" % (repr(s.real), repr(s.imag))
+
+    def __str__(s):
+        return "(%s + %s*j)" % (str(s.real), str(s.imag))
+
+    def __reduce__(self):
+        return _make_mpc, (self._mpcb_,)
+
+    @property
+    def real(s):
+        return s.ctx.make_mpf(s._mpcb_[0])
+
+    @property
+    def imag(s):
+        return s.ctx.make_mpf(s._mpcb_[1])
+
+    def conjugate(s):
+        a, b = s._mpcb_
+        return s.ctx.make_mpc((a, mpb_neg(b)))
+
+    def overlap(s, t):
+        t = s.ctx.convert(t)
+        a, b = s._mpcb_
+        c, d = t._mpcb_
+        return mpb_overlap(a, c) and mpb_overlap(b, d)
+
+    def __contains__(s, t):
+        t = s.ctx.convert(t)
+        return t.real in s.real and t.imag in s.imag
+
+    def _compare(s, t, ne=False):
+        if not isinstance(t, s.ctx._types):
+            try:
+                t = s.ctx.convert(t)
+            except:
+                return NotImplemented
+        if ne:
+            return s._mpcb_ != t._mpcb_
+        return s._mpcb_ == t._mpcb_
+
+    def __eq__(s, t): return s._compare(t)
+    def __ne__(s, t): return s._compare(t, True)
+
+    def __lt__(s, t): raise TypeError("complex balls cannot be ordered")
+    __le__ = __gt__ = __ge__ = __lt__
+
+    def __neg__(s): return s.ctx.make_mpc(mpcb_neg(s._mpcb_, s.ctx.prec))
+    def __pos__(s): return s.ctx.make_mpc(mpcb_pos(s._mpcb_, s.ctx.prec))
+    def __abs__(s): return s.ctx.make_mpf(mpcb_abs(s._mpcb_, s.ctx.prec))
+
+    def ae(s, t, rel_eps=None, abs_eps=None):
+        return s.ctx.almosteq(s, t, rel_eps, abs_eps)
+
+def _binary_op(f_real, f_complex):
+    def g_complex(ctx, sval, tval):
+        return ctx.make_mpc(f_complex(sval, tval, ctx.prec))
+    def g_real(ctx, sval, tval):
+        try:
+            return ctx.make_mpf(f_real(sval, tval, ctx.prec))
+        except ComplexResult:
+            sval = (sval, mpb_zero)
+            tval = (tval, mpb_zero)
+            return g_complex(ctx, sval, tval)
+    def lop_real(s, t):
+        if isinstance(t, _matrix): return NotImplemented
+        ctx = s.ctx
+        if not isinstance(t, ctx._types): t = ctx.convert(t)
+        if hasattr(t, "_mpb_"): return g_real(ctx, s._mpb_, t._mpb_)
+        if hasattr(t, "_mpcb_"): return g_complex(ctx, (s._mpb_, mpb_zero), t._mpcb_)
+        return NotImplemented
+    def rop_real(s, t):
+        ctx = s.ctx
+        if not isinstance(t, ctx._types): t = ctx.convert(t)
+        if hasattr(t, "_mpb_"): return g_real(ctx, t._mpb_, s._mpb_)
+        if hasattr(t, "_mpcb_"): return g_complex(ctx, t._mpcb_, (s._mpb_, mpb_zero))
+        return NotImplemented
+    def lop_complex(s, t):
+        if isinstance(t, _matrix): return NotImplemented
+        ctx = s.ctx
+        if not isinstance(t, s.ctx._types):
+            try:
+                t = s.ctx.convert(t)
+            except (ValueError, TypeError):
+                return NotImplemented
+        return g_complex(ctx, s._mpcb_, t._mpcb_)
+    def rop_complex(s, t):
+        ctx = s.ctx
+        if not isinstance(t, s.ctx._types):
+            t = s.ctx.convert(t)
+        return g_complex(ctx, t._mpcb_, s._mpcb_)
+    return lop_real, rop_real, lop_complex, rop_complex
+
+ballmpf.__add__, ballmpf.__radd__, ballmpc.__add__, ballmpc.__radd__ = _binary_op(mpb_add, mpcb_add)
+ballmpf.__sub__, ballmpf.__rsub__, ballmpc.__sub__, ballmpc.__rsub__ = _binary_op(mpb_sub, mpcb_sub)
+ballmpf.__mul__, ballmpf.__rmul__, ballmpc.__mul__, ballmpc.__rmul__ = _binary_op(mpb_mul, mpcb_mul)
+ballmpf.__pow__, ballmpf.__rpow__, ballmpc.__pow__, ballmpc.__rpow__ = _binary_op(mpb_pow, mpcb_pow)
+
+ballmpf.__truediv__, ballmpf.__rtruediv__, ballmpc.__truediv__, ballmpc.__rtruediv__ = _binary_op(mpb_div, mpcb_div)
+
+class ballmpf_constant(ballmpf):
+    def __new__(cls, f):
+        self = new(cls)
+        self._f = f
+        return self
+    def _get_mpb_(self):
+        prec = self.ctx._prec[0]
+        a = self._f(prec, round_floor)
+        b = self._f(prec, round_ceiling)
+        return a, mag_from_mpf(libmp.mpf_sub(b, a))
+    _mpb_ = property(_get_mpb_)
+
+class MPBallContext(StandardBaseContext):
+    """
+    Context for arbitrary-precision ball (midpoint-radius) arithmetic.
+
+    Like the ``iv`` context, it gives rigorous error bounds, but the
+    error is kept as a low-precision radius around a single midpoint
+    rounded to the working precision, instead of two endpoints that
+    both have the full precision.
+    """
+
+    def __init__(ctx):
+        ctx.mpf = type('ballmpf', (ballmpf,), {})
+        ctx.mpc = type('ballmpc', (ballmpc,), {})
+        ctx._types = (ctx.mpf, ctx.mpc)
+        ctx._constant = type('ballmpf_constant', (ballmpf_constant,), {})
+        ctx._prec = [sys.float_info.mant_dig]
+        ctx._set_prec(ctx._prec[0])
+        ctx._constant._ctxdata = ctx.mpf._ctxdata = ctx.mpc._ctxdata = [ctx.mpf, new, ctx._prec]
+        ctx._constant.ctx = ctx.mpf.ctx = ctx.mpc.ctx = ctx
+        ctx.pretty = False
+        StandardBaseContext.__init__(ctx)
+        ctx._init_builtins()
+
+    def _init_builtins(ctx):
+        ctx.one = ctx.mpf(1)
+        ctx.zero = ctx.mpf(0)
+        ctx.inf = ctx.mpf('inf')
+        ctx.ninf = -ctx.inf
+        ctx.nan = ctx.make_mpf(mpb_indeterminate)
+        ctx.j = ctx.mpc(0,1)
+        ctx.exp = ctx._wrap_mpb_function(mpb_exp, mpcb_exp)
+        ctx.sqrt = ctx._wrap_mpb_function(mpb_sqrt, mpcb_sqrt)
+        ctx.ln = ctx._wrap_mpb_function(mpb_log, mpcb_log)
+        ctx.cos = ctx._wrap_mpb_function(mpb_cos, mpcb_cos)
+        ctx.sin = ctx._wrap_mpb_function(mpb_sin, mpcb_sin)
+        ctx.tan = ctx._wrap_mpb_function(mpb_tan, mpcb_tan)
+        ctx.atan = ctx._wrap_mpb_function(mpb_atan)
+        ctx.gamma = ctx._wrap_mpb_function(mpb_gamma, mpcb_gamma)
+        ctx.loggamma = ctx._wrap_mpb_function(mpb_loggamma, mpcb_loggamma)
+        ctx.rgamma = ctx._wrap_mpb_function(mpb_rgamma, mpcb_rgamma)
+        ctx.factorial = ctx._wrap_mpb_function(mpb_factorial, mpcb_factorial)
+        ctx.fac = ctx.factorial
+
+        ctx.eps = ctx._constant(lambda prec, rnd: (0, libmp.MPZ_ONE, 1-prec, 1))
+        ctx.pi = ctx._constant(libmp.mpf_pi)
+        ctx.e = ctx._constant(libmp.mpf_e)
+        ctx.ln2 = ctx._constant(libmp.libelefun.mpf_ln2)
+        ctx.ln10 = ctx._constant(libmp.libelefun.mpf_ln10)
+        ctx.phi = ctx._constant(libmp.libelefun.mpf_phi)
+        ctx.euler = ctx._constant(libmp.gammazeta.mpf_euler)
+        ctx.catalan = ctx._constant(libmp.gammazeta.mpf_catalan)
+        ctx.glaisher = ctx._constant(libmp.gammazeta.mpf_glaisher)
+        ctx.khinchin = ctx._constant(libmp.gammazeta.mpf_khinchin)
+        ctx.twinprime = ctx._constant(libmp.gammazeta.mpf_twinprime)
+
+    def _wrap_mpb_function(ctx, f_real, f_complex=None):
+        def g(x, **kwargs):
+            if kwargs:
+                prec = kwargs.get('prec', ctx._prec[0])
+            else:
+                prec = ctx._prec[0]
+            x = ctx.convert(x)
+            if hasattr(x, "_mpb_"):
+                try:
+                    return ctx.make_mpf(f_real(x._mpb_, prec))
+                except ComplexResult:
+                    if f_complex is None:
+                        raise
+                    x = ctx.mpc(x)
+            if hasattr(x, "_mpcb_") and f_complex is not None:
+                return ctx.make_mpc(f_complex(x._mpcb_, prec))
+            raise ValueError
+        return g
+
+    @classmethod
+    def _wrap_specfun(cls, name, f, wrap):
+        if wrap:
+            def f_wrapped(ctx, *args, **kwargs):
+                convert = ctx.convert
+                args = [convert(a) for a in args]
+                prec = ctx.prec
+                try:
+                    ctx.prec += 10
+                    retval = f(ctx, *args, **kwargs)
+                finally:
+                    ctx.prec = prec
+                return +retval
+            # For inspect.signature()
+            f_wrapped.__wrapped__ = f
+        else:
+            f_wrapped = f
+        f_wrapped.__doc__ = function_docs.__dict__.get(name, f.__doc__)
+        f_wrapped.__name__ = f.__name__
+        setattr(cls, name, f_wrapped)
+
+    def _set_prec(ctx, n):
+        ctx._prec[0] = max(1, int(n))
+        ctx._dps = prec_to_dps(n)
+
+    def _set_dps(ctx, n):
+        ctx._prec[0] = dps_to_prec(n)
+        ctx._dps = max(1, int(n))
+
+    prec = property(lambda ctx: ctx._prec[0], _set_prec)
+    dps = property(lambda ctx: ctx._dps, _set_dps)
+
+    def make_mpf(ctx, v):
+        a = new(ctx.mpf)
+        a._mpb_ = v
+        return a
+
+    def make_mpc(ctx, v):
+        a = new(ctx.mpc)
+        a._mpcb_ = v
+        return a
+
+    def convert(ctx, x):
+        if isinstance(x, (ctx.mpf, ctx.mpc)):
+            return x
+        if isinstance(x, ctx._constant):
+            return +x
+        if isinstance(x, str):
+            return ctx.make_mpf(mpb_from_str(x, ctx.prec))
+        if isinstance(x, int_types):
+            return ctx.make_mpf(mpb_from_mpf(from_int(x), ctx.prec))
+        if isinstance(x, float):
+            return ctx.make_mpf(mpb_from_mpf(from_float(x), ctx.prec))
+        if hasattr(x, "_mpf_"):
+            return ctx.make_mpf(mpb_from_mpf(x._mpf_))
+        if hasattr(x, "_mpb_"):
+            return ctx.make_mpf(x._mpb_)
+        if hasattr(x, "_mpi_"):
+            return ctx.make_mpf(mpb_from_mpi(x._mpi_, ctx.prec))
+        if (isinstance(x, complex) or hasattr(x, "_mpc_") or
+                hasattr(x, "_mpci_") or hasattr(x, "_mpcb_")):
+            re = ctx.convert(x.real)
+            im = ctx.convert(x.imag)
+            return ctx.mpc(re,im)
+        try:
+            a, b = x
+        except (TypeError, ValueError):
+            raise TypeError("cannot create ball from " + repr(x))
+        a = mpb_to_mpi(ctx.convert(a)._mpb_, ctx.prec)[0]
+        b = mpb_to_mpi(ctx.convert(b)._mpb_, ctx.prec)[1]
+        assert mpf_le(a, b), "endpoints must be properly ordered"
+        return ctx.make_mpf(mpb_from_mpi((a, b), ctx.prec))
+
+    def nstr(ctx, x, n=5, *, strip_zeros=True, min_fixed=None, max_fixed=None,
+             show_zero_exponent=False, base=10, binary_exp=False,
+             rnd=round_nearest, error_dps=3):
+        x = ctx.convert(x)
+        kwargs = {'strip_zeros': strip_zeros, 'min_fixed': min_fixed,
+                  'max_fixed': max_fixed, 'show_zero_exponent': show_zero_exponent,
+                  'error_dps': error_dps}
+        if hasattr(x, "_mpb_"):
+            return mpb_to_str(x._mpb_, n, **kwargs)
+        if hasattr(x, "_mpcb_"):
+            re = mpb_to_str(x._mpcb_[0], n, **kwargs)
+            im = mpb_to_str(x._mpcb_[1], n, **kwargs)
+            return "(%s + %s*j)" % (re, im)
+
+    def mag(ctx, x):
+        x = ctx.convert(x)
+        if isinstance(x, ctx.mpc):
+            return max(ctx.mag(x.real), ctx.mag(x.imag)) + 1
+        m, r = x._mpb_
+        man, exp = mag_add(mag_from_mpf(m), r)
+        if mag_is_inf((man, exp)):
+            return ctx.inf
+        if man:
+            return exp + man.bit_length()
+        return ctx.ninf
+
+    def isnan(ctx, x):
+        x = ctx.convert(x)
+        if hasattr(x, "_mpb_"):
+            return mag_is_inf(x._mpb_[1])
+        return ctx.isnan(x.real) or ctx.isnan(x.imag)
+
+    def isinf(ctx, x):
+        return x == ctx.inf
+
+    def isint(ctx, x):
+        x = ctx.convert(x)
+        m, r = x._mpb_
+        if not r[0]:
+            return mpb_is_int(x._mpb_)
+        return None
+
+    def ldexp(ctx, x, n):
+        m, (rm, re) = ctx.convert(x)._mpb_
+        return ctx.make_mpf((mpf_shift(m, n), (rm, re + n)))
+
+    def absmin(ctx, x):
+        x = ctx.convert(x)
+        if not hasattr(x, "_mpb_"):
+            x = abs(x)
+        return ctx.make_mpf((mpb_abs_lower(x._mpb_, ctx.prec), mag_zero))
+
+    def absmax(ctx, x):
+        x = ctx.convert(x)
+        if not hasattr(x, "_mpb_"):
+            x = abs(x)
+        return ctx.make_mpf((mpb_abs_upper(x._mpb_, ctx.prec), mag_zero))
+
+    def atan2(ctx, y, x):
+        y = ctx.convert(y)._mpb_
+        x = ctx.convert(x)._mpb_
+        return ctx.make_mpf(mpb_atan2(y, x, ctx.prec))
+
+    def fma(ctx, x, y, z, **kwargs):
+        x = ctx.convert(x)
+        y = ctx.convert(y)
+        z = ctx.convert(z)
+        if hasattr(x, "_mpb_") and hasattr(y, "_mpb_") and hasattr(z, "_mpb_"):
+            return ctx.make_mpf(mpb_fma(x._mpb_, y._mpb_, z._mpb_, ctx.prec))
+        return ctx.make_mpc(mpcb_fma(x._mpcb_, y._mpcb_, z._mpcb_, ctx.prec))
+
+    def _convert_param(ctx, x):
+        if isinstance(x, libmp.int_types):
+            return x, 'Z'
+        if isinstance(x, tuple):
+            p, q = x
+            return (ctx.mpf(p) / ctx.mpf(q), 'R')
+        x = ctx.convert(x)
+        if isinstance(x, ctx.mpf):
+            return x, 'R'
+        if isinstance(x, ctx.mpc):
+            return x, 'C'
+        raise ValueError
+
+    def _is_real_type(ctx, z):
+        return isinstance(z, ctx.mpf) or isinstance(z, int_types)
+
+    def _is_complex_type(ctx, z):
+        return isinstance(z, ctx.mpc)
+
+    def hypsum(ctx, p, q, types, coeffs, z, maxterms=6000, **kwargs):
+        coeffs = list(coeffs)
+        num = range(p)
+        den = range(p,p+q)
+        s = t = ctx.one
+        k = 0
+        while 1:
+            for i in num: t *= (coeffs[i]+k)
+            for i in den: t /= (coeffs[i]+k)
+            k += 1; t /= k; t *= z; s += t
+            if t == 0:
+                return s
+            if k > maxterms:
+                raise ctx.NoConvergence
+
+
+# Register with "numbers" ABC
+numbers.Complex.register(ballmpc)
+numbers.Real.register(ballmpf)
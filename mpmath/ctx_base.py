@@ -1,4 +1,5 @@
 import random
+from importlib import import_module
 from operator import gt, lt
 
 from . import libmp
@@ -9,12 +10,36 @@
 from .calculus.quadrature import QuadratureMethods
 from .functions.functions import SpecialFunctions
 from .functions.rszeta import RSCache
-from .identification import IdentificationMethods
 from .matrices.calculus import MatrixCalculusMethods
 from .matrices.eigen import Eigen
 from .matrices.linalg import LinearAlgebraMethods
 from .matrices.matrices import MatrixMethods
-from .visualization import VisualizationMethods
+from .usertools import Profile
+
+
+class _LazyAttribute:
+    """
+    Attribute of the contexts that is defined in a module which is only
+    imported when the attribute is first used.  The module sets the
+    attribute on its class *clsname*, from where it is copied to the
+    context class, replacing this descriptor.
+    """
+
+    def __init__(self, module, clsname):
+        self.module = module
+        self.clsname = clsname
+
+    def __set_name__(self, owner, name):
+        self.owner = owner
+        self.name = name
+
+    def __get__(self, ctx, cls=None):
+        module = import_module(self.module, __package__)
+        value = getattr(module, self.clsname).__dict__[self.name]
+        setattr(self.owner, self.name, value)
+        if ctx is None:
+            return getattr(self.owner, self.name)
+        return getattr(ctx, self.name)
 
 
 class Context:
@@ -30,16 +55,29 @@ class StandardBaseContext(Context,
     MatrixCalculusMethods,
     LinearAlgebraMethods,
     Eigen,
-    IdentificationMethods,
     OptimizationMethods,
-    ODEMethods,
-    VisualizationMethods):
+    ODEMethods):
 
     NoConvergence = libmp.NoConvergence
     ComplexResult = libmp.ComplexResult
 
+    # Constant recognition and plotting are imported on first use
+    pslq = _LazyAttribute('.identification', 'IdentificationMethods')
+    findpoly = _LazyAttribute('.identification', 'IdentificationMethods')
+    identify = _LazyAttribute('.identification', 'IdentificationMethods')
+    plot = _LazyAttribute('.visualization', 'VisualizationMethods')
+    cplot = _LazyAttribute('.visualization', 'VisualizationMethods')
+    splot = _LazyAttribute('.visualization', 'VisualizationMethods')
+    plot_ignore = _LazyAttribute('.visualization', 'VisualizationMethods')
+    default_color_function = _LazyAttribute('.visualization',
+                                            'VisualizationMethods')
+    phase_color_function = _LazyAttribute('.visualization',
+                                          'VisualizationMethods')
+
     def __init__(ctx):
         ctx._aliases = {}
+        # Active Profile instance, see profile()
+        ctx._profile = None
         # Call those that need preinitialization (e.g. for wrappers)
         SpecialFunctions.__init__(ctx)
         RSCache.__init__(ctx)
@@ -94,6 +132,9 @@ def fmul(ctx, x, y, **kwargs):
     def fdiv(ctx, x, y, **kwargs):
         return ctx.convert(x)/ctx.convert(y)
 
+    def fma(ctx, x, y, z, **kwargs):
+        return ctx.convert(x)*ctx.convert(y) + ctx.convert(z)
+
     def fsum(ctx, args, absolute=False, squared=False):
         if absolute:
             if squared:
@@ -106,11 +147,16 @@ def fsum(ctx, args, absolute=False, squared=False):
     def fdot(ctx, xs, ys=None, conjugate=False):
         if ys is not None:
             xs = zip(xs, ys)
+        fma = ctx.fma
+        s = ctx.zero
         if conjugate:
             cf = ctx.conj
-            return sum((x*cf(y) for (x,y) in xs), ctx.zero)
+            for x, y in xs:
+                s = fma(x, cf(y), s)
         else:
-            return sum((x*y for (x,y) in xs), ctx.zero)
+            for x, y in xs:
+                s = fma(x, y, s)
+        return s
 
     def fprod(ctx, args):
         prod = ctx.one
@@ -464,6 +510,53 @@ def f_maxcalls_wrapped(*args, **kwargs):
             return f(*args, **kwargs)
         return f_maxcalls_wrapped
 
+    def profile(ctx):
+        r"""
+        Returns a context manager that profiles the computations done
+        inside a ``with`` block.  For every function of mpmath called in
+        the block (both the high-level functions of the context and the
+        low-level functions of :mod:`mpmath.libmp`), it records the
+        number of calls, the cumulative time and a histogram of the
+        working precisions used.  It also logs every increase of the
+        working precision made by :func:`~mpmath.hypercomb`,
+        :func:`~mpmath.autoprec` and the summation of hypergeometric
+        series, which retry with a higher precision when the result is
+        not accurate enough and raise ``NoConvergence`` when they give
+        up::
+
+            >>> from mpmath import mp, hyperu
+            >>> mp.dps = 15
+            >>> with mp.profile() as p:
+            ...     v = hyperu(2.5, 3.25, 20)
+            >>> p.stats['mpmath.functions.bessel.hyperu'].calls
+            1
+            >>> p.stats['mpmath.functions.bessel.hyperu'].precs
+            {53: 1}
+            >>> for e in p.escalations:
+            ...     print(e)
+            Escalation(source='hypsum', target=63, prec=None, reason='maxterms')
+            Escalation(source='hypercomb', target=53, prec=109, reason='cancellation of 36 bits')
+            >>> print(p.report(limit=2))
+                 calls         time  precisions                   function
+                     1     ...  53:1                         mpmath.functions.bessel.hyperu
+                     1     ...  53:1                         mpmath.functions.hypergeometric.hypercomb
+            <BLANKLINE>
+            precision escalations:
+              hypsum: target 63, gave up (maxterms)
+              hypercomb: target 53, prec 109 (cancellation of 36 bits)
+
+        Here the asymptotic series tried first did not converge, and
+        the function fell back to a combination of convergent series,
+        which had to be evaluated again with a higher precision because
+        of cancellation.
+
+        The statistics are collected with :func:`sys.setprofile`, so
+        only the calling thread is profiled, and the computations run
+        several times slower while the block is active.  There is no
+        overhead otherwise.
+        """
+        return Profile(ctx)
+
     def rand(ctx):
         """
         Get a random number in the range ``[0.0, 1.0)`` with (almost) uniform distribution.
@@ -1,6 +1,5 @@
 import cmath
 import functools
-import inspect
 import math
 import sys
 
@@ -52,21 +51,36 @@ def dps(ctx, p):
     # Called by SpecialFunctions.__init__()
     @classmethod
     def _wrap_specfun(cls, name, f, wrap):
+        # NumPy arrays are evaluated by libfpnp.  They are detected
+        # before any conversion to float, which succeeds for arrays with
+        # one element
+        hasarray = libfp._hasarray
         if wrap:
             def f_wrapped(ctx, *args, **kwargs):
+                if hasarray(args):
+                    return ctx._apply_array(name, args, kwargs)
                 convert = ctx.convert
                 args = [convert(a) for a in args]
                 return f(ctx, *args, **kwargs)
-        else:
+        elif name.startswith('_'):
+            # Internal functions never see arrays
             f_wrapped = f
+        else:
+            def f_wrapped(ctx, *args, **kwargs):
+                if hasarray(args):
+                    return ctx._apply_array(name, args, kwargs)
+                return f(ctx, *args, **kwargs)
+        if f_wrapped is not f:
+            # For inspect.signature()
+            f_wrapped.__wrapped__ = f
         f_wrapped.__doc__ = function_docs.__dict__.get(name, f.__doc__)
-        try:
-            f_wrapped.__signature__ = inspect.signature(f)
-        except ValueError:  # pragma: no cover
-            pass
         f_wrapped.__name__ = f.__name__
         setattr(cls, name, f_wrapped)
 
+    def _apply_array(ctx, name, args, kwargs):
+        from . import libfpnp
+        return libfpnp.apply_specfun(ctx, name, args, kwargs)
+
     @functools.lru_cache
     def bernoulli(ctx, n, plus=False):
         return to_float(mpf_bernoulli(n, ctx.prec, 'n', plus=plus), strict=True)
@@ -114,6 +128,16 @@ def isnpint(ctx, x):
     mpf = float
     mpc = complex
 
+    if hasattr(math, 'fma'):  # Python 3.13+
+        def fma(ctx, x, y, z, **kwargs):
+            x, y, z = ctx.convert(x), ctx.convert(y), ctx.convert(z)
+            if type(x) is float and type(y) is float and type(z) is float:
+                try:
+                    return math.fma(x, y, z)
+                except (ValueError, OverflowError):
+                    pass
+            return x*y + z
+
     def convert(ctx, x):
         try:
             return float(x)
@@ -204,6 +228,9 @@ def _is_complex_type(ctx, z):
         return isinstance(z, complex)
 
     def hypsum(ctx, p, q, flags, coeffs, z, maxterms=6000, **kwargs):
+        if isinstance(z, (list, tuple)):
+            return [ctx.hypsum(p, q, flags, coeffs, w, maxterms, **kwargs)
+                    for w in z]
         for i, c in enumerate(coeffs[p:], start=p):
             if flags[i] == 'Z':
                 if c <= 0:
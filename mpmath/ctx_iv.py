@@ -1,4 +1,3 @@
-import inspect
 import numbers
 import sys
 
@@ -382,10 +381,11 @@ def f_wrapped(ctx, *args, **kwargs):
                 finally:
                     ctx.prec = prec
                 return +retval
+            # For inspect.signature()
+            f_wrapped.__wrapped__ = f
         else:
             f_wrapped = f
         f_wrapped.__doc__ = function_docs.__dict__.get(name, f.__doc__)
-        f_wrapped.__signature__ = inspect.signature(f)
         f_wrapped.__name__ = f.__name__
         setattr(cls, name, f_wrapped)
 
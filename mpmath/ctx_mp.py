@@ -4,6 +4,8 @@
 """
 
 import functools
+import numbers
+import os
 import re
 import sys
 
@@ -19,10 +21,13 @@
                               mpf_khinchin, mpf_mertens, mpf_twinprime)
 from .libmp.libelefun import (mpf_degree, mpf_e, mpf_ln2, mpf_ln10, mpf_phi,
                               mpf_pi)
-from .libmp.libmpc import (mpc_add, mpc_add_mpf, mpc_div, mpc_div_mpf,
+from .libmp.libmpc import (mpc_add, mpc_add_mpf, mpc_div, mpc_div_mpf, mpc_fma,
                            mpc_mpf_div, mpc_mpf_sub, mpc_mul, mpc_mul_mpf,
                            mpc_neg, mpc_sub, mpc_sub_mpf, mpc_to_str)
-from .libmp.libmpf import mpf_rand
+from .libmp.libmpf import (mpf_array_from_bytes, mpf_array_pack,
+                           mpf_array_to_bytes, mpf_array_unpack, mpf_fma,
+                           mpf_rand, read_varint, write_varint)
+from .usertools import Vectorized, _parallel_map
 
 
 get_complex = re.compile(r"""
@@ -62,8 +67,6 @@ def __init__(ctx, prec=sys.float_info.mant_dig,
 
         ctx.init_builtins()
 
-        ctx.hyp_summators = {}
-
         ctx._init_aliases()
 
         ctx.bernoulli.__func__.__doc__ = function_docs.bernoulli
@@ -269,6 +272,312 @@ def cospi_sinpi(ctx, x, prec=None, dps=None, rounding=round_nearest, exact=False
         else:
             return ctx.cos(x, **kwargs), ctx.sin(x, **kwargs)
 
+    def _eval_many(ctx, xs, mpf_f_many, f, wrap, prec, dps, rounding):
+        xs = [x if type(x) in ctx.types else ctx.convert(x) for x in xs]
+        if prec is not None and dps is not None:
+            raise ValueError("prec and dps can't be specified together")
+        kwargs = {}
+        if prec is not None:
+            kwargs['prec'] = prec
+        if dps is not None:
+            kwargs['dps'] = dps
+        if rounding is not None:
+            kwargs['rounding'] = rounding
+        prec, rounding = ctx._parse_prec(kwargs)
+        if not prec:
+            raise ValueError("exact evaluation is not supported")
+        if all(hasattr(x, '_mpf_') for x in xs):
+            try:
+                return [wrap(v) for v in
+                        mpf_f_many([x._mpf_ for x in xs], prec, rounding)]
+            except ComplexResult:
+                if ctx.trap_complex:
+                    raise
+        return [f(x, prec=prec, rounding=rounding) for x in xs]
+
+    def exp_many(ctx, xs, *, prec=None, dps=None, rounding=None):
+        r"""
+        Computes `\exp(x)` for each number in the sequence *xs*,
+        returning a list.  The result is the same as
+        ``[exp(x) for x in xs]``, but for real arguments the setup work
+        (computation or lookup of the fixed-point constant `\log 2` used
+        for argument reduction) is done once for the whole batch rather
+        than once per point.  This is noticeably faster when many points
+        are evaluated at the same precision.
+
+        The optional keyword arguments *prec*, *dps* and *rounding* have
+        the same meaning as for :func:`~mpmath.exp`.
+
+            >>> from mpmath import mp, exp_many
+            >>> mp.dps = 15
+            >>> exp_many([0, 1, -2.5, 10])
+            [mpf('1.0'), mpf('2.7182818284590451'), mpf('0.0820849986238988'), mpf('22026.465794806718')]
+            >>> exp_many([1, 1j])
+            [mpf('2.7182818284590451'), mpc(real='0.54030230586813977', imag='0.8414709848078965')]
+
+        """
+        return ctx._eval_many(xs, libmp.libelefun.mpf_exp_many, ctx.exp,
+                              ctx.make_mpf, prec, dps, rounding)
+
+    def log_many(ctx, xs, *, prec=None, dps=None, rounding=None):
+        r"""
+        Computes the natural logarithm `\log(x)` for each number in the
+        sequence *xs*, returning a list.  The result is the same as
+        ``[ln(x) for x in xs]``, but for real arguments the fixed-point
+        constant `\log 2` used for argument reduction is computed or
+        looked up only once per batch.
+
+        The optional keyword arguments *prec*, *dps* and *rounding* have
+        the same meaning as for :func:`~mpmath.ln`.  Negative real
+        arguments give complex results, as with :func:`~mpmath.ln`.
+
+            >>> from mpmath import mp, log_many
+            >>> mp.dps = 15
+            >>> log_many([1, 2, 1000, 0.25])
+            [mpf('0.0'), mpf('0.69314718055994529'), mpf('6.9077552789821368'), mpf('-1.3862943611198906')]
+            >>> log_many([2, -1])
+            [mpf('0.69314718055994529'), mpc(real='0.0', imag='3.1415926535897931')]
+
+        """
+        return ctx._eval_many(xs, libmp.libelefun.mpf_ln_many, ctx.ln,
+                              ctx.make_mpf, prec, dps, rounding)
+
+    def cos_sin_many(ctx, xs, *, prec=None, dps=None, rounding=None):
+        r"""
+        Computes the pair `(\cos(x), \sin(x))` for each number in the
+        sequence *xs*, returning a list of pairs.  The result is the same
+        as ``[cos_sin(x) for x in xs]``, but for real arguments the
+        fixed-point value of `\pi` used for argument reduction is computed
+        or looked up only once per batch.
+
+        The optional keyword arguments *prec*, *dps* and *rounding* have
+        the same meaning as for :func:`~mpmath.cos`.
+
+            >>> from mpmath import mp, cos_sin_many, pi
+            >>> mp.dps = 15
+            >>> for c, s in cos_sin_many([0, 1, pi/6, 1e10]):
+            ...     print(c, s)
+            ...
+            1.0 0.0
+            0.54030230586814 0.841470984807897
+            0.866025403784439 0.5
+            0.873119622676856 -0.487506025087511
+
+        """
+        make_mpf = ctx.make_mpf
+        return ctx._eval_many(xs, libmp.libelefun.mpf_cos_sin_many,
+                              ctx.cos_sin,
+                              lambda cs: (make_mpf(cs[0]), make_mpf(cs[1])),
+                              prec, dps, rounding)
+
+    def cache_info(ctx):
+        """
+        Returns statistics for the internal caches of precomputed values
+        (Taylor coefficients, Bernoulli numbers, logarithms of integers,
+        quadrature nodes, etc.).  The result is a dict
+        mapping the name of each cache to a named tuple
+        ``(hits, misses, entries, nbytes)``, where *nbytes* is the
+        approximate memory used by the cache::
+
+            >>> from mpmath import mp, log, cache_clear, cache_info
+            >>> mp.dps = 15
+            >>> cache_clear()
+            >>> _ = log(3)
+            >>> _ = log(3)
+            >>> cache_info()['log_taylor_cache']
+            CacheInfo(hits=1, misses=1, entries=1, nbytes=...)
+
+        See also :func:`~mpmath.cache_clear` and
+        :func:`~mpmath.set_cache_budget`.
+        """
+        return libmp.libcache.cache_info()
+
+    def cache_clear(ctx, name=None):
+        """
+        Clears the internal cache with the given name, or all of them
+        (see :func:`~mpmath.cache_info`), and resets their statistics.
+        """
+        libmp.libcache.cache_clear(name)
+
+    def set_cache_budget(ctx, nbytes):
+        """
+        Limits the total memory used by the internal caches listed by
+        :func:`~mpmath.cache_info` to approximately *nbytes* bytes.
+        When the limit is exceeded, the least recently used entries
+        are removed, across all caches.  With ``nbytes=None`` (the
+        default), the caches may grow without limit.
+
+        This is useful for long-running processes that evaluate
+        functions or integrals at many different precisions.
+        """
+        libmp.libcache.set_budget(nbytes)
+
+    def set_cache_dir(ctx, path):
+        r"""
+        Sets a directory where mathematical constants (`\pi`, `e`,
+        `\gamma`, `\log 2`, ...) and tables of Bernoulli numbers are
+        saved once computed at a precision of at least 10000 bits, and
+        from where they are loaded by later computations, including in
+        other processes, instead of being computed again.  The
+        directory is created if needed.  With ``path=None``, the
+        default, no values are saved or loaded.  The directory can
+        also be set with the environment variable ``MPMATH_CACHE_DIR``.
+
+        The compiled code of the functions generated to sum
+        hypergeometric series of each shape (numbers and types of
+        parameters) is also saved there.  The code for common shapes
+        can be generated in advance, e.g. when setting up an
+        environment, with ``mpmath.libmp.libhyper.prebuild_summators()``.
+
+        So are the nodes of the tanh-sinh and Gauss-Legendre rules of
+        :func:`~mpmath.quad` computed at a precision of at least 1000
+        bits, keyed by the rule, the degree and the precision.  Node
+        sets can be generated in advance with the command
+        ``python -m mpmath.calculus --dps 500,1000 -d DIRECTORY``
+        (see ``--help`` for the options).
+
+        The files are written atomically, so the directory may be
+        shared by concurrently running processes.  Files that cannot
+        be read or decoded are ignored and the values are computed
+        again.
+
+        .. warning::
+
+            The summation functions are stored as marshalled Python
+            bytecode, which is executed when loaded.  Anyone who can
+            write to the directory can therefore run arbitrary code
+            in the processes using it: the directory must not be
+            writable by untrusted users.
+        """
+        libmp.libstore.set_store(path)
+
+    def set_constant_workers(ctx, n):
+        r"""
+        Sets the number of worker processes used to compute the
+        constants `\pi`, `e`, `\log 2`, `\log 10`, `\zeta(3)` and
+        Catalan's constant at a precision of 100000 bits or more.
+        Their series are summed by binary splitting, and with ``n > 1``
+        the range of terms is divided between *n* processes, whose
+        partial results are then combined.  The default, ``n = 1``,
+        does all the work in the current process.
+
+        Note that the worker processes import mpmath, so on platforms
+        that do not fork, the main module must be importable without
+        side effects (see :mod:`multiprocessing`).
+        """
+        if n < 1:
+            raise ValueError("the number of workers must be positive")
+        libmp.libelefun.BS_WORKERS = int(n)
+
+    def vectorize(ctx, f, *, nout=1, prec=None, dps=None, workers=None,
+                  chunksize=None):
+        r"""
+        Returns a version of the function *f* that is evaluated
+        elementwise on NumPy arrays, like a NumPy ufunc.  It is similar
+        to ``numpy.frompyfunc(f, nin, nout)``, but:
+
+        * *f* is evaluated with the working precision given by *prec*
+          or *dps* (by default, the precision of the context at the
+          time of the call), and the arguments are converted to
+          ``mpf`` or ``mpc`` numbers at this precision, a whole array
+          at a time (see ``mp.npconvert()``).  The precision can
+          also be given as a keyword argument in each call.
+        * The arguments may be arrays of any numeric or object dtype,
+          lists or scalars; they are broadcast together.
+        * The result is written to the arrays given by the keyword
+          argument *out*, if any, so that preallocated arrays,
+          possibly of dtype ``float`` or ``complex``, can be reused.
+          Otherwise arrays of ``dtype=object`` are returned.
+        * With ``workers=n``, the elements are divided into chunks of
+          *chunksize* elements (by default, about four per worker),
+          which are evaluated by a pool of *n* processes.  The
+          numbers are sent to and from the workers in the format of
+          :func:`~mpmath.dumps`, along with the settings of the context
+          (``prec``, ``rounding``, ``trap_complex``, ``pretty`` and
+          ``pretty_dps``).
+
+        If *f* returns a tuple of *nout* values, a tuple of *nout*
+        arrays is returned.  Example::
+
+            import numpy as np
+            from mpmath import mp
+            gamma = mp.vectorize(mp.gamma, dps=50)
+            x = np.linspace(0.5, 10, 1000)
+            y = gamma(x)                    # array of 1000 mpf values
+            z = np.empty(x.shape)
+            gamma(x, out=z, dps=20)         # y rounded to float
+            cs = mp.vectorize(mp.cos_sin, nout=2, workers=4)
+            c, s = cs(x)
+
+        The function must be picklable to be evaluated by worker
+        processes, e.g. a function of ``mp`` or a function defined at
+        the top level of a module; its results are converted with
+        :func:`~mpmath.mpmathify`.  As with
+        :func:`~mpmath.set_constant_workers`, on platforms that do not
+        fork, the main module must be importable without side effects.
+        """
+        return Vectorized(ctx, f, nout, prec, dps, workers, chunksize)
+
+    def parallel_map(ctx, f, iterable, *, workers=None, chunksize=1,
+                     stream=False, ordered=True):
+        r"""
+        Computes ``f(x)`` for each item *x* of *iterable* in a pool of
+        *workers* processes (by default, one per CPU), returning the
+        list of results in the same order as the items::
+
+            >>> from mpmath import mp, parallel_map
+            >>> mp.dps = 30
+            >>> parallel_map(mp.zeta, [2, 3, 4], workers=2)
+            [mpf('1.64493406684822643647241516664595'), mpf('1.20205690315959428539973816151152'), mpf('1.08232323371113819151600369654114')]
+            >>> _ == [mp.zeta(2), mp.zeta(3), mp.zeta(4)]
+            True
+
+        The workers use the settings of the context at the time of the
+        call (``prec``, ``rounding``, ``trap_complex``, ``pretty`` and
+        ``pretty_dps``).  The items are sent to the workers, and the
+        results back, in groups of *chunksize* items; larger groups
+        reduce the overhead when *f* is fast.  Numbers contained in the
+        items and results (also in tuples, lists, matrices, etc.) are
+        transferred in the compact format of :func:`~mpmath.dumps`, and
+        other objects are pickled.
+
+        With ``stream=True``, an iterator is returned instead of a list.
+        The items are read from *iterable* as needed, and the results
+        are available as soon as they have been computed.  If also
+        ``ordered=False``, pairs ``(i, f(x))``, where *i* is the index
+        of *x* in *iterable*, are generated in the order in which the
+        results are completed::
+
+            >>> mp.dps = 15
+            >>> results = parallel_map(mp.exp, range(5), workers=2,
+            ...                        stream=True, ordered=False)
+            >>> for i, y in sorted(results):
+            ...     print(i, y)
+            ...
+            0 1.0
+            1 2.71828182845905
+            2 7.38905609893065
+            3 20.0855369231877
+            4 54.5981500331442
+
+        Exceptions raised by *f* are raised again when the corresponding
+        result is reached.  The function *f* must be picklable, e.g. a
+        function of ``mp`` or a function defined at the top level of a
+        module.  As with :func:`~mpmath.set_constant_workers`, on
+        platforms that do not fork, the main module must be importable
+        without side effects.  With ``workers=1``, *f* is evaluated in
+        the current process.
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1 or chunksize < 1:
+            raise ValueError("workers and chunksize must be positive")
+        results = _parallel_map(ctx, f, iterable, workers, chunksize,
+                                ordered or not stream)
+        if stream:
+            return results
+        return list(results)
+
     def clone(ctx):
         """
         Create a copy of the context, with the same working precision.
@@ -534,11 +843,17 @@ def f_autoprec_wrapped(*args, **kwargs):
                             % (prec, prec2, -err))
                     v1 = v2
                     if prec2 >= maxprec2:
+                        if ctx._profile is not None:
+                            ctx._profile.escalate('autoprec', prec, None,
+                                                  'maxprec')
                         raise ctx.NoConvergence(\
                         "autoprec: prec increased to %i without convergence"\
                         % prec2)
                     prec2 += int(prec2*2)
                     prec2 = min(prec2, maxprec2)
+                    if ctx._profile is not None:
+                        ctx._profile.escalate('autoprec', prec, prec2,
+                                              'accuracy %s bits' % -err)
             finally:
                 ctx.prec = prec
             return +v2
@@ -625,6 +940,248 @@ def _convert_fallback(ctx, x, strings):
     def mpmathify(ctx, *args, **kwargs):
         return ctx.convert(*args, **kwargs)
 
+    # Binary serialization format.  Each object written by dumps() is
+    # a header (magic string, format version, varint payload length)
+    # followed by a record: a tag byte and the data.  Numbers are stored
+    # in blocks: the count, a kind byte (all real, all complex or mixed,
+    # followed in the latter case by one byte per entry), an mpf array
+    # with the real parts and an mpf array with the nonzero imaginary
+    # parts; see mpf_array_to_bytes().
+
+    _dump_magic = b'\x93MPM\x01'
+
+    def _dump_numbers(ctx, xs, out):
+        convert = ctx.convert
+        re = []
+        im = []
+        kinds = bytearray()
+        for x in xs:
+            if not hasattr(x, '_mpf_') and not hasattr(x, '_mpc_'):
+                x = convert(x)
+            if hasattr(x, '_mpf_'):
+                re.append(x._mpf_)
+                kinds.append(0)
+            else:
+                a, b = x._mpc_
+                re.append(a)
+                im.append(b)
+                kinds.append(1)
+        write_varint(len(kinds), out)
+        if not im:
+            out.append(0)
+        elif len(im) == len(re):
+            out.append(1)
+        else:
+            out.append(2)
+            out += kinds
+        mpf_array_to_bytes(*mpf_array_pack(re), out)
+        mpf_array_to_bytes(*mpf_array_pack(im), out)
+
+    def _load_numbers(ctx, data, pos):
+        n, pos = read_varint(data, pos)
+        kind = data[pos]
+        pos += 1
+        if kind == 2:
+            kinds = data[pos:pos+n]
+            pos += n
+        elif kind in (0, 1):
+            kinds = bytes([kind]) * n
+        else:
+            raise ValueError("invalid data")
+        mans, exps, pos = mpf_array_from_bytes(data, pos)
+        re = mpf_array_unpack(mans, exps)
+        mans, exps, pos = mpf_array_from_bytes(data, pos)
+        im = iter(mpf_array_unpack(mans, exps))
+        if len(re) != n or len(kinds) != n:
+            raise ValueError("invalid data")
+        make_mpf = ctx.make_mpf
+        make_mpc = ctx.make_mpc
+        return [make_mpc((a, next(im))) if k else make_mpf(a)
+                for a, k in zip(re, kinds)], pos
+
+    def _dump_record(ctx, x, out):
+        if hasattr(x, '_mpf_') or hasattr(x, '_mpc_'):
+            out += b'n'
+            ctx._dump_numbers([x], out)
+        elif isinstance(x, ctx.vector):
+            out += b'v'
+            mpf_array_to_bytes(x._mans, x._exps, out)
+        elif isinstance(x, ctx.matrix):
+            out += b'm'
+            rows, cols = x.rows, x.cols
+            write_varint(rows, out)
+            write_varint(cols, out)
+            get = x._data.get
+            zero = ctx.zero
+            ctx._dump_numbers([get((i, j), zero) for i in range(rows)
+                               for j in range(cols)], out)
+        elif isinstance(x, (list, tuple)):
+            seqtypes = (list, tuple, ctx.matrix, ctx.vector)
+            if not any(isinstance(y, seqtypes) for y in x):
+                out += b'l'
+                ctx._dump_numbers(x, out)
+            else:
+                out += b's'
+                write_varint(len(x), out)
+                for y in x:
+                    ctx._dump_record(y, out)
+        else:
+            out += b'n'
+            ctx._dump_numbers([x], out)
+
+    def _load_record(ctx, data, pos):
+        tag = data[pos:pos+1]
+        pos += 1
+        if tag == b'n':
+            xs, pos = ctx._load_numbers(data, pos)
+            if len(xs) != 1:
+                raise ValueError("invalid data")
+            return xs[0], pos
+        if tag == b'l':
+            return ctx._load_numbers(data, pos)
+        if tag == b'v':
+            mans, exps, pos = mpf_array_from_bytes(data, pos)
+            return ctx.vector._from_array(mans, exps), pos
+        if tag == b'm':
+            rows, pos = read_varint(data, pos)
+            cols, pos = read_varint(data, pos)
+            xs, pos = ctx._load_numbers(data, pos)
+            if len(xs) != rows*cols:
+                raise ValueError("invalid data")
+            A = ctx.matrix(rows, cols)
+            A._data = {(k // cols, k % cols): x
+                       for k, x in enumerate(xs) if x}
+            return A, pos
+        if tag == b's':
+            n, pos = read_varint(data, pos)
+            xs = []
+            for _ in range(n):
+                x, pos = ctx._load_record(data, pos)
+                xs.append(x)
+            return xs, pos
+        raise ValueError("invalid data")
+
+    def dumps(ctx, x):
+        r"""
+        Serializes *x* in a compact binary format, returning a
+        :class:`bytes` object that can be converted back with
+        :func:`~mpmath.loads`.  The argument may be a number, a
+        :class:`~mpmath.vector`, a matrix, or a list or tuple of such
+        objects (lists may be nested).  Other numbers are converted
+        with :func:`~mpmath.mpmathify` first.
+
+        The format stores the signs, exponents and binary mantissas of
+        the values directly, so it is much smaller and faster to read
+        and write than pickled or printed numbers.  Numbers are stored
+        exactly and loaded without rounding, whatever the working
+        precision::
+
+            >>> from mpmath import mp, dumps, loads, matrix, mpf, mpc, pi
+            >>> mp.dps = 50
+            >>> s = dumps(pi)
+            >>> len(s)
+            40
+            >>> mp.dps = 15
+            >>> mp.pi == loads(s)
+            False
+            >>> mp.dps = 50
+            >>> mp.pi == loads(s)
+            True
+            >>> mp.dps = 15
+            >>> loads(dumps([1, 2.5, mpc(1, 2)]))
+            [mpf('1.0'), mpf('2.5'), mpc(real='1.0', imag='2.0')]
+            >>> loads(dumps(matrix([[1, 2], [3, 4]])))
+            matrix(
+            [['1.0', '2.0'],
+             ['3.0', '4.0']])
+
+        Tuples are loaded as lists.
+        """
+        out = bytearray()
+        ctx._dump_record(x, out)
+        head = bytearray(ctx._dump_magic)
+        write_varint(len(out), head)
+        return bytes(head + out)
+
+    def loads(ctx, data):
+        """
+        Loads an object serialized with :func:`~mpmath.dumps` from the
+        bytes-like object *data*.  A :class:`ValueError` is raised if
+        *data* does not contain exactly one valid object.
+        """
+        data = memoryview(data)
+        magic = ctx._dump_magic
+        if bytes(data[:len(magic)]) != magic:
+            raise ValueError("invalid data")
+        size, pos = read_varint(data, len(magic))
+        if len(data) != pos + size:
+            raise ValueError("invalid data")
+        x, pos = ctx._load_record(data, pos)
+        if pos != len(data):
+            raise ValueError("invalid data")
+        return x
+
+    def dump(ctx, x, file):
+        """
+        Writes *x* to the binary file object *file* in the format of
+        :func:`~mpmath.dumps`.  Several objects may be written to the same
+        file; they can be read back one at a time with
+        :func:`~mpmath.load` or :func:`~mpmath.iterload`.
+        """
+        file.write(ctx.dumps(x))
+
+    def load(ctx, file):
+        """
+        Reads one object written by :func:`~mpmath.dump` from the binary
+        file object *file*.  Raises :class:`EOFError` if the end of the
+        file has been reached.
+        """
+        magic = ctx._dump_magic
+        head = bytearray(file.read(len(magic)))
+        if not head:
+            raise EOFError
+        if head != magic:
+            raise ValueError("invalid data")
+        while True:
+            b = file.read(1)
+            if not b:
+                raise ValueError("truncated data")
+            head += b
+            if b[0] < 0x80:
+                break
+        size, pos = read_varint(head, len(magic))
+        data = head + file.read(size)
+        if len(data) != pos + size:
+            raise ValueError("truncated data")
+        return ctx.loads(data)
+
+    def iterload(ctx, file):
+        """
+        Iterates over the objects written by :func:`~mpmath.dump` to the
+        binary file object *file*, reading them one at a time::
+
+            >>> from mpmath import mp, dump, iterload, mpf
+            >>> import io
+            >>> f = io.BytesIO()
+            >>> for k in range(1, 4):
+            ...     dump(mpf(1)/k, f)
+            ...
+            >>> _ = f.seek(0)
+            >>> for x in iterload(f):
+            ...     print(x)
+            ...
+            1.0
+            0.5
+            0.333333333333333
+
+        """
+        while True:
+            try:
+                x = ctx.load(file)
+            except EOFError:
+                return
+            yield x
+
     _MPFR_rounding_map = {'N': 'n',
                           'D': 'f',
                           'U': 'c',
@@ -664,12 +1221,18 @@ def _parse_prec(ctx, kwargs):
 maxterms, or set zeroprec."""
 
     def hypsum(ctx, p, q, flags, coeffs, z, accurate_small=True, **kwargs):
+        if isinstance(z, (list, tuple)):
+            return ctx._hypsum_many(p, q, flags, coeffs, z, accurate_small,
+                                    **kwargs)
         if hasattr(z, "_mpf_"):
             key = p, q, flags, 'R'
             v = z._mpf_
         elif hasattr(z, "_mpc_"):
             key = p, q, flags, 'C'
             v = z._mpc_
+        elif isinstance(z, numbers.Rational) and type(z) is not int:
+            key = p, q, flags, 'R'
+            v = z = MPQ(z.numerator, z.denominator)
         for i, c in enumerate(coeffs[p:], start=p):
             if flags[i] == 'Z':
                 if c <= 0:
@@ -694,10 +1257,8 @@ def hypsum(ctx, p, q, flags, coeffs, z, accurate_small=True, **kwargs):
                     for i in den: t /= (coeffs[i]+k)
                     t /= (k+1)
                 return t
-        if key not in ctx.hyp_summators:
-            ctx.hyp_summators[key] = libmp.libhyper.make_hyp_summator(key)[1]
-        summator = ctx.hyp_summators[key]
         prec = ctx.prec
+        summator = libmp.libhyper.hyp_summator(key, prec, v)
         maxprec = kwargs.get('maxprec', ctx._default_hyper_maxprec(prec))
         extraprec = 50
         epsshift = 25
@@ -721,14 +1282,21 @@ def hypsum(ctx, p, q, flags, coeffs, z, accurate_small=True, **kwargs):
             max_total_jump += abs(d)
         while 1:
             if extraprec > maxprec:
+                if ctx._profile is not None:
+                    ctx._profile.escalate('hypsum', prec, None, 'maxprec')
                 raise ctx.NoConvergence(ctx._hypsum_msg % (prec, prec+extraprec))
             wp = prec + extraprec
             if magnitude_check:
                 mag_dict = dict((n,None) for n in magnitude_check)
             else:
                 mag_dict = {}
-            zv, have_complex, magnitude = summator(coeffs, v, prec, wp, \
-                epsshift, mag_dict, **kwargs)
+            try:
+                zv, have_complex, magnitude = summator(coeffs, v, prec, wp, \
+                    epsshift, mag_dict, **kwargs)
+            except ctx.NoConvergence:
+                if ctx._profile is not None:
+                    ctx._profile.escalate('hypsum', prec, None, 'maxterms')
+                raise
             cancel = -magnitude
             jumps_resolved = True
             if extraprec < max_total_jump:
@@ -755,6 +1323,9 @@ def hypsum(ctx, p, q, flags, coeffs, z, accurate_small=True, **kwargs):
             # Possible workaround for bad roundoff in fixed-point arithmetic
             epsshift += 5
             extraprec += 5
+            if ctx._profile is not None:
+                ctx._profile.escalate('hypsum', prec, prec + extraprec,
+                    'jumps' if not jumps_resolved else 'cancellation')
 
         if type(zv) is tuple:
             if have_complex:
@@ -764,6 +1335,54 @@ def hypsum(ctx, p, q, flags, coeffs, z, accurate_small=True, **kwargs):
         else:
             return zv
 
+    def _hypsum_many(ctx, p, q, flags, coeffs, zs, accurate_small=True,
+                     **kwargs):
+        # The series for all real (and for all complex) arguments are
+        # summed at once at the initial working precision of hypsum().
+        # The arguments for which this is not accurate enough, or that
+        # need special care, are then handled separately by hypsum().
+        values = [None] * len(zs)
+        for i, c in enumerate(coeffs[p:], start=p):
+            if flags[i] == 'Z':
+                near_pole = c <= 0
+            else:
+                n, d = ctx.nint_distance(c)
+                near_pole = n <= 0 and d < -4
+            if near_pole:
+                break
+        else:
+            prec = ctx.prec
+            extraprec = 50
+            for ztype in 'RC':
+                if ztype == 'R':
+                    index = [i for i, z in enumerate(zs)
+                             if hasattr(z, "_mpf_") and ctx.isfinite(z)]
+                    v = [zs[i]._mpf_ for i in index]
+                else:
+                    index = [i for i, z in enumerate(zs)
+                             if hasattr(z, "_mpc_") and ctx.isfinite(z)]
+                    v = [zs[i]._mpc_ for i in index]
+                if not index:
+                    continue
+                summator = libmp.libhyper.hyp_summator((p, q, flags,
+                                                        ztype + '*'))
+                try:
+                    results = summator(coeffs, v, prec, prec + extraprec, 25,
+                                       **kwargs)
+                except ctx.NoConvergence:
+                    continue
+                for i, (zv, have_complex, magnitude) in zip(index, results):
+                    if -magnitude < extraprec-25-5 or not accurate_small:
+                        if have_complex:
+                            values[i] = ctx.make_mpc(zv)
+                        else:
+                            values[i] = ctx.make_mpf(zv)
+        for i, z in enumerate(zs):
+            if values[i] is None:
+                values[i] = ctx.hypsum(p, q, flags, coeffs, z, accurate_small,
+                                       **kwargs)
+        return values
+
     def ldexp(ctx, x, n):
         r"""
         Computes `x 2^n` efficiently. No rounding is performed.
@@ -1142,6 +1761,51 @@ def fdiv(ctx, x, y, prec=None, dps=None, rounding=round_nearest, exact=False):
                 return ctx.make_mpc(mpc_div(x._mpc_, y._mpc_, prec, rounding))
         raise ValueError("Arguments need to be mpf or mpc compatible numbers")
 
+    def fma(ctx, x, y, z, *, prec=None, dps=None, rounding=None, exact=False):
+        """
+        Computes the fused multiply-add `x y + z`, giving a floating-point
+        result with a single rounding.  The product `x y` is not rounded
+        before the addition, which is more accurate (and usually faster)
+        than computing ``x*y + z`` with two rounding steps.
+
+        The precision and rounding mode can be controlled as for
+        :func:`~mpmath.fadd`; the default is the working precision and
+        rounding mode of the context.
+
+        **Examples**
+
+            >>> from mpmath import fma, mpf
+            >>> x = 1 + mpf(2)**-30
+            >>> x*x - 1
+            mpf('1.862645149230957e-9')
+            >>> fma(x, x, -1)
+            mpf('1.8626451500983188e-9')
+            >>> fma(x, x, -1, exact=True) == mpf(2)**-29 + mpf(2)**-60
+            True
+            >>> fma(2+3j, 1j, 0.5)
+            mpc(real='-2.5', imag='2.0')
+
+        """
+        if prec is None and dps is None and rounding is None and not exact:
+            prec, rounding = ctx._prec_rounding
+        else:
+            kwargs = {'prec': prec, 'dps': dps, 'exact': exact}
+            if rounding is not None:
+                kwargs['rounding'] = rounding
+            prec, rounding = ctx._parse_prec(kwargs)
+        x = ctx.convert(x)
+        y = ctx.convert(y)
+        z = ctx.convert(z)
+        try:
+            if hasattr(x, '_mpf_') and hasattr(y, '_mpf_') and hasattr(z, '_mpf_'):
+                return ctx.make_mpf(mpf_fma(x._mpf_, y._mpf_, z._mpf_,
+                                            prec, rounding))
+            x, y, z = [a._mpc_ if hasattr(a, '_mpc_') else (a._mpf_, fzero)
+                       for a in (x, y, z)]
+            return ctx.make_mpc(mpc_fma(x, y, z, prec, rounding))
+        except (ValueError, OverflowError):
+            raise OverflowError(ctx._exact_overflow_msg)
+
     def nint_distance(ctx, x):
         r"""
         Return `(n,d)` where `n` is the nearest integer to `x` and `d` is
@@ -1,4 +1,3 @@
-import inspect
 import numbers
 import sys
 
@@ -17,7 +16,10 @@
                            mpc_mul_mpf, mpc_neg, mpc_pos, mpc_sub, mpc_sub_mpf,
                            mpc_to_complex, mpc_to_str)
 from .libmp.libmpf import (format_mpc, format_mpf, from_Decimal, from_npfloat,
-                           mpf_hash, mpf_pos, mpf_sum, to_fixed)
+                           mpf_add_array, mpf_array_get, mpf_array_pack,
+                           mpf_array_pos, mpf_div_array, mpf_hash,
+                           mpf_mul_array, mpf_neg_array, mpf_pos,
+                           mpf_sqrt_array, mpf_sub_array, mpf_sum, to_fixed)
 
 
 new = object.__new__
@@ -34,6 +36,10 @@ def _make_mpc(x, y):
     from mpmath import mp
     return mp.mpc(x, y)
 
+def _make_vector(mans, exps):
+    from mpmath import mp
+    return mp.vector._from_array(mans, exps)
+
 
 class _mpf(mpnumeric):
     """
@@ -781,6 +787,149 @@ def __format__(self, format_spec):
                           ctx.shortest_str)
 
 
+class _vector:
+    """
+    A vector of real floating-point numbers.
+
+    The values are stored compactly as parallel lists of mantissas
+    and exponents rather than as separate ``mpf`` instances.  Arithmetic
+    operations are performed elementwise by batched low-level kernels,
+    which avoids the creation of intermediate objects and the type
+    dispatch done for each element by ``mpf`` arithmetic.  The other
+    operand can be a vector of the same length or a real number.
+
+        >>> from mpmath import mp, vector
+        >>> v = vector([1, 2, 3])
+        >>> v
+        vector(['1.0', '2.0', '3.0'])
+        >>> v*v + 1
+        vector(['2.0', '5.0', '10.0'])
+        >>> (1/v).sqrt()[1]
+        mpf('0.70710678118654757')
+        >>> mp.fsum(v/2)
+        mpf('3.0')
+
+    Like ``mpf``, the entries are rounded to the working precision
+    on creation and after each operation.
+    """
+
+    __slots__ = ['_mans', '_exps']
+
+    def __init__(self, data=()):
+        ctx = self.context
+        prec, rounding = ctx._prec_rounding
+        convert = ctx.convert
+        xs = []
+        for x in data:
+            if not hasattr(x, '_mpf_'):
+                x = convert(x)
+                if not hasattr(x, '_mpf_'):
+                    raise TypeError("vector entries must be real")
+            xs.append(x._mpf_)
+        self._mans, self._exps = mpf_array_pos(*mpf_array_pack(xs),
+                                               prec, rounding)
+
+    @classmethod
+    def _from_array(cls, mans, exps):
+        v = new(cls)
+        v._mans = mans
+        v._exps = exps
+        return v
+
+    def __reduce__(self): return _make_vector, (self._mans, self._exps)
+
+    def __len__(self):
+        return len(self._mans)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._from_array(self._mans[key], self._exps[key])
+        return self.context.make_mpf(mpf_array_get(self._mans[key],
+                                                   self._exps[key]))
+
+    def __setitem__(self, key, value):
+        ctx = self.context
+        value = ctx.convert(value)
+        if not hasattr(value, '_mpf_'):
+            raise TypeError("vector entries must be real")
+        sign, man, exp, bc = mpf_pos(value._mpf_, *ctx._prec_rounding)
+        self._mans[key] = -man if sign else man
+        self._exps[key] = exp
+
+    def __iter__(self):
+        make_mpf = self.context.make_mpf
+        for m, e in zip(self._mans, self._exps):
+            yield make_mpf(mpf_array_get(m, e))
+
+    def tolist(self):
+        """Return the entries as a list of ``mpf`` instances."""
+        return list(self)
+
+    def __repr__(self):
+        return 'vector(%r)' % [str(x) for x in self]
+
+    def __str__(self):
+        return '[%s]' % ', '.join(str(x) for x in self)
+
+    def __eq__(self, other):
+        if not isinstance(other, _vector):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def _coerce(self, other):
+        if isinstance(other, _vector):
+            if len(other) != len(self):
+                raise ValueError("vectors must have the same length")
+            return other._mans, other._exps
+        ctx = self.context
+        try:
+            other = ctx.convert(other, strings=False)
+        except TypeError:
+            return NotImplemented
+        if not hasattr(other, '_mpf_'):
+            return NotImplemented
+        sign, man, exp, bc = other._mpf_
+        n = len(self)
+        return [-man if sign else man]*n, [exp]*n
+
+    def _binop(self, other, kernel, reverse=False):
+        other = self._coerce(other)
+        if other is NotImplemented:
+            return other
+        prec, rounding = self.context._prec_rounding
+        if reverse:
+            args = other + (self._mans, self._exps)
+        else:
+            args = (self._mans, self._exps) + other
+        return self._from_array(*kernel(*args, prec, rounding))
+
+    def __add__(self, other): return self._binop(other, mpf_add_array)
+    def __radd__(self, other): return self._binop(other, mpf_add_array, True)
+    def __sub__(self, other): return self._binop(other, mpf_sub_array)
+    def __rsub__(self, other): return self._binop(other, mpf_sub_array, True)
+    def __mul__(self, other): return self._binop(other, mpf_mul_array)
+    def __rmul__(self, other): return self._binop(other, mpf_mul_array, True)
+    def __truediv__(self, other): return self._binop(other, mpf_div_array)
+    def __rtruediv__(self, other):
+        return self._binop(other, mpf_div_array, True)
+
+    def __neg__(self):
+        prec, rounding = self.context._prec_rounding
+        return self._from_array(*mpf_neg_array(self._mans, self._exps,
+                                               prec, rounding))
+
+    def __pos__(self):
+        prec, rounding = self.context._prec_rounding
+        return self._from_array(*mpf_array_pos(self._mans, self._exps,
+                                               prec, rounding))
+
+    def sqrt(self):
+        """Return the vector of square roots of the entries."""
+        prec, rounding = self.context._prec_rounding
+        return self._from_array(*mpf_sqrt_array(self._mans, self._exps,
+                                                prec, rounding))
+
+
 complex_types = (complex, _mpc)
 
 
@@ -797,6 +946,8 @@ def __init__(ctx):
         ctx.constant = type('constant', (_constant,), {})
         ctx.constant._ctxdata = [ctx.mpf, new, ctx._prec_rounding]
         ctx.constant.context = ctx
+        ctx.vector = type('vector', (_vector,), {})
+        ctx.vector.context = ctx
 
     def make_mpf(ctx, v):
         a = new(ctx.mpf)
@@ -865,7 +1016,8 @@ def convert(ctx, x, strings=True):
         if isinstance(x, float): return ctx.make_mpf(from_float(x))
         if isinstance(x, complex):
             return ctx.make_mpc((from_float(x.real), from_float(x.imag)))
-        if type(x).__module__ == 'numpy': return ctx.npconvert(x)
+        if type(x).__module__ == 'numpy' and not getattr(x, 'ndim', 0):
+            return ctx.npconvert(x)
         prec, rounding = ctx._prec_rounding
         if hasattr(x, '_mpf_'): return ctx.make_mpf(x._mpf_)
         if hasattr(x, '_mpc_'): return ctx.make_mpc(x._mpc_)
@@ -887,16 +1039,45 @@ def convert(ctx, x, strings=True):
     def npconvert(ctx, x):
         """
         Converts *x* to an ``mpf`` or ``mpc``. *x* should be a numpy
-        scalar.
+        scalar.  If *x* is a numpy array with at least one dimension,
+        all its elements are converted and an array of the same shape
+        with ``dtype=object`` is returned.
         """
         import numpy as np
-        if isinstance(x, np.ndarray) and x.ndim == 0: x = x.item()
+        if isinstance(x, np.ndarray):
+            if x.ndim:
+                return ctx._npconvert_array(x)
+            x = x.item()
         if isinstance(x, (np.integer, int)): return ctx.make_mpf(from_int(int(x)))
         if isinstance(x, (np.floating, float)): return ctx.mpf(from_npfloat(x))
         if isinstance(x, (np.complexfloating, complex)):
             return ctx.make_mpc((from_npfloat(x.real), from_npfloat(x.imag)))
         raise TypeError("cannot create mpf from " + repr(x))
 
+    def _npconvert_array(ctx, x):
+        # Converts the elements of the numpy array x, returning an object
+        # array.  Builtin numbers are obtained in bulk with tolist(), which
+        # is exact except for extended precision floats.
+        import numpy as np
+        kind = x.dtype.kind
+        if kind in 'biu':
+            make_mpf = ctx.make_mpf
+            v = [make_mpf(from_int(int(t))) for t in x.ravel().tolist()]
+        elif kind == 'f' and x.dtype.itemsize <= 8:
+            mpf = ctx.mpf
+            v = [mpf(t) for t in x.ravel().tolist()]
+        elif kind == 'c' and x.dtype.itemsize <= 16:
+            v = [ctx.convert(t) for t in x.ravel().tolist()]
+        elif kind in 'fc':
+            v = [ctx.npconvert(t) for t in x.ravel()]
+        elif kind == 'O':
+            v = [ctx.convert(t) for t in x.ravel().tolist()]
+        else:
+            raise TypeError("cannot create mpf from array of " + str(x.dtype))
+        r = np.empty(len(v), dtype=object)
+        r[:] = v
+        return r.reshape(x.shape)
+
     def isinf(ctx, x):
         """
         Return *True* if the absolute value of *x* is infinite;
@@ -1213,10 +1394,11 @@ def f_wrapped(ctx, *args, **kwargs):
                 finally:
                     ctx.prec = prec
                 return +retval
+            # For inspect.signature()
+            f_wrapped.__wrapped__ = f
         else:
             f_wrapped = f
         f_wrapped.__doc__ = function_docs.__dict__.get(name, f.__doc__)
-        f_wrapped.__signature__ = inspect.signature(f)
         f_wrapped.__name__ = f.__name__
         setattr(cls, name, f_wrapped)
 
@@ -2847,7 +2847,7 @@
 comparison with :func:`~mpmath.nsum`::
 
     >>> from mpmath import (mp, hyper, rf, fac, nsum, inf, mpf, sqrt, pi,
-    ...                     exp, identify, extradps)
+    ...                     exp, identify, extradps, erf)
     >>> mp.dps = 25
     >>> mp.pretty = True
     >>> a,b,c,d = 2,3,4,5
@@ -2950,6 +2950,31 @@
 and ``asymp_tol`` which controls the target tolerance for using
 asymptotic series.
 
+If ``z`` is a list or tuple, the list of function values at all its
+elements is returned.  The series for the arguments at which it would
+be summed directly are then summed at once, sharing the computations
+that only depend on the parameters, which is faster than evaluating the
+function at each point separately::
+
+    >>> hyper([1,2],[3,4],[0.25, -1, 2j])
+    [1.043282842651793740941702, 0.8553581024926702477421748, (0.906092190298362066069567 + 0.3079813244126290347661919j)]
+    >>> hyper([1,2],[3,4],2j)
+    (0.906092190298362066069567 + 0.3079813244126290347661919j)
+
+If the parameters are integers or fractions and ``z`` is an exact
+fraction (for example a :class:`fractions.Fraction`) or a number with
+a short mantissa, the series is summed by binary splitting at high
+precision, which is much faster than summing it term by term::
+
+    >>> from fractions import Fraction
+    >>> mp.dps = 1000
+    >>> v = hyper([(1,2)], [(3,2)], Fraction(-1,4))
+    >>> mp.dps = 25
+    >>> v
+    0.9225620128255848975114059
+    >>> sqrt(pi)*erf(0.5)
+    0.9225620128255848975114059
+
 When `p > q+1`, ``hyper`` computes the (iterated) Borel sum of the divergent
 series. For `\,_2F_0` the Borel sum has an analytic solution and can be
 computed efficiently (see :func:`~mpmath.hyp2f0`). For higher degrees, the functions
@@ -1,6 +1,8 @@
+from ..libmp import libhyper
 from ..libmp.backend import MPQ
 from .functions import defun, defun_wrapped
 import math
+import numbers
 
 def _check_need_perturb(ctx, terms, prec, discard_known_zeros):
     perturb = recompute = False
@@ -100,6 +102,8 @@ def hypercomb(ctx, function, params=[], discard_known_zeros=True,
         while 1:
             ctx.prec += 10
             if ctx.prec > maxprec:
+                if ctx._profile is not None:
+                    ctx._profile.escalate('hypercomb', orig, None, 'maxprec')
                 raise ValueError(_hypercomb_msg % (orig, ctx.prec))
             orig2 = ctx.prec
             params = orig_params[:]
@@ -192,6 +196,9 @@ def hypercomb(ctx, function, params=[], discard_known_zeros=True,
                 if perturbed_reference_value is None:
                     hextra += 20
                     perturbed_reference_value = sumvalue
+                    if ctx._profile is not None:
+                        ctx._profile.escalate('hypercomb', orig, ctx.prec+10,
+                                              'perturbation')
                     continue
                 elif ctx.mag(sumvalue - perturbed_reference_value) <= \
                         ctx.mag(sumvalue) - orig:
@@ -207,10 +214,16 @@ def hypercomb(ctx, function, params=[], discard_known_zeros=True,
                 else:
                     hextra *= 2
                     perturbed_reference_value = sumvalue
+                    if ctx._profile is not None:
+                        ctx._profile.escalate('hypercomb', orig, ctx.prec+10,
+                                              'perturbation')
             # Increase precision
             else:
                 increment = min(max(cancellation, orig//2), max(extraprec,orig))
                 ctx.prec += increment
+                if ctx._profile is not None:
+                    ctx._profile.escalate('hypercomb', orig, ctx.prec+10,
+                        'cancellation of %s bits' % cancellation)
                 if verbose:
                     print("  Must start over with increased precision")
                 continue
@@ -228,9 +241,14 @@ def hyper(ctx, a_s, b_s, z, *, eliminate=True, eliminate_all=False,
     kwargs = ctx._set_hyper_kwargs(eliminate, eliminate_all,
                                    force_series, asymp_tol, maxprec,
                                    maxterms, zeroprec, infprec, verbose)
-    z = ctx.convert(z)
-    if ctx.isnan(z):
-        return ctx.nan
+    many = isinstance(z, (list, tuple))
+    exact_z = None
+    if many:
+        z = [ctx.convert(w) for w in z]
+    else:
+        if isinstance(z, numbers.Rational) and type(z) is not int:
+            exact_z = MPQ(z.numerator, z.denominator)
+        z = ctx.convert(z)
     p = len(a_s)
     q = len(b_s)
     a_s = [ctx._convert_param(a) for a in a_s]
@@ -247,6 +265,26 @@ def hyper(ctx, a_s, b_s, z, *, eliminate=True, eliminate_all=False,
                 q -= 1
             else:
                 i += 1
+    if many:
+        return ctx._hyper_many(p, q, a_s, b_s, z, **kwargs)
+    # With an exact rational argument, the series is summed by binary
+    # splitting at high precision.  If it fails to converge, the usual
+    # methods are tried.
+    if exact_z is not None and ctx.prec >= libhyper.HYPSUM_BSPLIT_CUTOFF \
+            and q and all(t in 'ZQ' for a, t in a_s+b_s) \
+            and not any(ctx.isnpint(b) for b, t in b_s) \
+            and _hyper_use_series(ctx, p, q, z):
+        coeffs, types = zip(*(a_s+b_s))
+        try:
+            return ctx.hypsum(p, q, types, coeffs, exact_z, **kwargs)
+        except ctx.NoConvergence:
+            pass
+    return ctx._hyper(p, q, a_s, b_s, z, **kwargs)
+
+@defun
+def _hyper(ctx, p, q, a_s, b_s, z, **kwargs):
+    if ctx.isnan(z):
+        return ctx.nan
     # Handle special cases
     if p == 0:
         if   q == 1: return ctx._hyp0f1(b_s, z, **kwargs)
@@ -262,11 +300,57 @@ def hyper(ctx, a_s, b_s, z, *, eliminate=True, eliminate_all=False,
         elif q == 0: return ctx._hyp2f0(a_s, b_s, z, **kwargs)
     elif p == q+1:
         return ctx._hypq1fq(p, q, a_s, b_s, z, **kwargs)
-    elif p > q+1 and not force_series:
+    elif p > q+1 and not kwargs['force_series']:
         return ctx._hyp_borel(p, q, a_s, b_s, z, **kwargs)
     coeffs, types = zip(*(a_s+b_s))
     return ctx.hypsum(p, q, types, coeffs, z, **kwargs)
 
+# Smallest ctx.mag(z) at which the functions below with given (p, q),
+# p <= q, try an asymptotic expansion instead of the hypergeometric series
+_hyper_asymp_mag = {(0, 1): 8, (1, 1): 7, (1, 2): 20, (2, 2): 4,
+                    (2, 3): 20}
+
+# Largest |z| at which the series for p = q+1 converges rapidly; 2F1 is
+# summed directly up to there, and transformed beyond
+_hyper_series_absz = 0.8
+
+def _hyper_use_series(ctx, p, q, z):
+    """
+    Whether the functions above, for p <= q+1 and q > 0, use the
+    hypergeometric series at z (barring poles) and it converges well.
+    """
+    if p > q+1 or not z or not ctx.isfinite(z):
+        return False
+    if p == q+1:
+        return abs(z) <= _hyper_series_absz
+    m = _hyper_asymp_mag.get((p, q))
+    return m is None or ctx.mag(z) < m
+
+@defun
+def _hyper_many(ctx, p, q, a_s, b_s, zs, **kwargs):
+    values = [None] * len(zs)
+    # The arguments for which the series would be used anyway are
+    # passed at once to hypsum(), so that the work on the parameters
+    # is shared.  Poles are left to the functions above, as are all
+    # the arguments if the series fails to converge for any of them,
+    # since the functions above then fall back to other methods.
+    if q and p <= q+1 and not any(ctx.isnpint(b) for b, t in b_s):
+        index = [i for i, z in enumerate(zs)
+                 if _hyper_use_series(ctx, p, q, z)]
+        if index:
+            coeffs, types = zip(*(a_s+b_s))
+            try:
+                series = ctx.hypsum(p, q, types, coeffs,
+                                    [zs[i] for i in index], **kwargs)
+            except ctx.NoConvergence:
+                series = [None] * len(index)
+            for i, v in zip(index, series):
+                values[i] = v
+    for i, z in enumerate(zs):
+        if values[i] is None:
+            values[i] = ctx._hyper(p, q, a_s, b_s, z, **kwargs)
+    return values
+
 @defun
 def hyp0f1(ctx, b, z, *, eliminate=True, eliminate_all=False,
            force_series=False, asymp_tol=None, maxprec=None,
@@ -350,7 +434,7 @@ def _hyp0f1(ctx, b_s, z, **kwargs):
         magz = ctx.mag(z)
     else:
         magz = 0
-    if magz >= 8 and not kwargs.get('force_series'):
+    if magz >= _hyper_asymp_mag[0, 1] and not kwargs.get('force_series'):
         try:
             # http://functions.wolfram.com/HypergeometricFunctions/
             # Hypergeometric0F1/06/02/03/0004/
@@ -386,7 +470,7 @@ def _hyp1f1(ctx, a_s, b_s, z, **kwargs):
     if not z:
         return ctx.one+z
     magz = ctx.mag(z)
-    if magz >= 7 and not ctx.isnpint(a):
+    if magz >= _hyper_asymp_mag[1, 1] and not ctx.isnpint(a):
         if ctx.isinf(z) and ctx.sign(a) == ctx.sign(b) == ctx.sign(z) == 1:
             return ctx.inf
         if ctx.isinf(magz):
@@ -510,7 +594,7 @@ def _hyp2f1(ctx, a_s, b_s, z, **kwargs):
 
     # Fast case: standard series converges rapidly,
     # possibly in finitely many terms
-    if ctx.isfinite(z) and (absz <= 0.8 or
+    if ctx.isfinite(z) and (absz <= _hyper_series_absz or
                             (ctx.isnpint(a) and -1000 <= a) or
                             (ctx.isnpint(b) and -1000 <= b)):
         try:
@@ -830,7 +914,7 @@ def _hyp2f2(ctx, a_s, b_s, z, **kwargs):
 
     # Asymptotic series is in terms of 3F1
     can_use_asymptotic = (not kwargs.get('force_series')) and \
-        (ctx.mag(absz) > 3)
+        (ctx.mag(absz) >= _hyper_asymp_mag[2, 2])
 
     # TODO: much of the following could be shared with 2F3 instead of
     # copypasted
@@ -899,7 +983,7 @@ def _hyp1f2(ctx, a_s, b_s, z, **kwargs):
 
     # Asymptotic series is in terms of 3F0
     can_use_asymptotic = (not kwargs.get('force_series')) and \
-        (ctx.mag(absz) > 19) and \
+        (ctx.mag(absz) >= _hyper_asymp_mag[1, 2]) and \
         (ctx.sqrt(absz) > 1.5*orig)  # and \
     #   ctx._hyp_check_convergence([a1, a1-b1+1, a1-b2+1], [],
     #                              1/absz, orig+40+asymp_extraprec)
@@ -983,7 +1067,8 @@ def _hyp2f3(ctx, a_s, b_s, z, **kwargs):
     # The square root below empirically provides a plausible criterion
     # for the leading series to converge
     can_use_asymptotic = (not kwargs.get('force_series')) and \
-        (ctx.mag(absz) > 19) and (ctx.sqrt(absz) > 1.5*orig)
+        (ctx.mag(absz) >= _hyper_asymp_mag[2, 3]) and \
+        (ctx.sqrt(absz) > 1.5*orig)
 
     if can_use_asymptotic:
         #print "using asymp"
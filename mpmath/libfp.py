@@ -15,8 +15,32 @@
 
 logpi = 1.1447298858494001741
 
+def _isarray(x):
+    """
+    Whether x is a NumPy array.  Zero-dimensional arrays are excluded, as
+    they convert to scalars.
+    """
+    return getattr(x, 'ndim', 0) > 0 and hasattr(x, '__array__')
+
+def _apply_array(f, args):
+    """Evaluate f on arguments that include NumPy arrays."""
+    from . import libfpnp
+    return libfpnp.apply(f, args)
+
+# Arrays are looked for only in arguments that are not floats, so that
+# the common case takes no extra time.  They must be detected before the
+# conversion to float, which succeeds for arrays with one element.
+
+def _hasarray(args):
+    for x in args:
+        if type(x) is not float and _isarray(x):
+            return True
+    return False
+
 def _mathfun_real(f_real, f_complex):
     def f(x, **kwargs):
+        if type(x) is not float and _isarray(x):
+            return _apply_array(f, (x,))
         try:
             x = float(x)
             return f_real(x)
@@ -30,6 +54,8 @@ def _mathfun(f_real, f_complex):
     def f(x, **kwargs):
         if type(x) is complex:
             return f_complex(x)
+        if type(x) is not float and _isarray(x):
+            return _apply_array(f, (x,))
         try:
             return f_real(float(x))
         except (TypeError, ValueError):
@@ -39,6 +65,8 @@ def f(x, **kwargs):
 
 def _mathfun_n(f_real, f_complex):
     def f(*args, **kwargs):
+        if _hasarray(args):
+            return _apply_array(f, args)
         try:
             return f_real(*(float(x) for x in args))
         except (TypeError, ValueError):
@@ -205,6 +233,8 @@ def factorial(x):
 # XXX: broken for negatives
 def loggamma(x):
     if type(x) not in (float, complex):
+        if _isarray(x):
+            return _apply_array(loggamma, (x,))
         try:
             x = float(x)
         except (ValueError, TypeError):
@@ -0,0 +1,471 @@
+"""
+Vectorized versions of the functions of the fp context, for NumPy arrays.
+
+The functions of libfp and the special functions of the fp context call
+apply() or apply_specfun() when they are given a NumPy array.  These use
+a vectorized kernel from this module if there is one for the function
+and the type of the arguments, and otherwise evaluate the scalar function
+elementwise.  The result is an array of floats (or of complex numbers,
+if any element is complex).
+
+Unlike the scalar functions, which raise exceptions at poles and outside
+of their domain of definition, the kernels follow the NumPy conventions
+and return infinities or nans there.
+
+This module requires NumPy and is only imported once an array is seen.
+"""
+
+import math
+
+import numpy as np
+
+from . import libfp
+
+
+pi = math.pi
+
+
+def _asarray(x):
+    """Convert x to an array of floats or of complex numbers, or None."""
+    x = np.asarray(x)
+    kind = x.dtype.kind
+    if kind in 'biuf':
+        return x.astype(float)
+    if kind == 'c':
+        return x.astype(complex)
+    return None
+
+def _loop(f, args):
+    """Evaluate the scalar function f elementwise, with broadcasting."""
+    with np.errstate(all='ignore'):
+        r = np.frompyfunc(f, len(args), 1)(*args)
+    if not isinstance(r, np.ndarray):
+        return r
+    try:
+        return r.astype(float)
+    except TypeError:
+        return r.astype(complex)
+
+def apply(f, args):
+    """Apply the libfp function f to arguments that include arrays."""
+    kernel = _kernels.get(f)
+    if kernel is not None:
+        with np.errstate(all='ignore'):
+            r = kernel(*args)
+        if r is not NotImplemented:
+            return r
+    return _loop(f, args)
+
+def apply_specfun(ctx, name, args, kwargs):
+    """Apply the special function ctx.name to arguments that include arrays."""
+    kernel = _specfun_kernels.get(name)
+    if kernel is not None:
+        with np.errstate(all='ignore'):
+            r = kernel(*args, **kwargs)
+        if r is not NotImplemented:
+            return r
+    f = getattr(ctx, name)
+    if kwargs:
+        return _loop(lambda *a: f(*a, **kwargs), args)
+    return _loop(f, args)
+
+
+#----------------------------------------------------------------------------#
+#                          Elementary functions                              #
+#----------------------------------------------------------------------------#
+
+def _ufunc(f):
+    def kernel(x):
+        x = _asarray(x)
+        if x is None:
+            return NotImplemented
+        return f(x)
+    return kernel
+
+def _ufunc_domain(f, outside):
+    """
+    Like _ufunc, but give complex results for all elements if any real
+    element lies outside the domain of the real function.
+    """
+    def kernel(x):
+        x = _asarray(x)
+        if x is None:
+            return NotImplemented
+        if x.dtype.kind == 'f' and outside(x).any():
+            x = x.astype(complex)
+        return f(x)
+    return kernel
+
+def _log(x, b=None):
+    x = _asarray(x)
+    if x is None:
+        return NotImplemented
+    if x.dtype.kind == 'f' and (x < 0).any():
+        x = x.astype(complex)
+    if b is None:
+        return np.log(x)
+    b = _log(b)
+    if b is NotImplemented:
+        return b
+    return np.log(x) / b
+
+def _pow(x, y):
+    x = _asarray(x)
+    y = _asarray(y)
+    if x is None or y is None:
+        return NotImplemented
+    x, y = np.broadcast_arrays(x, y)
+    if x.dtype.kind == 'f' and y.dtype.kind == 'f':
+        if ((x < 0) & (y != np.floor(y))).any():
+            return np.power(x.astype(complex), y)
+    return np.power(x, y)
+
+def _floor(x):
+    x = _asarray(x)
+    if x is None:
+        return NotImplemented
+    if x.dtype.kind == 'c':
+        return np.floor(x.real) + 1j*np.floor(x.imag)
+    return np.floor(x)
+
+def _ceil(x):
+    x = _asarray(x)
+    if x is None:
+        return NotImplemented
+    if x.dtype.kind == 'c':
+        return np.ceil(x.real) + 1j*np.ceil(x.imag)
+    return np.ceil(x)
+
+def _sinpi_cospi(x, cos):
+    # Reduce modulo 1/2 exactly, as libfp._sinpi_real does
+    x = _asarray(x)
+    if x is None:
+        return NotImplemented
+    re = x.real
+    sign = np.where(re < 0, -1.0, 1.0)
+    n, r = np.divmod(re*sign, 0.5)
+    if x.dtype.kind == 'c':
+        r = r + 1j*(x.imag*sign)
+    r = pi*r
+    n = n % 4
+    s = np.sin(r)
+    c = np.cos(r)
+    if cos:
+        v = np.select([n == 0, n == 1, n == 2], [c, -s, -c], s)
+        return v
+    v = np.select([n == 0, n == 1, n == 2], [s, c, -s], -c)
+    return sign*v
+
+def _sinpi(x):
+    return _sinpi_cospi(x, False)
+
+def _cospi(x):
+    return _sinpi_cospi(x, True)
+
+def _cbrt(x):
+    x = _asarray(x)
+    if x is None:
+        return NotImplemented
+    if x.dtype.kind == 'f' and (x < 0).any():
+        x = x.astype(complex)
+    return x**(1./3)
+
+
+#----------------------------------------------------------------------------#
+#                            Gamma function                                  #
+#----------------------------------------------------------------------------#
+
+_exact_gamma = np.array(libfp._exact_gamma)
+
+def _lanczos(x):
+    # Gamma function for re(x) >= 1/2, see libfp._gamma_complex
+    x = x - 1.0
+    p = libfp._lanczos_p
+    r = p[0]
+    for i in range(1, libfp._lanczos_g+2):
+        r = r + p[i]/(x+i)
+    t = x + libfp._lanczos_g + 0.5
+    # Split the power to avoid a premature overflow
+    h = t**(0.5*(x+0.5))
+    return 2.506628274631000502417 * h * np.exp(-t) * h * r
+
+def _gamma(x):
+    x = _asarray(x)
+    if x is None:
+        return NotImplemented
+    refl = x.real < 0.5
+    y = np.where(refl, 1.0-x, x)
+    if x.dtype.kind == 'f':
+        # Gamma overflows for x > 171.62
+        over = y > 172.0
+        v = _lanczos(np.where(over, 1.0, y))
+        v[over] = np.inf
+    else:
+        v = _lanczos(y)
+    if refl.any():
+        v = np.where(refl, pi/(_sinpi(x)*v), v)
+    if x.dtype.kind == 'f':
+        # Exact values at small positive integers, and poles at the others
+        n = np.floor(x)
+        isint = (n == x)
+        small = isint & (x > 0) & (x <= libfp._max_exact_gamma)
+        v[small] = _exact_gamma[x[small].astype(int)]
+        v[isint & (x <= 0)] = np.inf
+        v[x == np.inf] = np.inf
+    return v
+
+def _loggamma(x):
+    x = _asarray(x)
+    if x is None or x.dtype.kind != 'f' or not (x > 0).all():
+        return NotImplemented
+    exact = (x == 1.0) | (x == 2.0)
+    # Recurrence up to x >= 11, then the Stirling series (as libfp.loggamma)
+    n = np.maximum(np.ceil(11.0 - x), 0.0)
+    p = np.zeros_like(x)
+    for k in range(int(n.max(initial=0))):
+        p -= np.where(k < n, np.log(x+k), 0.0)
+    x = x + n
+    s = 0.918938533204672742 + (x-0.5)*np.log(x) - x
+    r = 1./x
+    r2 = r*r
+    s += 0.083333333333333333333*r; r = r*r2
+    s += -0.0027777777777777777778*r; r = r*r2
+    s += 0.00079365079365079365079*r; r = r*r2
+    s += -0.0005952380952380952381*r; r = r*r2
+    s += 0.00084175084175084175084*r; r = r*r2
+    s += -0.0019175269175269175269*r; r = r*r2
+    s += 0.0064102564102564102564*r; r = r*r2
+    s += -0.02955065359477124183*r
+    v = s + p
+    v[exact] = 0.0
+    return v
+
+
+#----------------------------------------------------------------------------#
+#                     Error function and zeta function                       #
+#----------------------------------------------------------------------------#
+
+# The special function kernels take the keyword arguments of the scalar
+# functions, and ignore those which only tune the internal algorithms
+
+def _exp_neg_square(x):
+    # exp(-x**2), with x**2 split into an exact square and a small
+    # correction, since the rounding error of x*x is magnified by exp
+    h = np.round(x*4096.0)/4096.0
+    return np.exp(-h*h) * np.exp(-(x-h)*(x+h))
+
+def _erf_series(x):
+    # erf(x) = 2/sqrt(pi) exp(-x**2) sum 2**n x**(2n+1) / (2n+1)!!,
+    # a series of positive terms, for 0 <= x < 1.5
+    x2 = 2.0*x*x
+    t = x.copy()
+    s = x.copy()
+    for n in range(1, 40):
+        t *= x2/(2*n+1)
+        s += t
+    return 1.1283791670955125739*_exp_neg_square(x)*s
+
+def _erfc_cf(x):
+    # erfc(x) = exp(-x**2)/sqrt(pi) / (x + (1/2)/(x + 1/(x + (3/2)/(x + ...)))),
+    # evaluated backwards, for 1.5 <= x < 28 (erfc underflows beyond)
+    d = np.zeros_like(x)
+    for k in range(80, 0, -1):
+        d = (0.5*k)/(x + d)
+    return 0.56418958354775628695*_exp_neg_square(x)/(x + d)
+
+def _erf_erfc(x):
+    # Returns erf(|x|) and erfc(|x|)
+    a = np.abs(x)
+    erf = np.empty_like(a)
+    erfc = np.empty_like(a)
+    small = a < 1.5
+    erf[small] = _erf_series(a[small])
+    erfc[small] = 1.0 - erf[small]
+    mid = (a >= 1.5) & (a < 28.0)
+    erfc[mid] = _erfc_cf(a[mid])
+    erf[mid] = 1.0 - erfc[mid]
+    big = a >= 28.0
+    erf[big] = 1.0
+    erfc[big] = 0.0
+    nan = np.isnan(a)
+    erf[nan] = erfc[nan] = np.nan
+    return erf, erfc
+
+def _erf(x):
+    x = _asarray(x)
+    if x is None or x.dtype.kind != 'f':
+        return NotImplemented
+    erf, erfc = _erf_erfc(x)
+    return np.copysign(erf, x)
+
+def _erfc(x):
+    x = _asarray(x)
+    if x is None or x.dtype.kind != 'f':
+        return NotImplemented
+    erf, erfc = _erf_erfc(x)
+    return np.where(x < 0, 2.0 - erfc, erfc)
+
+def _zeta(s, a=1, derivative=0, **kwargs):
+    s = _asarray(s)
+    if np.ndim(a) or a != 1 or derivative or s is None or s.dtype.kind != 'f':
+        return NotImplemented
+    return _zeta_real(s)
+
+def _zeta_real(s):
+    # See libfp.zeta
+    polyval = np.polynomial.polynomial.polyval
+    v = np.empty_like(s)
+    tail = 1.0 + 2.0**(-s) + 3.0**(-s)
+    big = s >= 27
+    v[big] = tail[big]
+    mid = (s > 2) & ~big
+    sm = s[mid]
+    v[mid] = tail[mid] + 4.0**(-sm)*(polyval(sm, libfp._zeta_P[::-1]) /
+                                     polyval(sm, libfp._zeta_Q[::-1]))
+    low = (s > 1) & (s <= 2)
+    v[low] = polyval(s[low], libfp._zeta_1[::-1]) / (s[low]-1)
+    low = (s > 0) & (s <= 1)
+    v[low] = polyval(s[low], libfp._zeta_0[::-1]) / (s[low]-1)
+    neg = s <= 0
+    if neg.any():
+        t = s[neg]
+        v[neg] = (2.0**t * pi**(t-1) * _sinpi(0.5*t) * _gamma(1-t) *
+                  _zeta_real(1-t))
+    # Exact values at integers
+    isint = (s == np.floor(s)) & (s < 27)
+    tab = isint & (s >= 0)
+    v[tab] = np.array(libfp._zeta_int)[s[tab].astype(int)]
+    v[isint & (s < 0) & (s % 2 == 0)] = 0.0
+    v[s == 1] = np.inf
+    v[np.isnan(s)] = np.nan
+    return v
+
+
+#----------------------------------------------------------------------------#
+#                            Bessel functions                                #
+#----------------------------------------------------------------------------#
+
+def _besselj(n, z, derivative=0, **kwargs):
+    if np.ndim(n) or derivative:
+        return NotImplemented
+    z = _asarray(z)
+    if z is None or z.dtype.kind != 'f':
+        return NotImplemented
+    try:
+        n = complex(n)
+    except TypeError:
+        return NotImplemented
+    if n.imag or n.real != int(n.real):
+        return NotImplemented
+    n = int(n.real)
+    # J_{-n}(x) = (-1)^n J_n(x) = J_n(-x)
+    sign = 1.0
+    if n < 0:
+        n = -n
+        sign = (-1.0)**n
+    x = np.abs(z)
+    if n % 2:
+        sign = np.where(z < 0, -sign, sign)
+    v = np.zeros_like(x)
+    if not n:
+        v[x == 0] = 1.0
+    # The asymptotic expansion converges quickly once x >> n^2
+    asymp = x > max(25.0, 0.5*n*n)
+    series = (x > 0) & (x < 1)
+    miller = (x >= 1) & ~asymp
+    if series.any():
+        v[series] = _besselj_series(n, x[series])
+    if miller.any():
+        v[miller] = _besselj_miller(n, x[miller])
+    if asymp.any():
+        v[asymp] = _besselj_asymp(n, x[asymp])
+    v[np.isnan(x)] = np.nan
+    return sign*v
+
+def _besselj_series(n, x):
+    # (x/2)^n/n! 0F1(n+1, -x^2/4), for x < 1
+    r = -0.25*x*x
+    t = np.ones_like(x)
+    s = t
+    for k in range(1, 20):
+        t = t * r / (k*(n+k))
+        s = s + t
+    lt = n*np.log(0.5*x) - math.lgamma(n+1)
+    return s * np.exp(lt)
+
+def _besselj_miller(n, x):
+    # Miller's backward recurrence, normalized with J_0 + 2 J_2 + ... = 1
+    m = int(max(n, x.max()))
+    m = 2*((m + 20 + int(math.sqrt(40*m))) // 2)
+    tox = 2.0/x
+    bjp = np.zeros_like(x)
+    bj = np.ones_like(x)
+    ans = np.zeros_like(x)
+    s = np.zeros_like(x)
+    for j in range(m, 0, -1):
+        bjp, bj = bj, j*tox*bj - bjp
+        big = np.abs(bj) > 1e250
+        if big.any():
+            scale = np.where(big, 1e-250, 1.0)
+            bj *= scale; bjp *= scale; ans *= scale; s *= scale
+        if j % 2:
+            s += bj
+        if j == n:
+            ans = bjp.copy()
+    if not n:
+        ans = bj
+    return ans / (2.0*s - bj)
+
+def _besselj_asymp(n, x):
+    # Hankel's expansion J_n(x) = sqrt(2/(pi x)) (P cos(w) - Q sin(w)),
+    # w = x - (n/2 + 1/4) pi
+    mu = 4.0*n*n
+    P = np.ones_like(x)
+    Q = np.zeros_like(x)
+    t = np.ones_like(x)
+    for k in range(1, 60):
+        t = t * (mu - (2*k-1)**2) / (k*8.0*x)
+        if k % 4 == 1: Q += t
+        elif k % 4 == 2: P -= t
+        elif k % 4 == 3: Q -= t
+        else: P += t
+        if np.abs(t).max() < 1e-17:
+            break
+    c = (0.5*n + 0.25)*pi
+    cw = np.cos(x)*math.cos(c) + np.sin(x)*math.sin(c)
+    sw = np.sin(x)*math.cos(c) - np.cos(x)*math.sin(c)
+    return np.sqrt(2.0/(pi*x)) * (P*cw - Q*sw)
+
+
+_kernels = {
+    libfp.exp: _ufunc(np.exp),
+    libfp.cos: _ufunc(np.cos),
+    libfp.sin: _ufunc(np.sin),
+    libfp.tan: _ufunc(np.tan),
+    libfp.atan: _ufunc(np.arctan),
+    libfp.cosh: _ufunc(np.cosh),
+    libfp.sinh: _ufunc(np.sinh),
+    libfp.tanh: _ufunc(np.tanh),
+    libfp.asinh: _ufunc(np.arcsinh),
+    libfp.sqrt: _ufunc_domain(np.sqrt, lambda x: x < 0),
+    libfp.acos: _ufunc_domain(np.arccos, lambda x: abs(x) > 1),
+    libfp.asin: _ufunc_domain(np.arcsin, lambda x: abs(x) > 1),
+    libfp.acosh: _ufunc_domain(np.arccosh, lambda x: x < 1),
+    libfp.atanh: _ufunc_domain(np.arctanh, lambda x: abs(x) > 1),
+    libfp.log: _log,
+    libfp.pow: _pow,
+    libfp.floor: _floor,
+    libfp.ceil: _ceil,
+    libfp.cospi: _cospi,
+    libfp.sinpi: _sinpi,
+    libfp.cbrt: _cbrt,
+    libfp.gamma: _gamma,
+    libfp.loggamma: _loggamma,
+}
+
+_specfun_kernels = {
+    'erf': _erf,
+    'erfc': _erfc,
+    'zeta': _zeta,
+    'besselj': _besselj,
+}
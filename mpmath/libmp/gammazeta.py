@@ -17,13 +17,16 @@
 import sys
 import threading
 
+from . import libstore
 from .backend import MPZ, MPZ_ONE, MPZ_THREE, MPZ_ZERO
-from .libelefun import (constant_memo, cos_sin_fixed, def_mpf_constant,
-                        exp_fixed, ln2_fixed, ln_sqrt2pi_fixed, log_int_fixed,
-                        mpf_cos_sin_pi, mpf_exp, mpf_ln, mpf_ln2, mpf_pi,
-                        mpf_pow, mpf_sin_pi, mpf_sqrtpi, pi_fixed,
-                        sqrtpi_fixed)
-from .libintmath import ifac, ifac2, isqrt_fast, list_primes, lshift, moebius
+from .libcache import MemoCache, sizeof
+from .libelefun import (bs_parallel, constant_memo, cos_sin_fixed,
+                        def_mpf_constant, exp_fixed, ln2_fixed,
+                        ln_sqrt2pi_fixed, log_int_fixed, mpf_cos_sin_pi,
+                        mpf_exp, mpf_ln, mpf_ln2, mpf_pi, mpf_pow, mpf_sin_pi,
+                        mpf_sqrtpi, pi_fixed, sqrtpi_fixed)
+from .libintmath import (idivmod, ifac, ifac2, isqrt_fast, list_primes, lshift,
+                         moebius)
 from .libmpc import (mpc_abs, mpc_add, mpc_add_mpf, mpc_cos_pi, mpc_div,
                      mpc_div_mpf, mpc_exp, mpc_half, mpc_ln, mpc_mpf_div,
                      mpc_mul, mpc_mul_int, mpc_mul_mpf, mpc_neg, mpc_one,
@@ -32,14 +35,13 @@
                      mpc_zero)
 from .libmpf import (ComplexResult, fhalf, finf, fnan, fninf, fone, from_int,
                      from_man_exp, from_rational, ftwo, fzero, mpf_abs,
-                     mpf_add, mpf_div, mpf_floor, mpf_gt, mpf_le, mpf_lt,
-                     mpf_mul, mpf_mul_int, mpf_neg, mpf_perturb, mpf_pos,
-                     mpf_pow_int, mpf_rdiv_int, mpf_shift, mpf_sign, mpf_sub,
-                     negative_rnd, round_down, round_nearest, to_fixed,
-                     to_float, to_int)
-
-
-local = threading.local()
+                     mpf_add, mpf_array_from_bytes, mpf_array_pack,
+                     mpf_array_to_bytes, mpf_array_unpack, mpf_div, mpf_floor,
+                     mpf_gt, mpf_le, mpf_lt, mpf_mul, mpf_mul_int, mpf_neg,
+                     mpf_perturb, mpf_pos, mpf_pow_int, mpf_rdiv_int,
+                     mpf_shift, mpf_sign, mpf_sub, negative_rnd, read_varint,
+                     round_down, round_nearest, to_fixed, to_float, to_int,
+                     write_varint)
 
 
 # Catalan's constant is computed using Lupas's rapidly convergent series
@@ -52,18 +54,38 @@
 #                             n  (2n-1) [(4n)!]
 #           n = 1
 
+# Writing the n-th term as 32*(40n^2-24n+3)*prod_{k=1}^n p(k)/q(k), with
+# p(1) = 1, q(1) = 9 and p(k) = -32(k-1)^3 (2k-3), q(k) = (16k^2-16k+3)^2,
+# the series is summed by binary splitting.  Terms decrease by a factor
+# of about 4.
+
+def bs_pqt_merge(left, right):
+    """
+    Combine the (P, Q, T) values of adjacent ranges [a, m) and [m, b)
+    for the binary splitting of a series sum_n c(n) prod_{k<=n} p(k)/q(k),
+    where P, Q = prod p(k), prod q(k) and T/Q is the partial sum.
+    """
+    P1, Q1, T1 = left
+    P2, Q2, T2 = right
+    return P1*P2, Q1*Q2, T1*Q2 + P1*T2
+
+def bs_catalan(a, b):
+    if b - a == 1:
+        n = b
+        if n == 1:
+            p, q = MPZ_ONE, MPZ(9)
+        else:
+            p = MPZ(-32*(n-1)**3*(2*n-3))
+            q = MPZ((16*n**2-16*n+3)**2)
+        return p, q, p*(40*n**2-24*n+3)
+    m = (a+b)//2
+    return bs_pqt_merge(bs_catalan(a, m), bs_catalan(m, b))
+
 @constant_memo
 def catalan_fixed(prec):
-    prec = prec + 20
-    a = one = MPZ_ONE << prec
-    s, t, n = 0, 1, 1
-    while t:
-        a *= 32 * n**3 * (2*n-1)
-        a //= (3-16*n+16*n**2)**2
-        t = a * (-1)**(n-1) * (40*n**2-24*n+3) // (n**3 * (2*n-1))
-        s += t
-        n += 1
-    return s >> (20 + 6)
+    N = int(prec/2 + 10)
+    P, Q, T = bs_parallel(bs_catalan, bs_pqt_merge, 0, N, prec)
+    return idivmod(T << prec, Q << 1)[0]
 
 # Khinchin's constant is relatively difficult to compute. Here
 # we use the rational zeta series
@@ -217,20 +239,26 @@ def glaisher_fixed(prec):
 #             /___               64                      5
 #             n = 0                             ((2n+1)!)
 
+# The ratio of consecutive factorial factors is -n^5/(32 (2n+1)^5), so
+# that the terms decrease by a factor of about 1024.
+
+def bs_apery(a, b):
+    if b - a == 1:
+        n = a
+        if n == 0:
+            p = q = MPZ_ONE
+        else:
+            p = MPZ(-n**5)
+            q = MPZ(32*(2*n+1)**5)
+        return p, q, p*(205*n**2 + 250*n + 77)
+    m = (a+b)//2
+    return bs_pqt_merge(bs_apery(a, m), bs_apery(m, b))
+
 @constant_memo
 def apery_fixed(prec):
-    prec += 20
-    d = MPZ_ONE << prec
-    term = MPZ(77) << prec
-    n = 1
-    s = MPZ_ZERO
-    while term:
-        s += term
-        d *= (n**10)
-        d //= (((2*n+1)**5) * (2*n)**5)
-        term = (-1)**n * (205*(n**2) + 250*n + 77) * d
-        n += 1
-    return s >> (20 + 6)
+    N = int(prec/10 + 10)
+    P, Q, T = bs_parallel(bs_apery, bs_pqt_merge, 0, N, prec)
+    return idivmod(T << prec, Q << 6)[0]
 
 """
 Euler's constant (gamma) is computed using the Brent-McMillan formula,
@@ -270,7 +298,7 @@ def euler_fixed(prec):
         if max(abs(A), abs(B)) < 100:
             break
         k += 1
-    return (U<<(prec-extra))//V
+    return idivmod(U<<(prec-extra), V)[0]
 
 # Use zeta accelerated formulas for the Mertens and twin
 # prime constants; see
@@ -369,10 +397,35 @@ def I(n):
 numerator and denominator.
 """
 
-bernoulli_cache = local.bernoulli_cache = {}
+bernoulli_cache = MemoCache('bernoulli_cache')
+bernoulli_lock = threading.Lock()
 f3 = from_int(3)
 f6 = from_int(6)
 
+# Largest index m in the tables saved to the on-disk store, by precision.
+# A table is saved again only once it has doubled in size.
+bernoulli_saved = {}
+
+def bernoulli_table_to_bytes(numbers, state):
+    m, bin, bin1 = state
+    mans, exps = mpf_array_pack([numbers[k] for k in range(0, m, 2)])
+    out = mpf_array_to_bytes(mans, exps)
+    for x in state:
+        write_varint(int(x), out)
+    return out
+
+def bernoulli_table_from_bytes(data):
+    mans, exps, pos = mpf_array_from_bytes(data)
+    state = []
+    for _ in range(3):
+        x, pos = read_varint(data, pos)
+        state.append(MPZ(x))
+    state[0] = m = int(state[0])
+    if m != 2*len(mans) or pos != len(data):
+        raise ValueError("invalid data")
+    numbers = dict(zip(range(0, m, 2), mpf_array_unpack(mans, exps)))
+    return numbers, state
+
 def bernoulli_size(n):
     """Accurately estimate the size of B_n (even n > 2 only)"""
     lgn = math.log(n,2)
@@ -405,53 +458,74 @@ def mpf_bernoulli(n, prec, rnd=round_down, plus=False):
     # Reuse nearby precisions
     wp += 32 - (prec & 31)
     cached = bernoulli_cache.get(wp)
-    if cached:
-        numbers, state = cached
-        if n in numbers:
-            return mpf_pos(numbers[n], prec, rnd)
-        m, bin, bin1 = state
-        if n - m > 10:
-            return mpf_bernoulli_huge(n, prec, rnd)
-    else:
-        if n > 10:
-            return mpf_bernoulli_huge(n, prec, rnd)
-        numbers = {0:fone}
-        m, bin, bin1 = state = [2, MPZ(10), MPZ_ONE]
-        bernoulli_cache[wp] = (numbers, state)
-    while m <= n:
-        #print m
-        case = m % 6
-        # Accurately estimate size of B_m so we can use
-        # fixed point math without using too much precision
-        szbm = bernoulli_size(m)
-        s = MPZ(0)
-        sexp = max(0, szbm)  - wp
-        if m < 6:
-            a = MPZ_ZERO
+    if cached and n in cached[0]:
+        return mpf_pos(cached[0][n], prec, rnd)
+    # Extending the table mutates it in place, so it must be done by
+    # one thread at a time; readers above only see complete entries
+    with bernoulli_lock:
+        cached = bernoulli_cache.get(wp)
+        if not cached and wp >= libstore.STORE_MIN_PREC:
+            cached = libstore.read('bernoulli', wp, bernoulli_table_from_bytes)
+            if cached:
+                bernoulli_cache[wp] = cached
+                bernoulli_saved[wp] = cached[1][0]
+        if cached:
+            numbers, state = cached
+            if n in numbers:
+                return mpf_pos(numbers[n], prec, rnd)
+            m, bin, bin1 = state
+            if n - m > 10:
+                return mpf_bernoulli_huge(n, prec, rnd)
         else:
-            a = bin1
-        for j in range(1, m//6+1):
-            usign, uman, uexp, ubc = u = numbers[m-6*j]
-            if usign:
-                uman = -uman
-            s += lshift(a*uman, uexp-sexp)
-            # Update inner binomial coefficient
-            j6 = 6*j
-            a *= ((m-5-j6)*(m-4-j6)*(m-3-j6)*(m-2-j6)*(m-1-j6)*(m-j6))
-            a //= ((4+j6)*(5+j6)*(6+j6)*(7+j6)*(8+j6)*(9+j6))
-        if case == 0: b = mpf_rdiv_int(m+3, f3, wp)
-        if case == 2: b = mpf_rdiv_int(m+3, f3, wp)
-        if case == 4: b = mpf_rdiv_int(-m-3, f6, wp)
-        s = from_man_exp(s, sexp, wp)
-        b = mpf_div(mpf_sub(b, s, wp), from_int(bin), wp)
-        numbers[m] = b
-        m += 2
-        # Update outer binomial coefficient
-        bin = bin * ((m+2)*(m+3)) // (m*(m-1))
-        if m > 6:
-            bin1 = bin1 * ((2+m)*(3+m)) // ((m-7)*(m-6))
-        state[:] = [m, bin, bin1]
-    return mpf_pos(numbers[n], prec, rnd)
+            if n > 10:
+                return mpf_bernoulli_huge(n, prec, rnd)
+            numbers = {0:fone}
+            m, bin, bin1 = state = [2, MPZ(10), MPZ_ONE]
+            bernoulli_cache[wp] = (numbers, state)
+        # Size of the new numbers, so as not to measure the whole table
+        nbytes = -sys.getsizeof(numbers)
+        while m <= n:
+            #print m
+            case = m % 6
+            # Accurately estimate size of B_m so we can use
+            # fixed point math without using too much precision
+            szbm = bernoulli_size(m)
+            s = MPZ(0)
+            sexp = max(0, szbm)  - wp
+            if m < 6:
+                a = MPZ_ZERO
+            else:
+                a = bin1
+            for j in range(1, m//6+1):
+                usign, uman, uexp, ubc = u = numbers[m-6*j]
+                if usign:
+                    uman = -uman
+                s += lshift(a*uman, uexp-sexp)
+                # Update inner binomial coefficient
+                j6 = 6*j
+                a *= ((m-5-j6)*(m-4-j6)*(m-3-j6)*(m-2-j6)*(m-1-j6)*(m-j6))
+                a //= ((4+j6)*(5+j6)*(6+j6)*(7+j6)*(8+j6)*(9+j6))
+            if case == 0: b = mpf_rdiv_int(m+3, f3, wp)
+            if case == 2: b = mpf_rdiv_int(m+3, f3, wp)
+            if case == 4: b = mpf_rdiv_int(-m-3, f6, wp)
+            s = from_man_exp(s, sexp, wp)
+            b = mpf_div(mpf_sub(b, s, wp), from_int(bin), wp)
+            numbers[m] = b
+            nbytes += sizeof(m) + sizeof(b)
+            m += 2
+            # Update outer binomial coefficient
+            bin = bin * ((m+2)*(m+3)) // (m*(m-1))
+            if m > 6:
+                bin1 = bin1 * ((2+m)*(3+m)) // ((m-7)*(m-6))
+            state[:] = [m, bin, bin1]
+        bernoulli_cache.adjust_size(wp, nbytes + sys.getsizeof(numbers))
+        if (libstore.store_dir is not None and wp >= libstore.STORE_MIN_PREC
+                and m >= 2*bernoulli_saved.get(wp, 0)):
+            libstore.write('bernoulli', wp,
+                           bernoulli_table_to_bytes(numbers, state))
+            bernoulli_saved[wp] = m
+        b = numbers[n]
+    return mpf_pos(b, prec, rnd)
 
 def mpf_bernoulli_huge(n, prec, rnd=round_down):
     wp = prec + 10
@@ -872,11 +946,12 @@ def mpc_psi(m, z, prec, rnd=round_down):
 * [Wikipedia]_ http://en.wikipedia.org/wiki/Dirichlet_eta_function
 """
 
-borwein_cache = local.borwein_cache = {}
+borwein_cache = MemoCache('borwein_cache')
 
 def borwein_coefficients(n):
-    if n in borwein_cache:
-        return borwein_cache[n]
+    ds = borwein_cache.get(n)
+    if ds is not None:
+        return ds
     ds = [MPZ_ZERO] * (n+1)
     d = MPZ_ONE
     s = ds[0] = MPZ_ONE
@@ -889,7 +964,7 @@ def borwein_coefficients(n):
     return ds
 
 ZETA_INT_CACHE_MAX_PREC = 1000
-zeta_int_cache = local.zeta_int_cache = {}
+zeta_int_cache = MemoCache('zeta_int_cache')
 
 def mpf_zeta_int(s, prec, rnd=round_down):
     """
@@ -897,8 +972,9 @@ def mpf_zeta_int(s, prec, rnd=round_down):
     """
     wp = prec + 20
     s = int(s)
-    if s in zeta_int_cache and zeta_int_cache[s][0] >= wp:
-        return mpf_pos(zeta_int_cache[s][1], prec, rnd)
+    cached = zeta_int_cache.get(s)
+    if cached and cached[0] >= wp:
+        return mpf_pos(cached[1], prec, rnd)
     if s < 2:
         if s == 1:
             raise ValueError("zeta(1) pole")
@@ -940,7 +1016,8 @@ def mpf_zeta_int(s, prec, rnd=round_down):
         t += (((-1)**k * (d[k] - d[n])) << wp) // (k+1)**s
     t = (t << wp) // (-d[n])
     t = (t << wp) // ((1 << wp) - (1 << (wp+1-s)))
-    if (s in zeta_int_cache and zeta_int_cache[s][0] < wp) or (s not in zeta_int_cache):
+    cached = zeta_int_cache.get(s)
+    if not cached or cached[0] < wp:
         zeta_int_cache[s] = (wp, from_man_exp(t, -wp-wp))
     return from_man_exp(t, -wp-wp, prec, rnd)
 
@@ -1144,16 +1221,14 @@ def pow_fixed(x, n, wp):
     return y
 
 # TODO: optimize / cleanup interface / unify with list_primes
-sieve_cache = local.sieve_cache = []
-primes_cache = local.primes_cache = []
-mult_cache = local.mult_cache = []
+# Holds the largest sieve computed so far, under the key 0
+sieve_cache = MemoCache('sieve_cache')
 
 def primesieve(n):
-    global sieve_cache, primes_cache, mult_cache
-    if n < len(sieve_cache):
-        sieve = sieve_cache#[:n+1]
-        primes = primes_cache[:primes_cache.index(max(sieve))+1]
-        mult = mult_cache#[:n+1]
+    cached = sieve_cache.get(0)
+    if cached and n < len(cached[0]):
+        sieve, primes, mult = cached
+        primes = primes[:primes.index(max(sieve))+1]
         return sieve, primes, mult
     sieve = [0] * (n+1)
     mult = [0] * (n+1)
@@ -1170,9 +1245,7 @@ def primesieve(n):
                 n //= p
                 m += 1
             mult[i] = m
-    sieve_cache = sieve
-    primes_cache = primes
-    mult_cache = mult
+    sieve_cache[0] = sieve, primes, mult
     return sieve, primes, mult
 
 def zetasum_sieved(critical_line, sre, sim, a, n, wp):
@@ -1352,8 +1425,8 @@ def mpc_zetasum(s, a, n, derivatives, reflect, prec):
 
 SMALL_FACTORIAL_CACHE_SIZE = 150
 
-gamma_taylor_cache = local.gamma_taylor_cache = {}
-gamma_stirling_cache = local.gamma_stirling_cache = {}
+gamma_taylor_cache = MemoCache('gamma_taylor_cache')
+gamma_stirling_cache = MemoCache('gamma_stirling_cache')
 
 small_factorial_cache = [from_int(ifac(n)) for \
     n in range(SMALL_FACTORIAL_CACHE_SIZE+1)]
@@ -1453,8 +1526,9 @@ def gamma_taylor_coefficients(inprec):
         prec = inprec + (30-(inprec%30))
     else:
         prec = inprec
-    if prec in gamma_taylor_cache:
-        return gamma_taylor_cache[prec], prec
+    coeffs = gamma_taylor_cache.get(prec)
+    if coeffs is not None:
+        return coeffs, prec
 
     # Experimentally determined bounds
     if prec < 1000:
@@ -1464,9 +1538,11 @@ def gamma_taylor_coefficients(inprec):
         N = int(prec**0.787 + 2)
 
     # Reuse higher precision values
-    for cprec in gamma_taylor_cache:
-        if cprec > prec:
-            coeffs = [x>>(cprec-prec) for x in gamma_taylor_cache[cprec][-N:]]
+    for cprec in list(gamma_taylor_cache):
+        # The entry may have been evicted by another thread meanwhile
+        ccoeffs = gamma_taylor_cache.get(cprec)
+        if cprec > prec and ccoeffs is not None:
+            coeffs = [x>>(cprec-prec) for x in ccoeffs[-N:]]
             if inprec < 1000:
                 gamma_taylor_cache[prec] = coeffs
             return coeffs, prec
@@ -1546,12 +1622,13 @@ def gamma_fixed_taylor(xmpf, x, wp, prec, rnd, type):
             if type == 3: return mpf_neg(mpf_ln(mpf_abs(r), prec, rnd))
 
 def stirling_coefficient(n):
-    if n in gamma_stirling_cache:
-        return gamma_stirling_cache[n]
+    cached = gamma_stirling_cache.get(n)
+    if cached is not None:
+        return cached
     p, q = bernfrac(n)
     q *= MPZ(n*(n-1))
-    gamma_stirling_cache[n] = p, q, p.bit_length(), q.bit_length()
-    return gamma_stirling_cache[n]
+    cached = gamma_stirling_cache[n] = p, q, p.bit_length(), q.bit_length()
+    return cached
 
 def real_stirling_series(x, prec):
     """
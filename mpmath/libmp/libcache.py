@@ -0,0 +1,198 @@
+"""
+Registry of the memoization tables used by the low-level functions.
+
+Several functions in libmp keep tables of precomputed values (Taylor
+coefficients, Bernoulli numbers, logarithms of integers, ...) which are
+reused across calls, as does numerical integration with the quadrature
+nodes.  Each such table is a MemoCache instance registered here under
+its name.  The registry records hits, misses and the approximate memory
+used by every table, and optionally enforces a global memory budget by
+evicting the least recently used entries among all tables.
+
+The tables are shared between threads.  Lookups take no lock: a stored
+value is never modified afterwards (functions that extend a cached
+table in place must serialize this with their own lock), so a reader
+sees either the complete value or no entry.  Stores, removals and
+eviction hold the registry lock, which keeps the size accounting
+consistent.  Two threads that miss the same entry may both compute it;
+this is harmless, as the results are identical.  The hit counts and the
+LRU clock are updated without locking and are therefore approximate.
+"""
+
+import sys
+import threading
+from collections import namedtuple
+
+
+CacheInfo = namedtuple('CacheInfo', 'hits misses entries nbytes')
+
+registry = {}
+
+# Guards all modifications of the registered caches
+lock = threading.RLock()
+
+# Global memory budget in bytes (None for no limit) and the current
+# total size of all registered caches
+budget = None
+total_bytes = 0
+
+# Global clock for LRU ordering between caches
+_tick = 0
+
+_missing = object()
+
+
+def sizeof(obj):
+    """Approximate memory used by obj, including the contents of
+    tuples, lists and dicts and the data of mpf and mpc numbers."""
+    if hasattr(obj, '_mpf_'):
+        return sys.getsizeof(obj) + sizeof(obj._mpf_)
+    if hasattr(obj, '_mpc_'):
+        return sys.getsizeof(obj) + sizeof(obj._mpc_)
+    if isinstance(obj, (tuple, list)):
+        return sys.getsizeof(obj) + sum(sizeof(x) for x in obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(sizeof(k) + sizeof(v)
+                                        for k, v in obj.items())
+    return sys.getsizeof(obj)
+
+
+class MemoCache(dict):
+    """
+    A dictionary used as a memoization table, registered under a name.
+
+    Lookups with ``cache[key]`` or ``cache.get(key)`` count as hits,
+    and every store counts as a miss.  The approximate size of each
+    entry is computed when it is stored; code that extends a cached
+    value in place should report the added size with adjust_size().
+    """
+
+    def __init__(self, name):
+        dict.__init__(self)
+        if name in registry:
+            raise ValueError("cache %r is already registered" % name)
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._sizes = {}
+        self._ticks = {}
+        registry[name] = self
+
+    def __getitem__(self, key):
+        global _tick
+        value = dict.__getitem__(self, key)
+        self.hits += 1
+        _tick += 1
+        self._ticks[key] = _tick
+        return value
+
+    def get(self, key, default=None):
+        global _tick
+        # A single lookup, so that a concurrent eviction cannot
+        # remove the entry between a membership test and the access
+        value = dict.get(self, key, _missing)
+        if value is _missing:
+            return default
+        self.hits += 1
+        _tick += 1
+        self._ticks[key] = _tick
+        return value
+
+    def __setitem__(self, key, value):
+        global _tick, total_bytes
+        size = sizeof(key) + sizeof(value)
+        with lock:
+            old = self._sizes.get(key, 0)
+            dict.__setitem__(self, key, value)
+            self.misses += 1
+            _tick += 1
+            self._ticks[key] = _tick
+            self._sizes[key] = size
+            self.nbytes += size - old
+            total_bytes += size - old
+            if budget is not None and total_bytes > budget:
+                # Leave some room to avoid evicting on every store
+                evict(budget - budget//8, keep=(self, key))
+
+    def __delitem__(self, key):
+        global total_bytes
+        with lock:
+            dict.__delitem__(self, key)
+            self._ticks.pop(key, None)
+            size = self._sizes.pop(key)
+            self.nbytes -= size
+            total_bytes -= size
+
+    def adjust_size(self, key, delta):
+        """Add delta bytes to the recorded size of the entry key, after
+        its value was modified in place.  Nothing is done if the entry
+        has been removed in the meantime."""
+        global total_bytes
+        with lock:
+            if key not in self._sizes:
+                return
+            self._sizes[key] += delta
+            self.nbytes += delta
+            total_bytes += delta
+            if budget is not None and total_bytes > budget:
+                evict(budget - budget//8, keep=(self, key))
+
+    def clear(self):
+        global total_bytes
+        with lock:
+            dict.clear(self)
+            self._sizes.clear()
+            self._ticks.clear()
+            total_bytes -= self.nbytes
+            self.nbytes = 0
+            self.hits = self.misses = 0
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, len(self), self.nbytes)
+
+    def __repr__(self):
+        return "<MemoCache %r: %i entries, %i bytes>" % (self.name, len(self),
+                                                         self.nbytes)
+
+
+def evict(limit, keep=(None, None)):
+    """Remove least recently used entries from the registered caches
+    until their total size is at most limit bytes.  The entry keep,
+    given as (cache, key), is never removed."""
+    with lock:
+        # Eviction is rare, so simply sort all entries by last use.
+        # Lookups may update the clock concurrently, so work on a copy.
+        entries = sorted((t, cache, key) for cache in registry.values()
+                         for key, t in list(cache._ticks.items())
+                         if key in cache)
+        for t, cache, key in entries:
+            if total_bytes <= limit:
+                break
+            if cache is not keep[0] or key != keep[1]:
+                del cache[key]
+
+
+def set_budget(nbytes):
+    """Set the memory budget for all registered caches, evicting entries
+    if needed.  With nbytes=None, the caches may grow without limit."""
+    global budget
+    with lock:
+        budget = nbytes
+        if nbytes is not None:
+            evict(nbytes)
+
+
+def cache_info():
+    """Return a dict mapping the name of each registered cache to
+    a CacheInfo tuple (hits, misses, entries, nbytes)."""
+    return {name: cache.info() for name, cache in registry.items()}
+
+
+def cache_clear(name=None):
+    """Clear the cache with the given name, or all registered caches."""
+    if name is None:
+        for cache in registry.values():
+            cache.clear()
+    else:
+        registry[name].clear()
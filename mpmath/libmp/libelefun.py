@@ -12,10 +12,13 @@
 import math
 import threading
 import warnings
+from functools import partial
 
+from . import libstore
 from .backend import BACKEND, MPZ, MPZ_FIVE, MPZ_ONE, MPZ_TWO, MPZ_ZERO
-from .libintmath import (giant_steps, ifib, isqrt_fast, lshift, rshift,
-                         sqrt_fixed)
+from .libcache import MemoCache
+from .libintmath import (giant_steps, idivmod, ifib, isqrt_fast, lshift,
+                         rshift, sqrt_fixed)
 from .libmpf import (ComplexResult, bctable, finf, fnan, fninf, fnone, fone,
                      from_int, from_man_exp, from_rational, fzero, mpf_abs,
                      mpf_add, mpf_cmp, mpf_div, mpf_mul, mpf_mul_int, mpf_neg,
@@ -25,9 +28,6 @@
                      round_up, to_fixed, to_int)
 
 
-local = threading.local()
-
-
 #-------------------------------------------------------------------------------
 # Tuning parameters
 #-------------------------------------------------------------------------------
@@ -48,23 +48,28 @@
 else:
     COS_SIN_CACHE_PREC = 200
 COS_SIN_CACHE_STEP = 8
-cos_sin_cache = local.cos_sin_cache = {}
+cos_sin_cache = MemoCache('cos_sin_cache')
 
 # Number of integer logarithms to cache (for zeta sums)
 MAX_LOG_INT_CACHE = 2000
-log_int_cache = local.log_int_cache = {}
+log_int_cache = MemoCache('log_int_cache')
 
 LOG_TAYLOR_PREC = 2500  # Use Taylor series with caching up to this prec
 LOG_TAYLOR_SHIFT = 9    # Cache log values in steps of size 2^-N
-log_taylor_cache = local.log_taylor_cache = {}
+log_taylor_cache = MemoCache('log_taylor_cache')
 # prec/size ratio of x for fastest convergence in AGM formula
 LOG_AGM_MAG_PREC_RATIO = 20
 
 ATAN_TAYLOR_PREC = 3000  # Same as for log
 ATAN_TAYLOR_SHIFT = 7   # steps of size 2^-N
-atan_taylor_cache = local.atan_taylor_cache = {}
+atan_taylor_cache = MemoCache('atan_taylor_cache')
 
 
+# Number of worker processes used to compute constants by binary
+# splitting, and the smallest precision at which they are used
+BS_WORKERS = 1
+BS_PARALLEL_PREC = 100000
+
 # ~= next power of two + 20
 cache_prec_steps = [22,22]
 for k in range(1, LOG_TAYLOR_PREC.bit_length()+1):
@@ -84,18 +89,43 @@ def constant_memo(f):
     constants. This decorator should be applied to a
     function taking a single argument prec as input and
     returning a fixed-point value with the given precision.
+
+    The cached value is replaced as a whole (an immutable tuple), so
+    readers need no locking.  Computations of a new value are done
+    under a lock, so that several threads asking for the same
+    constant at a high precision do not all compute it.
+
+    Values needed at a precision of at least libstore.STORE_MIN_PREC
+    bits are looked up in, and saved to, the on-disk store if it is
+    enabled (see libstore.set_store()).
     """
     f._prec_val = -1, None
+    lock = threading.Lock()
     def g(prec, **kwargs):
         memo_prec, memo_val = f._prec_val
         if prec <= memo_prec:
             return memo_val >> (memo_prec-prec)
-        memo_prec = int(prec*1.05+10)
-        memo_val = f(memo_prec, **kwargs)
-        f._prec_val = memo_prec, memo_val
+        with lock:
+            # Another thread may have computed it in the meantime
+            memo_prec, memo_val = f._prec_val
+            if prec > memo_prec:
+                memo_prec = int(prec*1.05+10)
+                stored = None
+                use_store = (libstore.store_dir is not None and not kwargs
+                             and memo_prec >= libstore.STORE_MIN_PREC)
+                if use_store:
+                    stored = libstore.load_fixed(f.__name__, prec)
+                if stored:
+                    memo_prec, memo_val = stored
+                else:
+                    memo_val = f(memo_prec, **kwargs)
+                    if use_store:
+                        libstore.save_fixed(f.__name__, memo_prec, memo_val)
+                f._prec_val = memo_prec, memo_val
         return memo_val >> (memo_prec-prec)
     g.__name__ = f.__name__
     g.__doc__ = f.__doc__
+    g.__wrapped__ = f
     return g
 
 def def_mpf_constant(fixed):
@@ -115,6 +145,31 @@ def f(prec, rnd=round_down):
     f.__doc__ = fixed.__doc__
     return f
 
+def bs_parallel(bs, merge, a, b, prec):
+    """
+    Compute bs(a, b), where bs is a binary splitting function returning
+    a tuple of integers, and merge(bs(a, m), bs(m, b)) == bs(a, b).
+
+    With BS_WORKERS > 1 and prec >= BS_PARALLEL_PREC, the range
+    is divided into one chunk per worker, the chunks are evaluated in
+    a pool of processes and the results are merged pairwise, also in
+    the pool.  Both bs and merge must be picklable, e.g. module-level
+    functions or partial objects of those.
+    """
+    workers = BS_WORKERS
+    if workers <= 1 or prec < BS_PARALLEL_PREC or b - a < 2*workers:
+        return bs(a, b)
+    from concurrent.futures import ProcessPoolExecutor
+    bounds = [a + (b-a)*k//workers for k in range(workers+1)]
+    with ProcessPoolExecutor(workers) as pool:
+        parts = list(pool.map(bs, bounds[:-1], bounds[1:]))
+        while len(parts) > 1:
+            merged = list(pool.map(merge, parts[0::2], parts[1::2]))
+            if len(parts) & 1:
+                merged.append(parts[-1])
+            parts = merged
+    return parts[0]
+
 def bsp_acot(q, a, b, hyperbolic):
     if b - a == 1:
         a1 = MPZ(2*a + 3)
@@ -123,8 +178,12 @@ def bsp_acot(q, a, b, hyperbolic):
         else:
             return -MPZ_ONE, a1 * q**2, a1
     m = (a+b)//2
-    p1, q1, r1 = bsp_acot(q, a, m, hyperbolic)
-    p2, q2, r2 = bsp_acot(q, m, b, hyperbolic)
+    return bsp_acot_merge(bsp_acot(q, a, m, hyperbolic),
+                          bsp_acot(q, m, b, hyperbolic))
+
+def bsp_acot_merge(left, right):
+    p1, q1, r1 = left
+    p2, q2, r2 = right
     return q2*p1 + r1*p2, q1*q2, r1*r2
 
 # the acoth(x) series converges like the geometric series for x^2
@@ -135,8 +194,9 @@ def acot_fixed(a, prec, hyperbolic):
     http://numbers.computation.free.fr/Constants/Algorithms/splitting.html
     """
     N = int(0.35 * prec/math.log(a) + 20)
-    p, q, r = bsp_acot(a, 0,N, hyperbolic)
-    return ((p+q)<<prec)//(q*a)
+    p, q, r = bs_parallel(partial(bsp_acot, a, hyperbolic=hyperbolic),
+                          bsp_acot_merge, 0, N, prec)
+    return idivmod((p+q)<<prec, q*a)[0]
 
 def machin(coefs, prec, hyperbolic=False):
     """
@@ -218,13 +278,15 @@ def bs_chudnovsky(a, b, level, verbose):
         if verbose and level < 4:
             print("  binary splitting", a, b)
         mid = (a+b)//2
-        g1, p1, q1 = bs_chudnovsky(a, mid, level+1, verbose)
-        g2, p2, q2 = bs_chudnovsky(mid, b, level+1, verbose)
-        p = p1*p2
-        g = g1*g2
-        q = q1*p2 + q2*g1
+        return bs_chudnovsky_merge(bs_chudnovsky(a, mid, level+1, verbose),
+                                   bs_chudnovsky(mid, b, level+1, verbose))
     return g, p, q
 
+def bs_chudnovsky_merge(left, right):
+    g1, p1, q1 = left
+    g2, p2, q2 = right
+    return g1*g2, p1*p2, q1*p2 + q2*g1
+
 @constant_memo
 def pi_fixed(prec, verbose=False, verbose_base=None):
     """
@@ -237,9 +299,13 @@ def pi_fixed(prec, verbose=False, verbose_base=None):
     N = int(prec/3.3219280948/14.181647462 + 2)
     if verbose:
         print("binary splitting with N =", N)
-    g, p, q = bs_chudnovsky(0, N, 0, verbose)
+    if verbose:
+        g, p, q = bs_chudnovsky(0, N, 0, verbose)
+    else:
+        g, p, q = bs_parallel(partial(bs_chudnovsky, level=0, verbose=False),
+                              bs_chudnovsky_merge, 0, N, prec)
     sqrtC = isqrt_fast(CHUD_C<<(2*prec))
-    v = p*CHUD_C*sqrtC//((q+CHUD_A*p)*CHUD_D)
+    v = idivmod(p*CHUD_C*sqrtC, (q+CHUD_A*p)*CHUD_D)[0]
     return v
 
 def degree_fixed(prec):
@@ -253,8 +319,11 @@ def bspe(a, b):
     if b-a == 1:
         return MPZ_ONE, MPZ(b)
     m = (a+b)//2
-    p1, q1 = bspe(a, m)
-    p2, q2 = bspe(m, b)
+    return bspe_merge(bspe(a, m), bspe(m, b))
+
+def bspe_merge(left, right):
+    p1, q1 = left
+    p2, q2 = right
     return p1*q2+p2, q1*q2
 
 @constant_memo
@@ -270,8 +339,8 @@ def e_fixed(prec):
     # Slight overestimate of N needed for 1/N! < 2**(-prec)
     # This could be tightened for large N.
     N = int(1.1*prec/math.log(prec) + 20)
-    p, q = bspe(0,N)
-    return ((p+q)<<prec)//q
+    p, q = bs_parallel(bspe, bspe_merge, 0, N, prec)
+    return idivmod((p+q)<<prec, q)[0]
 
 @constant_memo
 def phi_fixed(prec):
@@ -515,8 +584,9 @@ def log_int_fixed(n, prec, ln2=None):
     Fast computation of log(n), caching the value for small n,
     intended for zeta sums.
     """
-    if n in log_int_cache:
-        value, vprec = log_int_cache[n]
+    cached = log_int_cache.get(n)
+    if cached is not None:
+        value, vprec = cached
         if vprec >= prec:
             return value >> (vprec - prec)
     wp = prec + 10
@@ -630,8 +700,9 @@ def log_taylor_cached(x, prec):
     n = x >> (prec-LOG_TAYLOR_SHIFT)
     cached_prec = cache_prec_steps[prec]
     dprec = cached_prec - prec
-    if (n, cached_prec) in log_taylor_cache:
-        a, log_a = log_taylor_cache[n, cached_prec]
+    cached = log_taylor_cache.get((n, cached_prec))
+    if cached is not None:
+        a, log_a = cached
     else:
         a = n << (cached_prec - LOG_TAYLOR_SHIFT)
         log_a = log_taylor(a, cached_prec, 8)
@@ -821,8 +892,9 @@ def atan_taylor_get_cached(n, prec):
     # Round to next power of 2
     prec2 = (1<<(prec-1).bit_length()) + 20
     dprec = prec2 - prec
-    if (n, prec2) in atan_taylor_cache:
-        a, atan_a = atan_taylor_cache[n, prec2]
+    cached = atan_taylor_cache.get((n, prec2))
+    if cached is not None:
+        a, atan_a = cached
     else:
         a = n << (prec2 - ATAN_TAYLOR_SHIFT)
         atan_a = atan_newton(a, prec2)
@@ -1155,11 +1227,12 @@ def cos_sin_basecase(x, prec):
     precs = prec - COS_SIN_CACHE_STEP
     t = x >> precs
     n = int(t)
-    if n not in cos_sin_cache:
+    cached = cos_sin_cache.get(n)
+    if cached is None:
         w = t<<(10+COS_SIN_CACHE_PREC-COS_SIN_CACHE_STEP)
         cos_t, sin_t = exponential_series(w, 10+COS_SIN_CACHE_PREC, 2)
-        cos_sin_cache[n] = (cos_t>>10), (sin_t>>10)
-    cos_t, sin_t = cos_sin_cache[n]
+        cached = cos_sin_cache[n] = (cos_t>>10), (sin_t>>10)
+    cos_t, sin_t = cached
     offset = COS_SIN_CACHE_PREC - prec
     cos_t >>= offset
     sin_t >>= offset
@@ -1435,3 +1508,128 @@ def exp_fixed(x, prec, ln2=None):
         return v << n
     else:
         return v >> (-n)
+
+
+#-------------------------------------------------------------------------------
+# Batched evaluation
+#-------------------------------------------------------------------------------
+
+# The following functions evaluate a function at many points with the same
+# precision.  The constants needed for argument reduction are computed
+# once for the whole batch, at the largest precision needed by any of the
+# arguments, and then just truncated for each argument.  Arguments which
+# need special treatment (special values, huge or tiny magnitudes, etc)
+# are passed to the scalar functions.
+
+def mpf_exp_many(xs, prec, rnd=round_down):
+    """Compute exp(x) for all raw mpfs in the sequence xs."""
+    xs = list(xs)
+    wp = prec + 14
+    maxmag = max((x[2] + x[3] for x in xs if x[1]), default=0)
+    maxmag = min(maxmag, wp)
+    if maxmag > 1:
+        lg2_prec = wp + maxmag
+        lg2 = ln2_fixed(lg2_prec)
+    results = []
+    for x in xs:
+        sign, man, exp, bc = x
+        mag = bc + exp
+        if not man or mag > maxmag or mag < -wp or (prec > 600 and exp >= 0):
+            results.append(mpf_exp(x, prec, rnd))
+            continue
+        if sign:
+            man = -man
+        if mag > 1:
+            # Same reduction as in mpf_exp()
+            wpmod = wp + mag
+            offset = exp + wpmod
+            if offset >= 0:
+                t = man << offset
+            else:
+                t = man >> (-offset)
+            n, t = divmod(t, lg2 >> (lg2_prec - wpmod))
+            n = int(n)
+            t >>= mag
+        else:
+            offset = exp + wp
+            if offset >= 0:
+                t = man << offset
+            else:
+                t = man >> (-offset)
+            n = 0
+        results.append(from_man_exp(exp_basecase(t, wp), n-wp, prec, rnd))
+    return results
+
+def mpf_ln_many(xs, prec, rnd=round_down):
+    """
+    Compute log(x) for all raw mpfs in the sequence xs.  If some x is
+    negative, ComplexResult is raised.
+    """
+    xs = list(xs)
+    wp = prec + 20
+    if wp <= LOG_TAYLOR_PREC:
+        ln2 = ln2_fixed(wp)
+    results = []
+    for x in xs:
+        sign, man, exp, bc = x
+        mag = exp + bc
+        # Arguments close to 1 may need extra precision to
+        # compensate for cancellation
+        if (not man or sign or man == 1 or abs(mag) <= 1
+                or abs(mag) > 10000 or wp > LOG_TAYLOR_PREC):
+            results.append(mpf_ln(x, prec, rnd))
+            continue
+        m = log_taylor_cached(lshift(man, wp-bc), wp) + mag*ln2
+        results.append(from_man_exp(m, -wp, prec, rnd))
+    return results
+
+def mpf_cos_sin_many(xs, prec, rnd=round_down):
+    """Compute (cos(x), sin(x)) for all raw mpfs in the sequence xs."""
+    xs = list(xs)
+    wp = prec + 10
+    maxmag = max((x[2] + x[3] for x in xs if x[1]), default=0)
+    maxmag = min(maxmag, wp)
+    if maxmag > 0:
+        # Extra bits as for the first step in mod_pi2()
+        pi2_prec = wp + maxmag + 20 - 1
+        pi2_big = pi_fixed(pi2_prec)
+    results = []
+    for x in xs:
+        sign, man, exp, bc = x
+        mag = bc + exp
+        if not man or mag > maxmag or mag < -wp:
+            results.append(mpf_cos_sin(x, prec, rnd))
+            continue
+        if mag > 0:
+            # Same reduction as in mod_pi2(), falling back to it
+            # if there is too much cancellation
+            wpmod = wp + mag + 20
+            pi2 = pi2_big >> (pi2_prec - wpmod + 1)
+            offset = wpmod + exp
+            if offset >= 0:
+                t = man << offset
+            else:
+                t = man >> (-offset)
+            n, y = divmod(t, pi2)
+            if y > (pi2 >> 1):
+                small = pi2 - y
+            else:
+                small = y
+            if not small >> (wp+mag-10):
+                results.append(mpf_cos_sin(x, prec, rnd))
+                continue
+            n = int(n)
+            t = y >> mag
+            twp = wpmod - mag
+        else:
+            t, n, twp = mod_pi2(man, exp, mag, wp)
+        c, s = cos_sin_basecase(t, twp)
+        m = n & 3
+        if   m == 1: c, s = -s, c
+        elif m == 2: c, s = -c, -s
+        elif m == 3: c, s = s, -c
+        if sign:
+            s = -s
+        results.append((from_man_exp(c, -twp, prec, rnd),
+                        from_man_exp(s, -twp, prec, rnd)))
+    return results
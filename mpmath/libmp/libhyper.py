@@ -5,10 +5,16 @@
 cases are also provided.
 """
 
+import functools
+import marshal
 import math
+import sys
+import types
 
-from .backend import MPZ, MPZ_ONE, MPZ_ZERO
+from . import libstore
+from .backend import MPQ, MPZ, MPZ_ONE, MPZ_ZERO
 from .gammazeta import euler_fixed, mpf_euler, mpf_gamma_int
+from .libcache import MemoCache
 from .libelefun import (agm_fixed, mpf_cos_sin, mpf_exp, mpf_ln, mpf_pi,
                         mpf_sin, mpf_sqrt, pi_fixed)
 from .libintmath import ifac, sqrt_fixed
@@ -50,11 +56,21 @@ def make_hyp_summator(key):
     Returns a function that sums a generalized hypergeometric series,
     for given parameter types (integer, rational, real, complex).
 
+    With ztype 'R*' or 'C*' instead of 'R' or 'C', the function takes
+    a list of arguments and sums all the series in one pass over the
+    terms, computing the ratio of the parameter factors of each term
+    only once.  It returns a list with a tuple (value, have_complex,
+    magnitude) for each argument.
+
     """
     p, q, param_types, ztype = key
+    many = ztype.endswith('*')
+    ztype = ztype[0]
 
     pstring = "".join(param_types)
     fname = "hypsum_%i_%i_%s_%s_%s" % (p, q, pstring[:p], pstring[p:], ztype)
+    if many:
+        fname += "_many"
     #print "generating hypsum", fname
 
     have_complex_param = 'C' in param_types
@@ -79,30 +95,58 @@ def make_hyp_summator(key):
     add("LOW = -HIGH")
 
     # Setup code
-    add("SRE = PRE = one = (MPZ_ONE << wp)")
-    if have_complex:
-        add("SIM = PIM = MPZ_ZERO")
+    if many:
+        add("one = (MPZ_ONE << wp)")
+        add("ZRE = []")
+        if have_complex_arg:
+            add("ZIM = []")
+        add("for z in zs:")
+        indent = "    "
+    else:
+        add("SRE = PRE = one = (MPZ_ONE << wp)")
+        if have_complex:
+            add("SIM = PIM = MPZ_ZERO")
+        indent = ""
 
     if have_complex_arg:
-        add("xsign, xm, xe, xbc = z[0]")
-        add("if xsign: xm = -xm")
-        add("ysign, ym, ye, ybc = z[1]")
-        add("if ysign: ym = -ym")
+        add(indent + "xsign, xm, xe, xbc = z[0]")
+        add(indent + "if xsign: xm = -xm")
+        add(indent + "ysign, ym, ye, ybc = z[1]")
+        add(indent + "if ysign: ym = -ym")
     else:
-        add("xsign, xm, xe, xbc = z")
-        add("if xsign: xm = -xm")
-
-    add("offset = xe + wp")
-    add("if offset >= 0:")
-    add("    ZRE = xm << offset")
-    add("else:")
-    add("    ZRE = xm >> (-offset)")
+        add(indent + "xsign, xm, xe, xbc = z")
+        add(indent + "if xsign: xm = -xm")
+
+    zre, zim = ("ZRE.append(%s)", "ZIM.append(%s)") if many else \
+               ("ZRE = %s", "ZIM = %s")
+    add(indent + "offset = xe + wp")
+    add(indent + "if offset >= 0:")
+    add(indent + "    " + zre % "xm << offset")
+    add(indent + "else:")
+    add(indent + "    " + zre % "xm >> (-offset)")
     if have_complex_arg:
-        add("offset = ye + wp")
-        add("if offset >= 0:")
-        add("    ZIM = ym << offset")
-        add("else:")
-        add("    ZIM = ym >> (-offset)")
+        add(indent + "offset = ye + wp")
+        add(indent + "if offset >= 0:")
+        add(indent + "    " + zim % "ym << offset")
+        add(indent + "else:")
+        add(indent + "    " + zim % "ym >> (-offset)")
+
+    if many:
+        add("m = len(ZRE)")
+        add("SRE = [one]*m")
+        add("PRE = [one]*m")
+        if have_complex:
+            add("SIM = [MPZ_ZERO]*m")
+            add("PIM = [MPZ_ZERO]*m")
+        # The ratio of the parameter factors is computed with s fractional
+        # bits, enough for an error of a few units in the updated terms
+        add("ZMAG = 0")
+        add("for x in ZRE%s:" % (" + ZIM" if have_complex_arg else ""))
+        add("    ZMAG = max(ZMAG, x.bit_length() - wp)")
+        add("s = wp + 1 + ZMAG")
+        if have_complex:
+            add("sz = wp + ZMAG")
+        add("active = range(m)")
 
     for i, flag in enumerate(param_types):
         W = ["A", "B"][i >= p]
@@ -151,11 +195,12 @@ def make_hyp_summator(key):
     # LOOP
     add("for n in range(1,10**8):")
 
-    add("    if n in magnitude_check:")
-    add("        p_mag = PRE.bit_length()")
-    if have_complex:
-        add("        p_mag = max(p_mag, PIM.bit_length())")
-    add("        magnitude_check[n] = wp-p_mag")
+    if not many:
+        add("    if n in magnitude_check:")
+        add("        p_mag = PRE.bit_length()")
+        if have_complex:
+            add("        p_mag = max(p_mag, PIM.bit_length())")
+        add("        magnitude_check[n] = wp-p_mag")
 
     # Real factors
     multiplier = " * ".join(["AINT_#".replace("#", str(i)) for i in aint] + \
@@ -178,7 +223,72 @@ def make_hyp_summator(key):
     add("        raise ZeroDivisionError")
 
     # Update product
-    if have_complex:
+    if many:
+        add("    RRE = MPZ_ONE << s")
+        if have_complex_param:
+            add("    RIM = MPZ_ZERO")
+        R = ["RRE", "RIM"] if have_complex_param else ["RRE"]
+        for X in R:
+            for k in range(cancellable_real): add("    %s = %s * AREAL_%i // BREAL_%i" % (X, X, areal[k], breal[k]))
+            for i in noncancellable_real_num: add("    %s = (%s * AREAL_%i) >> wp" % (X, X, i))
+            for i in noncancellable_real_den: add("    %s = (%s << wp) // BREAL_%i" % (X, X, i))
+            if multiplier:
+                add("    %s = %s * mul // div" % (X, X))
+            else:
+                add("    %s = %s // div" % (X, X))
+
+        for i in acomplex:
+            add("    RRE, RIM = RRE*ACRE_#-RIM*ACIM_#, RIM*ACRE_#+RRE*ACIM_#".replace("#", str(i)))
+            add("    RRE >>= wp")
+            add("    RIM >>= wp")
+
+        for i in bcomplex:
+            add("    mag = BCRE_#*BCRE_#+BCIM_#*BCIM_#".replace("#", str(i)))
+            add("    re = RRE*BCRE_# + RIM*BCIM_#".replace("#", str(i)))
+            add("    im = RIM*BCRE_# - RRE*BCIM_#".replace("#", str(i)))
+            add("    RRE = (re << wp) // mag")
+            add("    RIM = (im << wp) // mag")
+
+        # Multiply the term of each series by the ratio and by its z
+        if have_complex:
+            add("    sw = s - ZMAG")
+        else:
+            add("    sw = s + wp")
+        add("    bits = wp")
+        add("    rest = []")
+        add("    for j in active:")
+        if have_complex:
+            # The product W of the ratio and z keeps sw fractional bits
+            if have_complex_param and have_complex_arg:
+                add("        WRE = (RRE*ZRE[j] - RIM*ZIM[j]) >> sz")
+                add("        WIM = (RRE*ZIM[j] + RIM*ZRE[j]) >> sz")
+            elif have_complex_param:
+                add("        WRE = (RRE*ZRE[j]) >> sz")
+                add("        WIM = (RIM*ZRE[j]) >> sz")
+            else:
+                add("        WRE = (RRE*ZRE[j]) >> sz")
+                add("        WIM = (RRE*ZIM[j]) >> sz")
+            add("        P, Q = PRE[j], PIM[j]")
+            add("        P, Q = (P*WRE - Q*WIM) >> sw, (Q*WRE + P*WIM) >> sw")
+            add("        PRE[j] = P")
+            add("        PIM[j] = Q")
+            add("        SRE[j] += P")
+            add("        SIM[j] += Q")
+            add("        if not ((HIGH > P > LOW) and (HIGH > Q > LOW)):")
+            add("            rest.append(j)")
+            add("            bits = max(bits, P.bit_length(), Q.bit_length())")
+        else:
+            add("        P = PRE[j] = (PRE[j] * RRE * ZRE[j]) >> sw")
+            add("        SRE[j] += P")
+            add("        if not (HIGH > P > LOW):")
+            add("            rest.append(j)")
+            add("            bits = max(bits, P.bit_length())")
+        add("    if not rest:")
+        add("        break")
+        add("    active = rest")
+        add("    s = bits + ZMAG")
+
+    elif have_complex:
 
         # TODO: when there are several real parameters and just a few complex
         # (maybe just the complex argument), we only need to do about
@@ -229,7 +339,9 @@ def make_hyp_summator(key):
             add("    PRE = ((PRE * ZRE) >> wp) // div")
 
     # Add product to sum
-    if have_complex:
+    if many:
+        pass
+    elif have_complex:
         add("    SRE += PRE")
         add("    SIM += PIM")
         add("    if (HIGH > PRE > LOW) and (HIGH > PIM > LOW):")
@@ -255,41 +367,505 @@ def make_hyp_summator(key):
     for i in acomplex: add("    ACRE_# += one".replace("#", str(i)))
     for i in bcomplex: add("    BCRE_# += one".replace("#", str(i)))
 
+    if many:
+        add("results = []")
+        add("for j in range(m):")
+        indent = "    "
+        SRE, SIM = "SRE[j]", "SIM[j]"
+        ret = "results.append(%s)"
+    else:
+        indent = ""
+        ret = "return %s"
+        SRE, SIM = "SRE", "SIM"
+
     if have_complex:
-        add("a = from_man_exp(SRE, -wp, prec, 'n')")
-        add("b = from_man_exp(SIM, -wp, prec, 'n')")
-
-        add("if SRE:")
-        add("    if SIM:")
-        add("        magn = max(a[2]+a[3], b[2]+b[3])")
-        add("    else:")
-        add("        magn = a[2]+a[3]")
-        add("elif SIM:")
-        add("    magn = b[2]+b[3]")
-        add("else:")
-        add("    magn = -wp+1")
-
-        add("return (a, b), True, magn")
+        add(indent + "a = from_man_exp(%s, -wp, prec, 'n')" % SRE)
+        add(indent + "b = from_man_exp(%s, -wp, prec, 'n')" % SIM)
+
+        add(indent + "if %s:" % SRE)
+        add(indent + "    if %s:" % SIM)
+        add(indent + "        magn = max(a[2]+a[3], b[2]+b[3])")
+        add(indent + "    else:")
+        add(indent + "        magn = a[2]+a[3]")
+        add(indent + "elif %s:" % SIM)
+        add(indent + "    magn = b[2]+b[3]")
+        add(indent + "else:")
+        add(indent + "    magn = -wp+1")
+
+        add(indent + ret % "((a, b), True, magn)")
     else:
-        add("a = from_man_exp(SRE, -wp, prec, 'n')")
+        add(indent + "a = from_man_exp(%s, -wp, prec, 'n')" % SRE)
 
-        add("if SRE:")
-        add("    magn = a[2]+a[3]")
-        add("else:")
-        add("    magn = -wp+1")
+        add(indent + "if %s:" % SRE)
+        add(indent + "    magn = a[2]+a[3]")
+        add(indent + "else:")
+        add(indent + "    magn = -wp+1")
 
-        add("return a, False, magn")
+        add(indent + ret % "(a, False, magn)")
+
+    if many:
+        add("return results")
 
     source = "\n".join(("    " + line) for line in source)
-    source = ("def %s(coeffs, z, prec, wp, epsshift, magnitude_check, **kwargs):\n" % fname) + source
+    if many:
+        source = ("def %s(coeffs, zs, prec, wp, epsshift, **kwargs):\n" % fname) + source
+    else:
+        source = ("def %s(coeffs, z, prec, wp, epsshift, magnitude_check, **kwargs):\n" % fname) + source
 
     namespace = {}
 
-    exec(source, globals(), namespace)
+    exec(compile_summator(source), globals(), namespace)
 
     #print source
     return source, namespace[fname]
 
+def _load_code(data):
+    code = marshal.loads(data)
+    if type(code) is not types.CodeType:
+        raise TypeError("not a code object")
+    return code
+
+def compile_summator(source):
+    """
+    Compile the source of a summator, or load the compiled code from
+    the on-disk store (see libstore) if it is enabled.  The code is
+    stored under a hash of the source and of the Python version.
+    """
+    tag = sys.implementation.cache_tag
+    if libstore.store_dir is None or tag is None:
+        summator_stats['compiled'] += 1
+        return compile(source, '<hypsum>', 'exec')
+    import hashlib
+    name = 'hypsum-%s' % hashlib.sha1((tag + source).encode()).hexdigest()
+    code = libstore.read(name, 0, _load_code)
+    if code is None:
+        code = compile(source, '<hypsum>', 'exec')
+        libstore.write(name, 0, marshal.dumps(code))
+        summator_stats['compiled'] += 1
+    else:
+        summator_stats['loaded'] += 1
+    return code
+
+# Summators shared by all contexts, by key (p, q, param_types, ztype)
+hyp_summators = MemoCache('hyp_summators')
+
+# Number of summators compiled and loaded from the on-disk store, and
+# number of requests for each key
+summator_stats = {'compiled': 0, 'loaded': 0, 'requests': {}}
+
+def hyp_summator(key, prec=0, z=None):
+    """
+    Return the summator for the given key, as created by
+    make_hyp_summator(), generating it if needed.
+
+    At a precision prec of HYPSUM_RECT_CUTOFF bits or more, series
+    with integer and rational parameters are instead summed with
+    hypsum_rect().  If the argument z is given and is an exact rational
+    number with small numerator and denominator (see
+    rational_argument()), they are summed with hypsum_bsplit() from
+    HYPSUM_BSPLIT_CUTOFF bits.  The argument may be an MPQ, which the
+    other summators convert to an mpf value.
+    """
+    requests = summator_stats['requests']
+    requests[key] = requests.get(key, 0) + 1
+    f = hyp_summators.get(key)
+    if f is None:
+        f = hyp_summators[key] = make_hyp_summator(key)[1]
+    if key[3] in ('R', 'C') and all(t in 'ZQ' for t in key[2]):
+        if prec >= HYPSUM_BSPLIT_CUTOFF and z is not None and \
+                rational_argument(z) is not None:
+            return functools.partial(hypsum_bsplit, key, f)
+        if prec >= HYPSUM_RECT_CUTOFF:
+            f = functools.partial(hypsum_rect, key, f)
+    if isinstance(z, MPQ):
+        f = functools.partial(hypsum_mpq, f)
+    return f
+
+def prebuild_summators(maxp=3, maxq=3, types='ZQRC'):
+    """
+    Generate the summators for all p <= maxp, q <= maxq, parameters
+    all of the same type and real or complex argument, so that they
+    are saved in the on-disk store for later processes.
+    """
+    for p in range(maxp+1):
+        for q in range(maxq+1):
+            for t in types:
+                for ztype in 'RC':
+                    key = p, q, (t,)*(p+q), ztype
+                    if key not in hyp_summators:
+                        hyp_summators[key] = make_hyp_summator(key)[1]
+
+def hyp_factors(p, param_types, coeffs):
+    """
+    For a series with integer and rational parameters, return lists
+    nfactors and dfactors of pairs (A, B) such that the ratio of the
+    terms n+1 and n is num(n)/den(n) times the argument, where num(n)
+    and den(n) are the products of A + n*B over the pairs.
+    """
+    nfactors = []
+    dfactors = [(MPZ_ONE, MPZ_ONE)]
+    for i, c in enumerate(coeffs):
+        if param_types[i] == 'Z':
+            A, B = MPZ(c), MPZ_ONE
+        else:
+            A, B = MPZ(c.numerator), MPZ(c.denominator)
+        if i < p:
+            nfactors.append((A, B))
+            if B != 1:
+                dfactors.append((B, MPZ_ZERO))
+        else:
+            dfactors.append((A, B))
+            if B != 1:
+                nfactors.append((B, MPZ_ZERO))
+    return nfactors, dfactors
+
+# Precision (in bits) from which series with integer and rational
+# parameters are summed by rectangular splitting
+HYPSUM_RECT_CUTOFF = 2000
+
+def hypsum_rect(key, summator, coeffs, z, prec, wp, epsshift,
+                magnitude_check, **kwargs):
+    """
+    Sum a hypergeometric series with integer and rational parameters
+    (types 'Z' and 'Q') using rectangular splitting (Smith's method).
+    The arguments and the result are those of the summators created by
+    make_hyp_summator(key), which is called as summator when terms near
+    poles need to be checked.
+
+    The powers z, z^2, ..., z^m are computed once.  In a block of m
+    terms, the term n+j is then T*z^j*c_j/D where T is the term n, D
+    is the product of the denominators of the ratios of the terms in
+    the block, and c_j is an exact integer.  So a block costs m scalar
+    multiplications of the powers by the c_j and a few full-precision
+    multiplications, instead of m full-precision multiplications.
+
+    """
+    if magnitude_check:
+        return summator(coeffs, z, prec, wp, epsshift, magnitude_check,
+                        **kwargs)
+    p, q, param_types, ztype = key
+    have_complex = ztype == 'C'
+    MAX = kwargs.get('maxterms', wp*100)
+    # Block size, and guard bits for the rounding errors in the powers
+    # and in the scalar products
+    m = max(2, int(1.5*wp**0.25))
+    wp += 2*m.bit_length() + 10
+    HIGH = MPZ_ONE << (epsshift + 2*m.bit_length() + 10)
+    one = MPZ_ONE << wp
+    nfactors, dfactors = hyp_factors(p, param_types, coeffs)
+    if have_complex:
+        ZRE = to_fixed(z[0], wp)
+        ZIM = to_fixed(z[1], wp)
+    else:
+        ZRE = to_fixed(z, wp)
+        ZIM = MPZ_ZERO
+    # Powers z^0, ..., z^m
+    PRE = [one, ZRE]
+    PIM = [MPZ_ZERO, ZIM]
+    for j in range(2, m+1):
+        a, b = PRE[-1], PIM[-1]
+        if have_complex:
+            PRE.append((a*ZRE - b*ZIM) >> wp)
+            PIM.append((a*ZIM + b*ZRE) >> wp)
+        else:
+            PRE.append((a*ZRE) >> wp)
+            PIM.append(MPZ_ZERO)
+    SRE = SIM = MPZ_ZERO
+    TRE, TIM = one, MPZ_ZERO
+    n = 0
+    while 1:
+        # Ratios num(k)/den(k) for k = n, ..., n+m-1, stopping at the end
+        # of a terminating series
+        nums = []
+        dens = []
+        done = False
+        for k in range(n, n+m):
+            num = den = MPZ_ONE
+            for A, B in nfactors:
+                num *= A + k*B
+            for A, B in dfactors:
+                den *= A + k*B
+            if not den:
+                if not num:
+                    done = True
+                    break
+                raise ZeroDivisionError
+            nums.append(num)
+            dens.append(den)
+            if not num:
+                done = True
+                break
+        # The terms n+j of the block, for j < r, are T*z^j*c_j/D where
+        # c_j = num(n)...num(n+j-1) * den(n+j)...den(n+r-2)
+        r = min(len(nums) + 1, m)
+        c = [MPZ_ONE] * r
+        for j in range(1, r):
+            c[j] = c[j-1] * nums[j-1]
+        D = MPZ_ONE
+        for j in range(r-1, -1, -1):
+            c[j] *= D
+            if j:
+                D *= dens[j-1]
+        BRE = BIM = MPZ_ZERO
+        for j in range(r):
+            BRE += c[j] * PRE[j]
+            if have_complex:
+                BIM += c[j] * PIM[j]
+        if have_complex:
+            SRE += ((TRE*BRE - TIM*BIM) >> wp) // D
+            SIM += ((TRE*BIM + TIM*BRE) >> wp) // D
+        else:
+            SRE += ((TRE*BRE) >> wp) // D
+        if done:
+            break
+        # Term n+m
+        num = c[m-1] * nums[m-1]
+        den = D * dens[m-1]
+        if have_complex:
+            a = TRE*PRE[m] - TIM*PIM[m]
+            b = TRE*PIM[m] + TIM*PRE[m]
+            TRE = ((a >> wp)*num) // den
+            TIM = ((b >> wp)*num) // den
+        else:
+            TRE = (((TRE*PRE[m]) >> wp)*num) // den
+        n += m
+        if HIGH > TRE > -HIGH and HIGH > TIM > -HIGH:
+            break
+        if n > MAX:
+            raise NoConvergence('Hypergeometric series converges too slowly. Try increasing maxterms.')
+    return hypsum_result(SRE, SIM, prec, wp, have_complex)
+
+def hypsum_result(SRE, SIM, prec, wp, have_complex):
+    """
+    Return the tuple (value, have_complex, magnitude) returned by the
+    summators for the fixed-point sum SRE + SIM*j with wp bits.
+    """
+    if have_complex:
+        a = from_man_exp(SRE, -wp, prec, 'n')
+        b = from_man_exp(SIM, -wp, prec, 'n')
+        if SRE:
+            if SIM:
+                magn = max(a[2]+a[3], b[2]+b[3])
+            else:
+                magn = a[2]+a[3]
+        elif SIM:
+            magn = b[2]+b[3]
+        else:
+            magn = -wp+1
+        return (a, b), True, magn
+    a = from_man_exp(SRE, -wp, prec, 'n')
+    if SRE:
+        magn = a[2]+a[3]
+    else:
+        magn = -wp+1
+    return a, False, magn
+
+# Precision (in bits) from which series with integer and rational
+# parameters and an exact rational argument are summed by binary
+# splitting, and largest number of bits of the numerator and of the
+# denominator of the argument
+HYPSUM_BSPLIT_CUTOFF = 2000
+HYPSUM_BSPLIT_ZBITS = 64
+
+def rational_argument(z, maxbits=HYPSUM_BSPLIT_ZBITS):
+    """
+    Return the argument z (an mpf or mpc value, or an MPQ) as a pair
+    (zp, zq) of integers such that z = zp/zq, where zp is a pair of
+    integers for a complex argument.  Return None if zp or zq has
+    more than maxbits bits.
+    """
+    if isinstance(z, MPQ):
+        zp, zq = z.numerator, z.denominator
+        if zp.bit_length() > maxbits or zq.bit_length() > maxbits:
+            return None
+        return MPZ(zp), MPZ(zq)
+    if len(z) == 2:
+        (asign, aman, aexp, abc), (bsign, bman, bexp, bbc) = z
+        if not aman:
+            aexp = bexp
+        if not bman:
+            bexp = aexp
+        e = min(aexp, bexp)
+        if asign:
+            aman = -aman
+        if bsign:
+            bman = -bman
+        zp = aman << (aexp - e), bman << (bexp - e)
+        bits = max(zp[0].bit_length(), zp[1].bit_length())
+    else:
+        sign, man, e, bc = z
+        zp = -man if sign else man
+        bits = bc
+    if e >= 0:
+        if bits + e > maxbits:
+            return None
+        if type(zp) is tuple:
+            return (zp[0] << e, zp[1] << e), MPZ_ONE
+        return zp << e, MPZ_ONE
+    if bits > maxbits or -e > maxbits:
+        return None
+    return zp, MPZ_ONE << (-e)
+
+def bsplit_real(a, b, nfactors, dfactors, zp, zq):
+    """
+    Binary splitting for the terms a+1, ..., b of a series with real
+    argument zp/zq, divided by the term a.  Returns (P, Q, T) where
+    P/Q is the ratio of the terms b and a, and T/Q is the sum.
+    """
+    if b - a == 1:
+        P = zp
+        Q = zq
+        for A, B in nfactors:
+            P *= A + a*B
+        for A, B in dfactors:
+            Q *= A + a*B
+        return P, Q, P
+    m = (a+b)//2
+    P1, Q1, T1 = bsplit_real(a, m, nfactors, dfactors, zp, zq)
+    P2, Q2, T2 = bsplit_real(m, b, nfactors, dfactors, zp, zq)
+    return P1*P2, Q1*Q2, T1*Q2 + P1*T2
+
+def bsplit_complex(a, b, nfactors, dfactors, zp, zq):
+    """
+    Like bsplit_real() for a complex argument, with P and T given as
+    pairs of integers.
+    """
+    if b - a == 1:
+        num = MPZ_ONE
+        Q = zq
+        for A, B in nfactors:
+            num *= A + a*B
+        for A, B in dfactors:
+            Q *= A + a*B
+        P = zp[0]*num, zp[1]*num
+        return P, Q, P
+    m = (a+b)//2
+    (Pa, Pb), Q1, (Ta, Tb) = bsplit_complex(a, m, nfactors, dfactors, zp, zq)
+    (Ra, Rb), Q2, (Ua, Ub) = bsplit_complex(m, b, nfactors, dfactors, zp, zq)
+    P = Pa*Ra - Pb*Rb, Pa*Rb + Pb*Ra
+    T = Ta*Q2 + Pa*Ua - Pb*Ub, Tb*Q2 + Pa*Ub + Pb*Ua
+    return P, Q1*Q2, T
+
+def bsplit_terms(nfactors, dfactors, zp, zq, wp, maxterms=None):
+    """
+    Return the number n such that the terms 0, ..., n of the series
+    summed by hyp_bsplit() are needed for an error of about 2^(-wp),
+    and an estimate of the number of bits of the integers computed
+    by binary splitting.
+
+    The terms are added until one is smaller than 2^(-wp) and smaller
+    than the previous one, or until the series terminates.
+    """
+    if type(zp) is tuple:
+        zmag = abs(complex(zp[0], zp[1]))
+    else:
+        zmag = abs(zp)
+    if not zmag:
+        return 0, 0
+    if maxterms is None:
+        maxterms = wp*100
+    log2 = math.log2
+    lz = log2(zmag) - log2(zq)
+    zbits = int(log2(zmag)) + zq.bit_length() + 2
+    mag = 0.0
+    bits = 0
+    n = 0
+    while 1:
+        num = den = MPZ_ONE
+        r = lz
+        for A, B in nfactors:
+            c = A + n*B
+            num *= c
+            if c:
+                r += log2(abs(c))
+        for A, B in dfactors:
+            c = A + n*B
+            den *= c
+            if c:
+                r -= log2(abs(c))
+        if not den:
+            if num:
+                raise ZeroDivisionError
+            return n, bits
+        n += 1
+        bits += num.bit_length() + den.bit_length() + zbits
+        if not num:
+            return n, bits
+        mag += r
+        if mag < -wp and r < 0:
+            return n, bits
+        if n > maxterms:
+            raise NoConvergence('Hypergeometric series converges too slowly. Try increasing maxterms.')
+
+def hyp_bsplit(nfactors, dfactors, zp, zq, wp, n):
+    """
+    Sum the terms 0, ..., n of the series whose first term is 1 and in
+    which the ratio of the terms k+1 and k is zp/zq times num(k)/den(k)
+    as given by the pairs in nfactors and dfactors (see hyp_factors()),
+    using binary splitting.  The argument is complex if zp is a pair.
+
+    Returns the sum as a fixed-point number with wp bits, or a pair of
+    them for a complex argument.
+    """
+    have_complex = type(zp) is tuple
+    one = MPZ_ONE << wp
+    if not n:
+        return (one, MPZ_ZERO) if have_complex else one
+    if have_complex:
+        P, Q, (TRE, TIM) = bsplit_complex(0, n, nfactors, dfactors, zp, zq)
+    else:
+        P, Q, TRE = bsplit_real(0, n, nfactors, dfactors, zp, zq)
+    # Only wp+10 bits of Q are needed
+    shift = Q.bit_length() - wp - 10
+    if shift > 0:
+        Q >>= shift
+        TRE >>= shift
+        if have_complex:
+            TIM >>= shift
+    if have_complex:
+        return one + (TRE << wp) // Q, (TIM << wp) // Q
+    return one + (TRE << wp) // Q
+
+# Largest ratio of the estimated number of bits of the integers
+# computed by binary splitting to the working precision, above which
+# rectangular splitting is faster
+HYPSUM_BSPLIT_RATIO = 64
+
+def hypsum_bsplit(key, summator, coeffs, z, prec, wp, epsshift,
+                  magnitude_check, **kwargs):
+    """
+    Sum a hypergeometric series with integer and rational parameters
+    and an exact rational argument z (see rational_argument()) using
+    binary splitting.  The arguments and the result are those of
+    hypsum_rect(), which is used instead when binary splitting would
+    need too many terms or too large terms.
+    """
+    p, q, param_types, ztype = key
+    if not magnitude_check:
+        nfactors, dfactors = hyp_factors(p, param_types, coeffs)
+        zp, zq = rational_argument(z, wp)
+        n, bits = bsplit_terms(nfactors, dfactors, zp, zq, wp,
+                               kwargs.get('maxterms'))
+        if bits <= HYPSUM_BSPLIT_RATIO*wp:
+            s = hyp_bsplit(nfactors, dfactors, zp, zq, wp, n)
+            if ztype == 'C':
+                return hypsum_result(s[0], s[1], prec, wp, True)
+            return hypsum_result(s, MPZ_ZERO, prec, wp, False)
+    if isinstance(z, MPQ):
+        z = from_rational(z.numerator, z.denominator, wp)
+    return hypsum_rect(key, summator, coeffs, z, prec, wp, epsshift,
+                       magnitude_check, **kwargs)
+
+def hypsum_mpq(summator, coeffs, z, prec, wp, epsshift, magnitude_check,
+               **kwargs):
+    """
+    Call the summator with an MPQ argument z converted to an mpf value
+    at the working precision.
+    """
+    z = from_rational(z.numerator, z.denominator, wp)
+    return summator(coeffs, z, prec, wp, epsshift, magnitude_check,
+                    **kwargs)
+
 
 #-----------------------------------------------------------------------#
 #                                                                       #
@@ -300,6 +876,24 @@ def make_hyp_summator(key):
 # TODO: mpf_erf should call mpf_erfc when appropriate (currently
 #    only the converse delegation is implemented)
 
+def erf_bsplit(x, t, wp):
+    """
+    Return sum (-x^2)^k / (k! (2k+1)) times the fixed-point number t,
+    computed by binary splitting, or None if this is not faster than
+    the Taylor series.
+    """
+    if wp < HYPSUM_BSPLIT_CUTOFF:
+        return None
+    z = rational_argument(mpf_neg(mpf_mul(x, x)))
+    if z is None:
+        return None
+    nfactors = [(MPZ_ONE, MPZ(2))]
+    dfactors = [(MPZ(3), MPZ(2)), (MPZ_ONE, MPZ_ONE)]
+    n, bits = bsplit_terms(nfactors, dfactors, z[0], z[1], wp)
+    if bits > HYPSUM_BSPLIT_RATIO*wp:
+        return None
+    return (hyp_bsplit(nfactors, dfactors, z[0], z[1], wp, n) * t) >> wp
+
 def mpf_erf(x, prec, rnd=round_down):
     sign, man, exp, bc = x
     if not man:
@@ -323,18 +917,22 @@ def mpf_erf(x, prec, rnd=round_down):
         # TODO: interval rounding
         return mpf_div(x, c, prec, rnd)
     wp = prec + abs(size) + 25
-    # Taylor series for erf, fixed-point summation
     t = abs(to_fixed(x, wp))
-    t2 = (t*t) >> wp
-    s, term, k = t, 12345, 1
-    while term:
-        t = ((t * t2) >> wp) // k
-        term = t // (2*k+1)
-        if k & 1:
-            s -= term
-        else:
-            s += term
-        k += 1
+    # erf(x) = 2*x/sqrt(pi) * 1F1(1/2; 3/2; -x^2), by binary splitting
+    # if x has a small mantissa
+    s = erf_bsplit(x, t, wp)
+    if s is None:
+        # Taylor series for erf, fixed-point summation
+        t2 = (t*t) >> wp
+        s, term, k = t, 12345, 1
+        while term:
+            t = ((t * t2) >> wp) // k
+            term = t // (2*k+1)
+            if k & 1:
+                s -= term
+            else:
+                s += term
+            k += 1
     s = (s << (wp+1)) // sqrt_fixed(pi_fixed(wp), wp)
     if sign:
         s = -s
@@ -890,17 +1488,30 @@ def mpf_besseljn(n, x, prec, rnd=round_down):
     wp = prec + 20 + n*n.bit_length()
     if mag < 0:
         wp -= n * mag
+    # J_n(x) = (x/2)^n/n! * 0F1(n+1, -x^2/4), by binary splitting if x
+    # has a small mantissa
+    z = None
+    if wp >= HYPSUM_BSPLIT_CUTOFF:
+        z = rational_argument(mpf_shift(mpf_neg(mpf_mul(x, x)), -2))
     x = to_fixed(x, wp)
-    x2 = (x**2) >> wp
     if not n:
         s = t = MPZ_ONE << wp
     else:
         s = t = (x**n // ifac(n)) >> ((n-1)*wp + n)
-    k = 1
-    while t:
-        t = ((t * x2) // (-4*k*(k+n))) >> wp
-        s += t
-        k += 1
+    if z is not None:
+        dfactors = [(MPZ(n+1), MPZ_ONE), (MPZ_ONE, MPZ_ONE)]
+        terms, bits = bsplit_terms([], dfactors, z[0], z[1], wp)
+        if bits > HYPSUM_BSPLIT_RATIO*wp:
+            z = None
+        else:
+            s = (hyp_bsplit([], dfactors, z[0], z[1], wp, terms) * t) >> wp
+    if z is None:
+        x2 = (x**2) >> wp
+        k = 1
+        while t:
+            t = ((t * x2) // (-4*k*(k+n))) >> wp
+            s += t
+            k += 1
     if negate:
         s = -s
     return from_man_exp(s, -wp, prec, rnd)
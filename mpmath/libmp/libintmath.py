@@ -89,7 +89,12 @@ def numeral_python(n, base=10, size=0, digits=stddigits):
 
     The 'size' parameters specifies the number of digits in n; this
     number is only used to determine splitting points and need not be
-    exact."""
+    exact.
+
+    Above RADIX_CUTOFF digits, the conversion is done with
+    divide-and-conquer over a cached tree of powers of the base, using
+    division by precomputed reciprocals, so that the cost is
+    subquadratic in the number of digits."""
     if n <= 0:
         if not n:
             return "0"
@@ -97,6 +102,8 @@ def numeral_python(n, base=10, size=0, digits=stddigits):
     # Fast enough to do directly
     if size < 250:
         return small_numeral(n, base, digits)
+    if size >= RADIX_CUTOFF:
+        return _numeral_tree(n, base, _radix_level(n, base), digits)
     # Divide in half
     half = (size // 2) + (size & 1)
     A, B = divmod(n, base**half)
@@ -126,10 +133,204 @@ def numeral_gmpy(n, base=10, size=0, digits=stddigits):
     bd = numeral(B, base, half, digits).rjust(half, "0")
     return ad + bd
 
+#----------------------------------------------------------------------------#
+#                    Subquadratic radix conversion                          #
+#----------------------------------------------------------------------------#
+
+# Numbers with fewer digits than this are converted by the plain
+# algorithms above (or Python's builtin int() and str()).
+RADIX_CUTOFF = 8000
+
+# Leaves of the conversion tree have at most 2*RADIX_CHUNK digits;
+# level k of the tree splits off base**(RADIX_CHUNK * 2**k).  This must
+# stay well below sys.get_int_max_str_digits().
+RADIX_CHUNK = 500
+
+# Divisors with fewer bits than this are handled by Python's divmod().
+RECIPROCAL_CUTOFF = 4000
+
+def reciprocal(p, s):
+    """Return floor(2**s / p) for a positive integer p and
+    s >= p.bit_length(), using Newton iteration so that the cost is
+    within a constant factor of a multiplication of the same size.
+
+        >>> int(reciprocal(3, 10))
+        341
+        >>> reciprocal(10**5000, 40000) == 2**40000 // 10**5000
+        True
+
+    """
+    bp = p.bit_length()
+    k = s - bp
+    if k < RECIPROCAL_CUTOFF:
+        return (MPZ_ONE << s) // p
+    # Half-precision approximation using only the leading bits of p;
+    # y = yh * 2**(k-h) approximates 2**s / p to about h bits
+    h = (k >> 1) + 16
+    sh = max(bp - h - 16, 0)
+    ph = p >> sh
+    yh = reciprocal(ph, ph.bit_length() + h)
+    # One Newton step doubles the number of correct bits.  Only the
+    # leading bits of the error term e = 2**s - p*y are needed.
+    e = (MPZ_ONE << s) - ((p*yh) << (k-h))
+    t = max(e.bit_length() - (k-h) - 32, 0)
+    d = (yh * (e >> t)) >> (s - (k-h) - t)
+    y = (yh << (k-h)) + d
+    # Final correction; the remainder is a small multiple of p
+    r = e - p*d
+    if r < 0 or r >= p:
+        c, r = divmod(r, p)
+        y += c
+    return y
+
+# Divisions where both the divisor and the quotient have at least this
+# many bits use the Newton reciprocal in idivmod_python().
+DIVISION_CUTOFF = 150000
+
+def _divmod_step(a, b, y, s, sh):
+    # divmod(a, b) from an approximate quotient, with y = 2**s // (b >> sh)
+    q = ((a >> sh) * y) >> s
+    r = a - q*b
+    if r < 0 or r >= b:
+        c, r = divmod(r, b)
+        q += c
+    return q, r
+
+def idivmod_python(a, b):
+    """Return divmod(a, b) for integers a >= 0 and b > 0.
+
+    CPython's division is quadratic, so when both b and the quotient
+    are large, the quotient is instead computed from a Newton
+    reciprocal of b, at a cost within a constant factor of a
+    multiplication.
+
+        >>> a, b = 7**40000, 3**20000
+        >>> idivmod_python(a, b) == divmod(a, b)
+        True
+
+    """
+    bb = b.bit_length()
+    k = a.bit_length() - bb
+    if bb < DIVISION_CUTOFF or k < DIVISION_CUTOFF or a < 0 or b < 0:
+        return divmod(a, b)
+    if k <= bb:
+        # The leading k + 32 bits of the operands determine the
+        # quotient to within a few units
+        sh = max(bb - k - 32, 0)
+        bt = b >> sh
+        s = bt.bit_length() + k + 2
+        return _divmod_step(a, b, reciprocal(bt, s), s, sh)
+    # Long division, computing bb bits of the quotient at a time with
+    # the same reciprocal
+    s = 2*bb + 2
+    y = reciprocal(b, s)
+    m = k - bb
+    q, r = _divmod_step(a >> m, b, y, s, 0)
+    while m:
+        t = min(m, bb)
+        m -= t
+        a1 = (r << t) | ((a >> m) & ((MPZ_ONE << t) - 1))
+        q1, r = _divmod_step(a1, b, y, s, 0)
+        q = (q << t) + q1
+    return q, r
+
+@lru_cache(maxsize=64)
+def radix_power(base, k):
+    """Return base**(RADIX_CHUNK * 2**k), cached.  The cache holds the
+    power-of-base tree used by numeral() and numeral_to_int() for huge
+    numbers, so repeated conversions of similar size reuse it."""
+    if not k:
+        return MPZ(base)**RADIX_CHUNK
+    p = radix_power(base, k-1)
+    return p*p
+
+@lru_cache(maxsize=64)
+def _radix_reciprocal(base, k):
+    p = radix_power(base, k)
+    bp = p.bit_length()
+    return bp, reciprocal(p, 2*bp)
+
+def _radix_divmod(n, base, k):
+    """divmod(n, radix_power(base, k)) for 0 <= n < radix_power(base, k)**2,
+    using Barrett reduction with a cached reciprocal."""
+    p = radix_power(base, k)
+    bp = p.bit_length()
+    if bp < RECIPROCAL_CUTOFF:
+        return divmod(n, p)
+    bp, m = _radix_reciprocal(base, k)
+    q = ((n >> (bp-1)) * m) >> (bp+1)
+    r = n - q*p
+    while r >= p:
+        q += 1
+        r -= p
+    return q, r
+
+def _radix_level(n, base):
+    """Smallest k such that n < radix_power(base, k)**2."""
+    size = int(n.bit_length() / math.log2(base)) + 2
+    k = 0
+    while (RADIX_CHUNK << (k+1)) < size:
+        k += 1
+    while n >= radix_power(base, k+1):
+        k += 1
+    return k
+
+def _numeral_tree(n, base, k, digits):
+    while k >= 0 and n < radix_power(base, k):
+        k -= 1
+    if k < 0:
+        return small_numeral(n, base, digits)
+    A, B = _radix_divmod(n, base, k)
+    ad = _numeral_tree(A, base, k-1, digits)
+    bd = _numeral_tree(B, base, k-1, digits).rjust(RADIX_CHUNK << k, "0")
+    return ad + bd
+
+def _numeral_to_int_tree(s, base, k):
+    while k >= 0 and len(s) <= (RADIX_CHUNK << k):
+        k -= 1
+    if k < 0:
+        return MPZ(int(s, base))
+    h = RADIX_CHUNK << k
+    return (_numeral_to_int_tree(s[:-h], base, k-1) * radix_power(base, k) +
+            _numeral_to_int_tree(s[-h:], base, k-1))
+
+def numeral_to_int_python(s, base=10):
+    """Convert a string of digits in the given base (optionally with a
+    leading sign) to an integer.  This is the inverse of numeral().
+
+    Python's int() takes quadratic time for bases that are not powers
+    of two, so for long strings the digits are split recursively
+    and recombined using the cached powers from radix_power().
+
+        >>> int(numeral_to_int('-123'))
+        -123
+        >>> int(numeral_to_int('ff', 16))
+        255
+
+    """
+    if len(s) < RADIX_CUTOFF or not base & (base - 1):
+        return MPZ(int(s, base))
+    sign = s[0] in '+-'
+    t = s[1:] if sign else s
+    if not t.isalnum():
+        return MPZ(int(s, base))
+    k = 0
+    while (RADIX_CHUNK << (k+1)) < len(t):
+        k += 1
+    n = _numeral_to_int_tree(t, base, k)
+    if s[0] == '-':
+        n = -n
+    return n
+
+def numeral_to_int_gmpy(s, base=10):
+    return MPZ(s, base)
+
 numeral = numeral_python
+numeral_to_int = numeral_to_int_python
 
 if gmpy:
     numeral = numeral_gmpy
+    numeral_to_int = numeral_to_int_gmpy
 
 _1_800 = 1<<800
 _1_600 = 1<<600
@@ -250,6 +451,12 @@ def sqrt_fixed(x, prec):
     sqrtrem = sqrtrem_python
     _gcd2 = math.gcd
 
+# Since Python 3.12, CPython divides huge integers in subquadratic time
+if gmpy or sys.version_info >= (3, 12):
+    idivmod = divmod
+else:
+    idivmod = idivmod_python
+
 gcd = math.gcd
 if gmpy:
     gcd = gmpy.gcd
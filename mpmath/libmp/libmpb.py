@@ -0,0 +1,766 @@
+"""
+Computational functions for ball (midpoint-radius) arithmetic.
+
+A real ball is a pair (mid, rad) and represents the set
+{x : |x - mid| <= rad}.  The midpoint is a raw mpf rounded to nearest
+at the working precision.  The radius is a magnitude: a pair (man, exp)
+of integers with man < 2**(RAD_PREC+1), giving the upper bound man*2**exp.
+Magnitudes are not normalized like mpfs and are only ever rounded
+upwards (or downwards, for lower bounds), using a few machine-size
+integer operations.  Propagating the error of an operation thus costs
+much less than the second full-precision rounding needed for the two
+endpoints of an interval.
+
+A ball with an infinite radius (mag_inf) contains every real number;
+its midpoint is meaningless.  Exact infinities are balls with zero
+radius.  A complex ball is a pair of real balls (real and imaginary part).
+
+Results of the elementary functions of libelefun are assumed to be
+accurate to within one ulp, i.e. the same guarantee that libmpi relies
+on when rounding endpoints in a given direction.  Functions without a
+cheap bound for the derivative are evaluated with interval arithmetic
+from libmpi, and the enclosing interval is converted back to a ball.
+Some of these round the endpoints of inexact results to nearest, so
+one ulp is added to the radius of such conversions.
+"""
+
+from .libelefun import mpf_atan, mpf_atan2, mpf_cos_sin, mpf_exp, mpf_ln
+from .libmpc import mpc_abs
+from .libmpf import (fhalf, finf, fnan, fninf, fone, from_man_exp, from_str,
+                     fzero, mpf_abs, mpf_add, mpf_div, mpf_le, mpf_lt,
+                     mpf_mul, mpf_neg, mpf_pos, mpf_pow_int, mpf_sqrt, mpf_sub,
+                     round_ceiling, round_down, round_floor, round_nearest,
+                     round_up, to_str)
+from .libmpi import (mpci_cos, mpci_gamma, mpci_pow, mpci_sin, mpi_atan2,
+                     mpi_from_str, mpi_gamma, mpi_log, mpi_mid, mpi_sqrt)
+
+
+# Precision of the radius
+RAD_PREC = 30
+
+# Magnitudes with an exponent this large are infinite; it is large
+# enough that no arithmetic on finite magnitudes can reach it.
+MAG_INF_EXP = 1 << 62
+
+mag_zero = (0, 0)
+mag_inf = (1, MAG_INF_EXP)
+
+
+#----------------------------------------------------------------------------#
+#                         Magnitude arithmetic                               #
+#----------------------------------------------------------------------------#
+
+def mag_is_inf(r):
+    return r[1] >= MAG_INF_EXP >> 1
+
+def mag_from_mpf(x):
+    """Upper bound for |x|."""
+    sign, man, exp, bc = x
+    if man:
+        if bc > RAD_PREC:
+            shift = bc - RAD_PREC
+            return (man >> shift) + 1, exp + shift
+        return man, exp
+    if x == fzero:
+        return mag_zero
+    return mag_inf
+
+def mag_from_mpf_lower(x):
+    """Lower bound for |x|."""
+    sign, man, exp, bc = x
+    if man:
+        if bc > RAD_PREC:
+            shift = bc - RAD_PREC
+            return man >> shift, exp + shift
+        return man, exp
+    if x == fzero:
+        return mag_zero
+    return mag_inf
+
+def mag_to_mpf(r):
+    man, exp = r
+    if exp >= MAG_INF_EXP >> 1:
+        return finf
+    return from_man_exp(man, exp)
+
+def mag_add(r, s):
+    rm, re = r
+    sm, se = s
+    if not rm:
+        return s
+    if not sm:
+        return r
+    rb = rm.bit_length()
+    sb = sm.bit_length()
+    if re + rb < se + sb:
+        rm, re, rb, sm, se, sb = sm, se, sb, rm, re, rb
+    if re + rb - se - sb > RAD_PREC + 1:
+        # s is smaller than the last bit of r at RAD_PREC+2 bits
+        shift = max(RAD_PREC + 2 - rb, 0)
+        m = (rm << shift) + 1
+        e = re - shift
+    elif re >= se:
+        m = (rm << (re - se)) + sm
+        e = se
+    else:
+        m = rm + (sm << (se - re))
+        e = re
+    bc = m.bit_length()
+    if bc > RAD_PREC:
+        shift = bc - RAD_PREC
+        m = (m >> shift) + 1
+        e += shift
+    return m, e
+
+def mag_mul(r, s):
+    rm, re = r
+    sm, se = s
+    if not rm or not sm:
+        return mag_zero
+    m = rm * sm
+    e = re + se
+    bc = m.bit_length()
+    if bc > RAD_PREC:
+        shift = bc - RAD_PREC
+        m = (m >> shift) + 1
+        e += shift
+    return m, e
+
+def mag_div(r, s):
+    """Upper bound for r/s, where s is nonzero."""
+    rm, re = r
+    sm, se = s
+    if not rm:
+        return mag_zero
+    shift = max(RAD_PREC + 1 + sm.bit_length() - rm.bit_length(), 0)
+    m = ((rm << shift) // sm) + 1
+    e = re - se - shift
+    bc = m.bit_length()
+    if bc > RAD_PREC:
+        shift = bc - RAD_PREC
+        m = (m >> shift) + 1
+        e += shift
+    return m, e
+
+def mag_mul_lower(r, s):
+    """Lower bound for r*s."""
+    rm, re = r
+    sm, se = s
+    m = rm * sm
+    e = re + se
+    bc = m.bit_length()
+    if bc > RAD_PREC:
+        shift = bc - RAD_PREC
+        m >>= shift
+        e += shift
+    return m, e
+
+def mag_sub_lower(r, s):
+    """Lower bound for r - s, or zero if r - s is not positive."""
+    rm, re = r
+    sm, se = s
+    if not sm:
+        return r
+    if not rm:
+        return mag_zero
+    rb = rm.bit_length()
+    sb = sm.bit_length()
+    if re + rb < se + sb:
+        return mag_zero
+    if re + rb - se - sb > RAD_PREC + 1:
+        shift = max(RAD_PREC + 2 - rb, 0)
+        m = (rm << shift) - 1
+        e = re - shift
+    elif re >= se:
+        m = (rm << (re - se)) - sm
+        e = se
+    else:
+        m = rm - (sm << (se - re))
+        e = re
+    if m <= 0:
+        return mag_zero
+    bc = m.bit_length()
+    if bc > RAD_PREC:
+        shift = bc - RAD_PREC
+        m >>= shift
+        e += shift
+    return m, e
+
+def mag_le(r, s):
+    return mpf_le(mag_to_mpf(r), mag_to_mpf(s))
+
+def mag_ulp(x, prec):
+    """Upper bound for the rounding error of x, a prec-bit number."""
+    sign, man, exp, bc = x
+    if man:
+        return 1, exp+bc-prec
+    if x == fnan:
+        return mag_inf
+    return mag_zero
+
+
+#----------------------------------------------------------------------------#
+#                             Rounding                                       #
+#----------------------------------------------------------------------------#
+
+mpb_zero = (fzero, mag_zero)
+mpb_one = (fone, mag_zero)
+mpb_indeterminate = (fzero, mag_inf)
+
+def mpb_round(x, prec):
+    """
+    Round the exact value x to prec bits, returning the rounded value
+    and an upper bound for the rounding error.
+    """
+    # Normalized mantissas are odd, so x is exact iff it fits
+    if x[3] <= prec:
+        return x, mag_zero
+    y = mpf_pos(x, prec, round_nearest)
+    return y, mag_ulp(y, prec)
+
+def mpb_round_mul(s, t, prec):
+    """Rounded value of s * t together with the rounding error."""
+    if s[3] + t[3] <= prec:
+        return mpf_mul(s, t), mag_zero
+    y = mpf_mul(s, t, prec, round_nearest)
+    return y, mag_ulp(y, prec)
+
+def mpb_round_add(s, t, prec):
+    """Rounded value of s + t together with the rounding error."""
+    ssign, sman, sexp, sbc = s
+    tsign, tman, texp, tbc = t
+    if sman and tman:
+        # The exact sum fits in prec bits, including a carry
+        if max(sexp+sbc, texp+tbc) - min(sexp, texp) < prec:
+            return mpf_add(s, t), mag_zero
+        y = mpf_add(s, t, prec, round_nearest)
+        return y, mag_ulp(y, prec)
+    return mpb_round(mpf_add(s, t), prec)
+
+def mpb_finish(m, r):
+    if m == fnan:
+        return mpb_indeterminate
+    return m, r
+
+def mpb_from_mpf(x, prec=0):
+    if x == fnan:
+        return mpb_indeterminate
+    if prec:
+        return mpb_round(x, prec)
+    return x, mag_zero
+
+
+#----------------------------------------------------------------------------#
+#                      Conversion from and to intervals                      #
+#----------------------------------------------------------------------------#
+
+def mpb_from_mpi(x, prec):
+    a, b = x
+    if a == b:
+        return mpb_from_mpf(a, prec)
+    if a in (finf, fninf, fnan) or b in (finf, fninf, fnan):
+        return mpb_indeterminate
+    m = mpi_mid(x, prec)
+    r = mpf_sub(b, m, RAD_PREC, round_up)
+    r2 = mpf_sub(m, a, RAD_PREC, round_up)
+    if mpf_lt(r, r2):
+        r = r2
+    return m, mag_from_mpf(r)
+
+def mpb_from_mpi_inexact(x, prec):
+    """
+    Like mpb_from_mpi, for the result of an interval function that may
+    round the endpoints of inexact results to the nearest number: the
+    radius is increased by one ulp of the larger endpoint.
+    """
+    m, r = mpb_from_mpi(x, prec)
+    if mag_is_inf(r):
+        return m, r
+    a, b = x
+    e = mpf_abs(a)
+    if mpf_lt(e, mpf_abs(b)):
+        e = mpf_abs(b)
+    return m, mag_add(r, mag_ulp(e, prec))
+
+def mpb_to_mpi(x, prec):
+    m, r = x
+    if not r[0]:
+        return m, m
+    if mag_is_inf(r):
+        return fninf, finf
+    r = mag_to_mpf(r)
+    return mpf_sub(m, r, prec, round_floor), mpf_add(m, r, prec, round_ceiling)
+
+def mpcb_from_mpci(z, prec):
+    re, im = z
+    return mpb_from_mpi(re, prec), mpb_from_mpi(im, prec)
+
+def mpcb_to_mpci(z, prec):
+    re, im = z
+    return mpb_to_mpi(re, prec), mpb_to_mpi(im, prec)
+
+def mpb_from_str(s, prec):
+    t = s.replace(" ", "")
+    if t[:1] == "[" and t[-1:] == "]" and "+-" in t:
+        t = t[1:-1]
+    return mpb_from_mpi(mpi_from_str(t, prec), prec)
+
+def mpb_to_str(x, dps, error_dps=3, **kwargs):
+    m, r = x
+    if not r[0]:
+        return to_str(m, dps, **kwargs)
+    if mag_is_inf(r):
+        return "[+- inf]"
+    s = to_str(m, dps, **kwargs)
+    # Account for the decimal rounding of the midpoint
+    wp = max(m[3], 0) + 4*dps + 20
+    lo = mpf_abs(mpf_sub(from_str(s, wp, round_floor), m, wp, round_up))
+    hi = mpf_abs(mpf_sub(from_str(s, wp, round_ceiling), m, wp, round_up))
+    r = mag_add(r, mag_from_mpf(hi if mpf_lt(lo, hi) else lo))
+    r = to_str(mag_to_mpf(r), error_dps, rnd=round_up)
+    return "[%s +- %s]" % (s, r)
+
+
+#----------------------------------------------------------------------------#
+#                              Real balls                                    #
+#----------------------------------------------------------------------------#
+
+def mpb_eq(s, t, prec=0):
+    return s == t
+
+def mpb_ne(s, t, prec=0):
+    return s != t
+
+def mpb_contains(s, t):
+    """Whether the ball s contains the ball t."""
+    (sm, sr), (tm, tr) = s, t
+    if mag_is_inf(sr):
+        return True
+    if mag_is_inf(tr):
+        return False
+    return mag_le(mag_add(mag_from_mpf(mpf_sub(tm, sm)), tr), sr)
+
+def mpb_overlap(s, t):
+    (sm, sr), (tm, tr) = s, t
+    if mag_is_inf(sr) or mag_is_inf(tr):
+        return True
+    return mag_le(mag_from_mpf_lower(mpf_sub(tm, sm)), mag_add(sr, tr))
+
+def mpb_lt(s, t, prec):
+    sa, sb = mpb_to_mpi(s, prec)
+    ta, tb = mpb_to_mpi(t, prec)
+    if mpf_lt(sb, ta): return True
+    if not mpf_lt(sa, tb): return False
+    raise ValueError
+
+def mpb_le(s, t, prec):
+    sa, sb = mpb_to_mpi(s, prec)
+    ta, tb = mpb_to_mpi(t, prec)
+    if mpf_le(sb, ta): return True
+    if not mpf_le(sa, tb): return False
+    raise ValueError
+
+def mpb_gt(s, t, prec): return mpb_lt(t, s, prec)
+def mpb_ge(s, t, prec): return mpb_le(t, s, prec)
+
+def mpb_is_int(s):
+    m, r = s
+    if r[0]:
+        return False
+    sign, man, exp, bc = m
+    return bool(man) and exp >= 0 or m == fzero
+
+def mpb_pos(s, prec):
+    m, r = s
+    m, err = mpb_round(m, prec)
+    return m, mag_add(r, err)
+
+def mpb_neg(s, prec=0):
+    m, r = s
+    if prec:
+        m, r = mpb_pos(s, prec)
+    return mpf_neg(m), r
+
+def mpb_abs(s, prec=0):
+    m, r = s
+    if prec:
+        m, r = mpb_pos(s, prec)
+    return mpf_abs(m), r
+
+def mpb_add(s, t, prec):
+    (sm, sr), (tm, tr) = s, t
+    m, err = mpb_round_add(sm, tm, prec)
+    if sr[0]:
+        err = mag_add(err, sr)
+    if tr[0]:
+        err = mag_add(err, tr)
+    return mpb_finish(m, err)
+
+def mpb_sub(s, t, prec):
+    (sm, sr), (tm, tr) = s, t
+    m, err = mpb_round_add(sm, mpf_neg(tm), prec)
+    if sr[0]:
+        err = mag_add(err, sr)
+    if tr[0]:
+        err = mag_add(err, tr)
+    return mpb_finish(m, err)
+
+def mpb_mul_rad(s, t):
+    """
+    Propagated error of the product of s and t, that is
+    |sm|*tr + sr*(|tm| + tr).
+    """
+    (sm, sr), (tm, tr) = s, t
+    r = mag_zero
+    if tr[0]:
+        r = mag_mul(mag_from_mpf(sm), tr)
+    if sr[0]:
+        r = mag_add(r, mag_mul(sr, mag_add(mag_from_mpf(tm), tr)))
+    return r
+
+def mpb_mul(s, t, prec):
+    # Same as mpb_round_mul and mpb_mul_rad, inlined for speed
+    (sm, sr), (tm, tr) = s, t
+    ssign, sman, sexp, sbc = sm
+    tsign, tman, texp, tbc = tm
+    if sbc + tbc <= prec:
+        m = mpf_mul(sm, tm)
+        r = mag_zero
+    else:
+        m = mpf_mul(sm, tm, prec, round_nearest)
+        r = 1, m[2] + m[3] - prec
+    rm, re = sr
+    qm, qe = tr
+    if not (rm or qm):
+        return mpb_finish(m, r)
+    if not (sman and tman):
+        return mpb_finish(m, mag_add(mpb_mul_rad(s, t), r))
+    if sbc > RAD_PREC:
+        sexp += sbc - RAD_PREC
+        sman = (sman >> (sbc - RAD_PREC)) + 1
+    if tbc > RAD_PREC:
+        texp += tbc - RAD_PREC
+        tman = (tman >> (tbc - RAD_PREC)) + 1
+    if qm:
+        r = mag_add(r, mag_mul((sman, sexp), tr))
+    if rm:
+        r = mag_add(r, mag_mul(sr, mag_add((tman, texp), tr)))
+    return m, r
+
+def mpb_fma(s, t, u, prec):
+    """Computes s*t + u, rounding the midpoint only once."""
+    um, ur = u
+    m, err = mpb_round_add(mpf_mul(s[0], t[0]), um, prec)
+    return mpb_finish(m, mag_add(mag_add(mpb_mul_rad(s, t), ur), err))
+
+def mpb_dot2(s, t, u, v, prec):
+    """Computes s*t + u*v, rounding the midpoint only once."""
+    m, err = mpb_round_add(mpf_mul(s[0], t[0]), mpf_mul(u[0], v[0]), prec)
+    r = mag_add(mpb_mul_rad(s, t), mpb_mul_rad(u, v))
+    return mpb_finish(m, mag_add(r, err))
+
+def mpb_div(s, t, prec):
+    (sm, sr), (tm, tr) = s, t
+    if tm == fzero or mag_is_inf(tr):
+        return mpb_indeterminate
+    m = mpf_div(sm, tm, prec, round_nearest)
+    if mpf_mul(m, tm) == sm:
+        r = mag_zero
+    else:
+        r = mag_ulp(m, prec)
+    if sr[0] or tr[0]:
+        # |s/t - sm/tm| <= (|sm|*tr + |tm|*sr) / (|tm|*(|tm| - tr))
+        a = mag_from_mpf_lower(tm)
+        d = mag_sub_lower(a, tr)
+        if not d[0]:
+            return mpb_indeterminate
+        num = mag_add(mag_mul(mag_from_mpf(sm), tr),
+                      mag_mul(mag_from_mpf(tm), sr))
+        r = mag_add(r, mag_div(num, mag_mul_lower(a, d)))
+    return mpb_finish(m, r)
+
+def mpb_pow_int(s, n, prec):
+    if n < 0:
+        return mpb_div(mpb_one, mpb_pow_int(s, -n, prec+20), prec)
+    if n == 0:
+        return mpb_one
+    if n == 1:
+        return mpb_pos(s, prec)
+    sm, sr = s
+    m = mpf_pow_int(sm, n, prec, round_nearest)
+    # The mantissa of sm**n has at most n*bc bits
+    if not sm[1] or sm[3]*n <= prec:
+        r = mag_zero
+    else:
+        r = mag_ulp(m, prec)
+    if sr[0]:
+        # |(sm+e)**n - sm**n| <= n*sr*(|sm|+sr)**(n-1)
+        u = mag_to_mpf(mag_add(mag_from_mpf(sm), sr))
+        u = mag_from_mpf(mpf_pow_int(u, n-1, RAD_PREC, round_up))
+        r = mag_add(r, mag_mul((n, 0), mag_mul(sr, u)))
+    return mpb_finish(m, r)
+
+def mpb_lower(s):
+    """Lower bound for the ball s, with RAD_PREC bits."""
+    m, r = s
+    return mpf_sub(m, mag_to_mpf(r), RAD_PREC, round_floor)
+
+def mpb_abs_lower(s, prec):
+    """Lower bound for |x| over the ball s."""
+    m, r = s
+    m = mpf_abs(m)
+    if not r[0]:
+        return m
+    if mag_is_inf(r):
+        return fzero
+    a = mpf_sub(m, mag_to_mpf(r), prec, round_floor)
+    if a[0]:
+        return fzero
+    return a
+
+def mpb_abs_upper(s, prec):
+    """Upper bound for |x| over the ball s."""
+    m, r = s
+    m = mpf_abs(m)
+    if not r[0]:
+        return m
+    if mag_is_inf(r):
+        return finf
+    return mpf_add(m, mag_to_mpf(r), prec, round_ceiling)
+
+def mpb_sqrt(s, prec):
+    sm, sr = s
+    if sr[0]:
+        a = mpb_lower(s)
+        if not mpf_lt(fzero, a):
+            return mpb_from_mpi(mpi_sqrt(mpb_to_mpi(s, prec), prec), prec)
+    m = mpf_sqrt(sm, prec, round_nearest)
+    if mpf_mul(m, m) == sm:
+        r = mag_zero
+    else:
+        r = mag_ulp(m, prec)
+    if sr[0]:
+        # The derivative is at most 1/(2*sqrt(a))
+        a = mag_from_mpf_lower(mpf_sqrt(a, RAD_PREC, round_down))
+        r = mag_add(r, mag_div(sr, mag_mul_lower(a, (2, 0))))
+    return mpb_finish(m, r)
+
+def mpb_exp(s, prec):
+    sm, sr = s
+    if sm == fzero and not sr[0]:
+        return mpb_one
+    m = mpf_exp(sm, prec, round_nearest)
+    r = mag_ulp(m, prec)
+    if sr[0]:
+        # |exp(sm+e) - exp(sm)| <= exp(sm)*sr*exp(sr)
+        u = mag_from_mpf(mpf_exp(mag_to_mpf(sr), RAD_PREC, round_up))
+        r = mag_add(r, mag_mul(mag_add(mag_from_mpf(m), r), mag_mul(sr, u)))
+    return mpb_finish(m, r)
+
+def mpb_log(s, prec):
+    sm, sr = s
+    if sr[0]:
+        a = mpb_lower(s)
+        if not mpf_lt(fzero, a):
+            return mpb_from_mpi(mpi_log(mpb_to_mpi(s, prec), prec), prec)
+    elif sm == fone:
+        return mpb_zero
+    m = mpf_ln(sm, prec, round_nearest)
+    r = mag_ulp(m, prec)
+    if sr[0]:
+        # The derivative is at most 1/a
+        r = mag_add(r, mag_div(sr, mag_from_mpf_lower(a)))
+    return mpb_finish(m, r)
+
+def mpb_cos_sin(s, prec):
+    sm, sr = s
+    if sm == fzero and not sr[0]:
+        return mpb_one, mpb_zero
+    c, s = mpf_cos_sin(sm, prec, round_nearest)
+    # Both derivatives are bounded by 1
+    c = mpb_finish(c, mag_add(mag_ulp(c, prec), sr))
+    s = mpb_finish(s, mag_add(mag_ulp(s, prec), sr))
+    return c, s
+
+def mpb_cos(s, prec):
+    return mpb_cos_sin(s, prec)[0]
+
+def mpb_sin(s, prec):
+    return mpb_cos_sin(s, prec)[1]
+
+def mpb_tan(s, prec):
+    c, s = mpb_cos_sin(s, prec+10)
+    return mpb_div(s, c, prec)
+
+def mpb_atan(s, prec):
+    sm, sr = s
+    if sm == fzero and not sr[0]:
+        return mpb_zero
+    m = mpf_atan(sm, prec, round_nearest)
+    # The derivative is bounded by 1
+    return mpb_finish(m, mag_add(mag_ulp(m, prec), sr))
+
+def mpb_atan2(y, x, prec):
+    (ym, yr), (xm, xr) = y, x
+    r = mag_add(yr, xr)
+    if r[0]:
+        # Lower bound for |x + y*i| over the balls
+        d = mpc_abs((xm, ym), RAD_PREC, round_down)
+        d = mag_sub_lower(mag_from_mpf_lower(d), r)
+        # Balls around the origin or crossing the branch cut
+        if (not d[0] or mag_is_inf(r) or (mpf_le(mpf_abs(ym), mag_to_mpf(yr))
+                                          and mpf_le(mpb_lower(x), fzero))):
+            y = mpb_to_mpi(y, prec)
+            x = mpb_to_mpi(x, prec)
+            return mpb_from_mpi_inexact(mpi_atan2(y, x, prec), prec)
+    m = mpf_atan2(ym, xm, prec, round_nearest)
+    err = mag_ulp(m, prec)
+    if r[0]:
+        # The gradient has norm 1/|x + y*i|
+        err = mag_add(err, mag_div(r, d))
+    return mpb_finish(m, err)
+
+def mpb_pow(s, t, prec):
+    tm, tr = t
+    if mpb_is_int(t):
+        sign, man, exp, bc = tm
+        return mpb_pow_int(s, (-1)**sign * (man << exp), prec)
+    if t == (fhalf, mag_zero):
+        return mpb_sqrt(s, prec)
+    wp = prec + 20
+    u = mpb_log(s, wp)
+    return mpb_exp(mpb_mul(u, t, wp), prec)
+
+def mpb_gamma(s, prec, type=0):
+    return mpb_from_mpi(mpi_gamma(mpb_to_mpi(s, prec), prec, type), prec)
+
+def mpb_loggamma(s, prec): return mpb_gamma(s, prec, type=3)
+def mpb_rgamma(s, prec): return mpb_gamma(s, prec, type=2)
+def mpb_factorial(s, prec): return mpb_gamma(s, prec, type=1)
+
+
+#----------------------------------------------------------------------------#
+#                             Complex balls                                  #
+#----------------------------------------------------------------------------#
+
+def mpcb_pos(z, prec):
+    a, b = z
+    return mpb_pos(a, prec), mpb_pos(b, prec)
+
+def mpcb_neg(z, prec=0):
+    a, b = z
+    return mpb_neg(a, prec), mpb_neg(b, prec)
+
+def mpcb_add(z, w, prec):
+    a, b = z
+    c, d = w
+    return mpb_add(a, c, prec), mpb_add(b, d, prec)
+
+def mpcb_sub(z, w, prec):
+    a, b = z
+    c, d = w
+    return mpb_sub(a, c, prec), mpb_sub(b, d, prec)
+
+def mpcb_mul(z, w, prec):
+    a, b = z
+    c, d = w
+    re = mpb_dot2(a, c, mpb_neg(b), d, prec)
+    im = mpb_dot2(a, d, b, c, prec)
+    return re, im
+
+def mpcb_fma(z, w, u, prec):
+    return mpcb_add(mpcb_mul(z, w, prec+10), u, prec)
+
+def mpcb_div(z, w, prec):
+    wp = prec + 10
+    c, d = w
+    den = mpb_dot2(c, c, d, d, wp)
+    re, im = mpcb_mul(z, (c, mpb_neg(d)), wp)
+    return mpb_div(re, den, prec), mpb_div(im, den, prec)
+
+def mpcb_abs(z, prec):
+    (am, ar), (bm, br) = z
+    if bm == fzero:
+        m, r = mpb_round(mpf_abs(am), prec)
+    elif am == fzero:
+        m, r = mpb_round(mpf_abs(bm), prec)
+    else:
+        m = mpc_abs((am, bm), prec, round_nearest)
+        if mpf_mul(m, m) == mpf_add(mpf_mul(am, am), mpf_mul(bm, bm)):
+            r = mag_zero
+        else:
+            r = mag_ulp(m, prec)
+    # ||z| - |mid(z)|| <= |z - mid(z)|
+    return mpb_finish(m, mag_add(r, mag_add(ar, br)))
+
+def mpcb_pow_int(z, n, prec):
+    if n < 0:
+        return mpcb_div((mpb_one, mpb_zero), mpcb_pow_int(z, -n, prec+20),
+                        prec)
+    if n == 0:
+        return mpb_one, mpb_zero
+    if n == 1:
+        return mpcb_pos(z, prec)
+    a, b = z
+    if b == mpb_zero:
+        return mpb_pow_int(a, n, prec), mpb_zero
+    wp = prec + 2*n.bit_length() + 10
+    y = None
+    while n:
+        if n & 1:
+            y = z if y is None else mpcb_mul(y, z, wp)
+        n >>= 1
+        if n:
+            z = mpcb_mul(z, z, wp)
+    return mpcb_pos(y, prec)
+
+def mpcb_sqrt(z, prec):
+    a, b = z
+    if b == mpb_zero and mpf_lt(mpb_to_mpi(a, prec)[1], fzero):
+        return mpb_zero, mpb_sqrt(mpb_neg(a), prec)
+    w = (fhalf, fhalf), (fzero, fzero)
+    return mpcb_from_mpci(mpci_pow(mpcb_to_mpci(z, prec), w, prec), prec)
+
+def mpcb_pow(z, w, prec):
+    c, d = w
+    if d == mpb_zero and mpb_is_int(c):
+        sign, man, exp, bc = c[0]
+        return mpcb_pow_int(z, (-1)**sign * (man << exp), prec)
+    if w == ((fhalf, mag_zero), mpb_zero):
+        return mpcb_sqrt(z, prec)
+    z = mpcb_to_mpci(z, prec)
+    w = mpcb_to_mpci(w, prec)
+    return mpcb_from_mpci(mpci_pow(z, w, prec), prec)
+
+def mpcb_exp(z, prec):
+    a, b = z
+    wp = prec + 10
+    e = mpb_exp(a, wp)
+    c, s = mpb_cos_sin(b, wp)
+    return mpb_mul(e, c, prec), mpb_mul(e, s, prec)
+
+def mpcb_log(z, prec):
+    a, b = z
+    re = mpb_log(mpcb_abs(z, prec+10), prec)
+    return re, mpb_atan2(b, a, prec)
+
+def _mpci_wrapper(f):
+    def g(z, prec):
+        re, im = f(mpcb_to_mpci(z, prec), prec)
+        return (mpb_from_mpi_inexact(re, prec),
+                mpb_from_mpi_inexact(im, prec))
+    return g
+
+mpcb_cos = _mpci_wrapper(mpci_cos)
+mpcb_sin = _mpci_wrapper(mpci_sin)
+
+def mpcb_tan(z, prec):
+    wp = prec + 10
+    return mpcb_div(mpcb_sin(z, wp), mpcb_cos(z, wp), prec)
+
+def mpcb_gamma(z, prec, type=0):
+    return mpcb_from_mpci(mpci_gamma(mpcb_to_mpci(z, prec), prec, type), prec)
+
+def mpcb_loggamma(z, prec): return mpcb_gamma(z, prec, type=3)
+def mpcb_rgamma(z, prec): return mpcb_gamma(z, prec, type=2)
+def mpcb_factorial(z, prec): return mpcb_gamma(z, prec, type=1)
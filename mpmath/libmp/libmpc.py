@@ -17,8 +17,8 @@
                      mpf_add, mpf_ceil, mpf_div, mpf_floor, mpf_frac, mpf_hash,
                      mpf_hypot, mpf_mul, mpf_mul_int, mpf_neg, mpf_nint,
                      mpf_pos, mpf_rdiv_int, mpf_shift, mpf_sqrt, mpf_sub,
-                     normalize, reciprocal_rnd, round_down, round_floor,
-                     to_fixed, to_float, to_int, to_str)
+                     mpf_sum, normalize, reciprocal_rnd, round_down,
+                     round_floor, to_fixed, to_float, to_int, to_str)
 
 
 # An mpc value is a (real, imag) tuple
@@ -150,6 +150,20 @@ def mpc_mul(z, w, prec, rnd=round_down):
     im = mpf_add(r, s, prec, rnd)
     return re, im
 
+def mpc_fma(z, w, v, prec, rnd=round_down):
+    """
+    Complex fused multiply-add.
+
+    Returns the real and imaginary part of (a+bi)*(c+di) + (e+fi),
+    with a single rounding of each part to the specified precision.
+    """
+    a, b = z
+    c, d = w
+    e, f = v
+    re = mpf_sum([mpf_mul(a, c), mpf_neg(mpf_mul(b, d)), e], prec, rnd)
+    im = mpf_sum([mpf_mul(a, d), mpf_mul(b, c), f], prec, rnd)
+    return re, im
+
 def mpc_square(z, prec, rnd=round_down):
     # (a+b*I)**2 == a**2 - b**2 + 2*I*a*b
     a, b = z
@@ -7,10 +7,12 @@
 import random
 import re
 import sys
+from array import array
 
 from .backend import BACKEND, MPZ, MPZ_FIVE, MPZ_ONE, MPZ_ZERO, gmpy, int_types
-from .libintmath import (bctable, bin_to_radix, isqrt, numeral, sqrtrem,
-                         stddigits, trailing)
+from .libintmath import (DIVISION_CUTOFF, RADIX_CUTOFF, bctable, bin_to_radix,
+                         idivmod, isqrt, numeral, numeral_to_int, reciprocal,
+                         sqrtrem, stddigits, trailing)
 
 
 class ComplexResult(ValueError):
@@ -765,6 +767,14 @@ def mpf_mul(s, t, prec=0, rnd=round_down):
     if t == fzero: return fnan
     return {1:finf, -1:fninf}[mpf_sign(s) * mpf_sign(t)]
 
+def mpf_fma(s, t, u, prec=0, rnd=round_down):
+    """
+    Compute s*t + u for raw mpfs s, t and u, with a single rounding
+    of the result to the specified precision (the product is not
+    rounded).  With prec=0, the result is exact.
+    """
+    return mpf_add(mpf_mul(s, t), u, prec, rnd)
+
 def gmpy_mpf_mul_int(s, n, prec, rnd=round_down):
     """Multiply by a Python integer."""
     sign, man, exp, bc = s
@@ -849,7 +859,10 @@ def mpf_div(s, t, prec, rnd=round_down):
         extra = prec - sbc + tbc + 5
     if extra < 5:
         extra = 5
-    quot, rem = divmod(sman<<extra, tman)
+    if tbc < DIVISION_CUTOFF:
+        quot, rem = divmod(sman<<extra, tman)
+    else:
+        quot, rem = idivmod(sman<<extra, tman)
     if rem:
         quot = (quot<<1) + 1
         extra += 1
@@ -865,7 +878,10 @@ def mpf_rdiv_int(n, t, prec, rnd=round_down):
         sign ^= 1
         n = -n
     extra = prec + bc + 5
-    quot, rem = divmod(n<<extra, man)
+    if bc < DIVISION_CUTOFF:
+        quot, rem = divmod(n<<extra, man)
+    else:
+        quot, rem = idivmod(n<<extra, man)
     if rem:
         quot = (quot<<1) + 1
         extra += 1
@@ -1408,7 +1424,7 @@ def str_to_man_exp(x, base=10):
     if BACKEND == 'python' and hasattr(sys, 'get_int_max_str_digits'):
         int_max_str_digits = sys.get_int_max_str_digits()
         sys.set_int_max_str_digits(0)
-    x = MPZ(x, base)
+    x = numeral_to_int(x, base)
     if int_max_str_digits:
         sys.set_int_max_str_digits(int_max_str_digits)
     return x, exp
@@ -1449,7 +1465,26 @@ def from_str(x, prec=0, rnd=round_down, base=0):
     if base == 10:
         # XXX: appropriate cutoffs & track direction
         # note no factors of 5
-        if abs(exp) > 400:
+        if (BACKEND == 'python' and prec and
+                RADIX_CUTOFF <= -exp <= prec + man.bit_length()):
+            # Long division is quadratic; divide by multiplying
+            # with a reciprocal instead
+            q = MPZ(10)**-exp
+            extra = max(prec - man.bit_length() + q.bit_length() + 5, 5)
+            n = abs(man) << extra
+            nbc = n.bit_length()
+            quot = (n * reciprocal(q, nbc)) >> nbc
+            rem = n - quot*q
+            while rem >= q:
+                quot += 1
+                rem -= q
+            if rem:
+                quot = (quot<<1) + 1
+                extra += 1
+            if man < 0:
+                quot = -quot
+            s = from_man_exp(quot, -extra, prec, rnd)
+        elif abs(exp) > 400:
             s = from_int(man, prec+10)
             s = mpf_mul(s, mpf_pow_int(ften, exp, prec+10), prec, rnd)
         else:
@@ -1950,3 +1985,370 @@ def mpf_hypot(x, y, prec, rnd=round_down):
     if x == fzero: return mpf_abs(y, prec, rnd)
     hypot2 = mpf_add(mpf_mul(x,x), mpf_mul(y,y), prec+10, rnd)
     return mpf_sqrt(hypot2, prec, rnd)
+
+
+#----------------------------------------------------------------------------#
+#                          Arithmetic on mpf arrays                          #
+#----------------------------------------------------------------------------#
+
+# An mpf array is a pair of parallel lists (mans, exps) with signed
+# mantissas and exponents, the k-th entry having the value
+# mans[k]*2**exps[k].  Special values are encoded as for raw mpfs, by
+# a zero mantissa and a nonzero exponent.  The kernels below loop over
+# whole arrays in one call, handle the regular case inline and fall back
+# to the scalar functions for special values.
+
+_special_from_exp = {fnan[2]: fnan, finf[2]: finf, fninf[2]: fninf}
+
+def python_round_man(man, exp, prec, rnd=round_down):
+    """
+    Round the number man*2**exp with a signed mantissa to prec bits
+    (no rounding with prec=0), stripping trailing zero bits.  Return
+    the normalized pair (man, exp).
+    """
+    if not man:
+        return man, 0
+    sign = 0
+    if man < 0:
+        sign = 1
+        man = -man
+    if prec:
+        n = man.bit_length() - prec
+        if n > 0:
+            if rnd == round_nearest:
+                t = man >> (n-1)
+                if t & 1 and ((t & 2) or (man & h_mask[n<300][n])):
+                    man = (t>>1)+1
+                else:
+                    man = t>>1
+            elif shifts_down[rnd][sign]:
+                man >>= n
+            else:
+                man = -((-man)>>n)
+            exp += n
+    if not man & 1:
+        t = (man & -man).bit_length() - 1
+        man >>= t
+        exp += t
+    if sign:
+        man = -man
+    return man, exp
+
+def gmpy_round_man(man, exp, prec, rnd=round_down):
+    """Round the number man*2**exp, see python_round_man()."""
+    sign, man, exp, bc = from_man_exp(man, exp, prec, rnd)
+    if sign:
+        man = -man
+    return man, exp
+
+round_man = python_round_man
+
+if gmpy:
+    round_man = gmpy_round_man
+
+def mpf_array_pack(xs):
+    """Convert a sequence of raw mpfs to an mpf array (mans, exps)."""
+    mans = []
+    exps = []
+    for sign, man, exp, bc in xs:
+        mans.append(-man if sign else man)
+        exps.append(exp)
+    return mans, exps
+
+def mpf_array_get(man, exp):
+    """Return the raw mpf stored as (man, exp) in an mpf array."""
+    if not man and exp:
+        return _special_from_exp[exp]
+    return from_man_exp(man, exp)
+
+def mpf_array_unpack(mans, exps):
+    """Convert an mpf array (mans, exps) to a list of raw mpfs."""
+    return [mpf_array_get(m, e) for m, e in zip(mans, exps)]
+
+def mpf_array_pos(xmans, xexps, prec, rnd=round_down):
+    """Round all entries of an mpf array to prec bits."""
+    mans = []
+    exps = []
+    for a, ea in zip(xmans, xexps):
+        if a:
+            a, ea = round_man(a, ea, prec, rnd)
+        mans.append(a)
+        exps.append(ea)
+    return mans, exps
+
+def mpf_neg_array(xmans, xexps, prec=0, rnd=round_down):
+    """Negate all entries of an mpf array, rounding to prec bits
+    if prec is nonzero."""
+    mans = []
+    exps = []
+    for a, ea in zip(xmans, xexps):
+        if a:
+            if prec:
+                a, ea = round_man(a, ea, prec, rnd)
+        elif ea:
+            sign, a, ea, bc = mpf_neg(_special_from_exp[ea])
+        mans.append(-a)
+        exps.append(ea)
+    return mans, exps
+
+def mpf_add_array(xmans, xexps, ymans, yexps, prec=0, rnd=round_down,
+                  _sub=0):
+    """
+    Add two mpf arrays elementwise.
+
+    The exactly computed sums are rounded to prec bits; with prec=0
+    no rounding is performed.
+    """
+    mans = []
+    exps = []
+    for a, ea, b, eb in zip(xmans, xexps, ymans, yexps):
+        offset = ea - eb
+        if a and b and -100 <= offset <= 100:
+            if _sub:
+                b = -b
+            if offset >= 0:
+                man, exp = round_man((a << offset) + b, eb, prec, rnd)
+            else:
+                man, exp = round_man(a + (b << -offset), ea, prec, rnd)
+        else:
+            sign, man, exp, bc = mpf_add(mpf_array_get(a, ea),
+                                         mpf_array_get(b, eb), prec, rnd,
+                                         _sub)
+            if sign:
+                man = -man
+        mans.append(man)
+        exps.append(exp)
+    return mans, exps
+
+def mpf_sub_array(xmans, xexps, ymans, yexps, prec=0, rnd=round_down):
+    """Subtract two mpf arrays elementwise, see mpf_add_array()."""
+    return mpf_add_array(xmans, xexps, ymans, yexps, prec, rnd, 1)
+
+def mpf_mul_array(xmans, xexps, ymans, yexps, prec=0, rnd=round_down):
+    """
+    Multiply two mpf arrays elementwise.
+
+    The exact products are rounded to prec bits; with prec=0
+    no rounding is performed.
+    """
+    mans = []
+    exps = []
+    for a, ea, b, eb in zip(xmans, xexps, ymans, yexps):
+        man = a*b
+        if man:
+            man, exp = round_man(man, ea+eb, prec, rnd)
+        else:
+            sign, man, exp, bc = mpf_mul(mpf_array_get(a, ea),
+                                         mpf_array_get(b, eb), prec, rnd)
+            if sign:
+                man = -man
+        mans.append(man)
+        exps.append(exp)
+    return mans, exps
+
+def mpf_div_array(xmans, xexps, ymans, yexps, prec, rnd=round_down):
+    """Divide two mpf arrays elementwise, rounding to prec bits."""
+    mans = []
+    exps = []
+    for a, ea, b, eb in zip(xmans, xexps, ymans, yexps):
+        if a and b:
+            sign = 0
+            if a < 0:
+                sign = 1
+                a = -a
+            if b < 0:
+                sign ^= 1
+                b = -b
+            # Same strategy as in mpf_div()
+            bb = b.bit_length()
+            extra = max(5, prec - a.bit_length() + bb + 5)
+            if bb < DIVISION_CUTOFF:
+                quot, rem = divmod(a << extra, b)
+            else:
+                quot, rem = idivmod(a << extra, b)
+            if rem:
+                quot = (quot << 1) + 1
+                extra += 1
+            if sign:
+                quot = -quot
+            man, exp = round_man(quot, ea-eb-extra, prec, rnd)
+        else:
+            sign, man, exp, bc = mpf_div(mpf_array_get(a, ea),
+                                         mpf_array_get(b, eb), prec, rnd)
+            if sign:
+                man = -man
+        mans.append(man)
+        exps.append(exp)
+    return mans, exps
+
+def mpf_sqrt_array(xmans, xexps, prec, rnd=round_down):
+    """
+    Compute square roots of all entries of an mpf array, rounding to
+    prec bits.  Raise ComplexResult if some entry is negative.
+    """
+    mans = []
+    exps = []
+    trunc = rnd in 'fd'
+    for a, ea in zip(xmans, xexps):
+        if a > 0:
+            # Same strategy as in mpf_sqrt()
+            if ea & 1:
+                ea -= 1
+                a <<= 1
+            shift = max(4, 2*prec - a.bit_length() + 4)
+            shift += shift & 1
+            if trunc:
+                man = isqrt(a << shift)
+            else:
+                man, rem = sqrtrem(a << shift)
+                if rem:
+                    man = (man << 1) + 1
+                    shift += 2
+            man, exp = round_man(man, (ea-shift)//2, prec, rnd)
+        else:
+            sign, man, exp, bc = mpf_sqrt(mpf_array_get(a, ea), prec, rnd)
+        mans.append(man)
+        exps.append(exp)
+    return mans, exps
+
+#----------------------------------------------------------------------------#
+#                     Binary serialization of mpf arrays                     #
+#----------------------------------------------------------------------------#
+
+# An mpf array (mans, exps) is stored as
+#
+#   n                     number of entries (varint)
+#   exponent block        typecode byte, then n exponents
+#   size block            typecode byte, then n values 2*L + sign
+#   mantissas             abs(mans[k]) as L little-endian bytes each
+#
+# where the typecode is the array module code of the narrowest
+# fixed-size integer type that holds all values (stored little-endian),
+# or 'v' for a sequence of (zigzag-encoded) varints.
+
+_int_codes = ((b'h', 1<<15), (b'i', 1<<31), (b'q', 1<<63))
+_uint_codes = ((b'B', 1<<8), (b'H', 1<<16), (b'I', 1<<32), (b'Q', 1<<64))
+
+def write_varint(n, out):
+    """Append the nonnegative integer n to the bytearray out as a
+    little-endian base-128 varint."""
+    while n >= 0x80:
+        out.append((n & 0x7f) | 0x80)
+        n >>= 7
+    out.append(n)
+
+def read_varint(data, pos):
+    """Read a varint from data starting at pos. Return (n, newpos)."""
+    n = 0
+    shift = 0
+    while True:
+        try:
+            b = data[pos]
+        except IndexError:
+            raise ValueError("truncated data")
+        pos += 1
+        n |= (b & 0x7f) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+def _write_ints(xs, signed, out):
+    if xs:
+        lo = min(xs)
+        hi = max(xs)
+    else:
+        lo = hi = 0
+    if signed:
+        for code, bound in _int_codes:
+            if -bound <= lo and hi < bound:
+                break
+        else:
+            code = b'v'
+    else:
+        for code, bound in _uint_codes:
+            if hi < bound:
+                break
+        else:
+            code = b'v'
+    out += code
+    if code == b'v':
+        for x in xs:
+            if signed:
+                x = (x << 1) if x >= 0 else ((-x) << 1) - 1
+            write_varint(int(x), out)
+    else:
+        a = array(code.decode(), [int(x) for x in xs])
+        if sys.byteorder == 'big':
+            a.byteswap()
+        out += a.tobytes()
+
+def _read_ints(data, pos, n, signed):
+    code = chr(data[pos])
+    pos += 1
+    if code == 'v':
+        xs = []
+        for _ in range(n):
+            x, pos = read_varint(data, pos)
+            if signed:
+                x = (x >> 1) if not x & 1 else -((x + 1) >> 1)
+            xs.append(x)
+        return xs, pos
+    if code not in 'hiqBHIQ':
+        raise ValueError("invalid data")
+    a = array(code)
+    end = pos + n*a.itemsize
+    if end > len(data):
+        raise ValueError("truncated data")
+    a.frombytes(data[pos:end])
+    if sys.byteorder == 'big':
+        a.byteswap()
+    return a.tolist(), end
+
+def mpf_array_to_bytes(mans, exps, out=None):
+    """
+    Serialize the mpf array (mans, exps) in a compact binary format,
+    appending to the bytearray out if given.  Return the bytearray.
+    """
+    if out is None:
+        out = bytearray()
+    write_varint(len(mans), out)
+    _write_ints(exps, True, out)
+    mags = []
+    sizes = []
+    for m in mans:
+        m = int(m)
+        if m < 0:
+            m = -m
+            s = 1
+        else:
+            s = 0
+        L = (m.bit_length() + 7) >> 3
+        mags.append(m.to_bytes(L, 'little'))
+        sizes.append((L << 1) | s)
+    _write_ints(sizes, False, out)
+    out += b''.join(mags)
+    return out
+
+def mpf_array_from_bytes(data, pos=0):
+    """
+    Read an mpf array written by mpf_array_to_bytes() from the bytes-like
+    object data starting at pos.  Return (mans, exps, newpos).
+    """
+    data = memoryview(data)
+    n, pos = read_varint(data, pos)
+    exps, pos = _read_ints(data, pos, n, True)
+    sizes, pos = _read_ints(data, pos, n, False)
+    mans = []
+    from_bytes = int.from_bytes
+    for s in sizes:
+        end = pos + (s >> 1)
+        m = from_bytes(data[pos:end], 'little')
+        if s & 1:
+            m = -m
+        mans.append(m)
+        pos = end
+    if pos > len(data):
+        raise ValueError("truncated data")
+    if BACKEND != 'python':
+        mans = [MPZ(m) for m in mans]
+    return mans, exps, pos
@@ -0,0 +1,161 @@
+"""
+Persistent on-disk store for expensive precomputed values.
+
+Computing constants such as pi or Euler's constant, or tables of
+Bernoulli numbers, to tens of thousands of digits can dominate the
+running time of short-lived processes.  When a store directory is set
+(with set_store() or the MPMATH_CACHE_DIR environment variable), such
+values are saved there once computed at a precision of at least
+STORE_MIN_PREC bits, and loaded by later processes instead of being
+computed again.  The bytecode of the generated hypergeometric
+summators (see libhyper) is saved there as well.  The store is
+disabled by default.
+
+Each value is kept in a separate file named <name>-<prec>.bin with the
+layout
+
+  magic                 b'MPMS'
+  prec                  precision of the value (varint)
+  length                number of bytes in the payload (varint)
+  payload
+
+The files are read through mmap.  Writers create a temporary file in
+the same directory and atomically rename it, so that concurrent
+processes never see a partially written file.  All I/O errors are
+ignored, as are payloads that cannot be decoded: the store only caches
+values that can always be recomputed.
+
+The stored summators are executed when loaded, so the directory must
+not be writable by untrusted users.
+"""
+
+import os
+
+from .backend import MPZ
+from .libmpf import read_varint, write_varint
+
+
+# Values computed at a lower precision are cheap enough to recompute
+STORE_MIN_PREC = 10000
+
+_magic = b'MPMS'
+
+store_dir = os.environ.get('MPMATH_CACHE_DIR') or None
+
+
+def set_store(path):
+    """Set the directory of the store, creating it if needed.  With
+    path=None, the store is disabled."""
+    global store_dir
+    if path is not None:
+        path = os.fspath(path)
+        os.makedirs(path, exist_ok=True)
+    store_dir = path
+
+
+def _path(name, prec):
+    return os.path.join(store_dir, '%s-%i.bin' % (name, prec))
+
+
+def precisions(name):
+    """Return the sorted list of precisions at which a value with the
+    given name is in the store."""
+    if store_dir is None:
+        return []
+    prefix = name + '-'
+    precs = []
+    try:
+        files = os.listdir(store_dir)
+    except OSError:
+        return []
+    for fname in files:
+        if fname.startswith(prefix) and fname.endswith('.bin'):
+            p = fname[len(prefix):-4]
+            if p.isdigit():
+                precs.append(int(p))
+    return sorted(precs)
+
+
+def read(name, prec, convert=bytes):
+    """Return convert(payload) for the value stored under name at
+    precision prec, or None if there is no such valid entry.  The
+    payload is passed to convert as a memoryview of the mapped file,
+    which must not be kept after convert returns.  If convert raises
+    ValueError, TypeError or EOFError, the payload is considered
+    corrupt and None is returned."""
+    if store_dir is None:
+        return None
+    import mmap
+    try:
+        with open(_path(name, prec), 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as data:
+                    if data[:4] != _magic:
+                        return None
+                    p, pos = read_varint(data, 4)
+                    n, pos = read_varint(data, pos)
+                    if p != prec or pos + n != len(data):
+                        return None
+                    with data[pos:] as payload:
+                        return convert(payload)
+    except (OSError, ValueError, TypeError, EOFError):
+        return None
+
+
+def write(name, prec, payload):
+    """Store the bytes-like payload under name at precision prec."""
+    if store_dir is None:
+        return
+    # Not imported at module level, as it is slow to import
+    import tempfile
+    out = bytearray(_magic)
+    write_varint(prec, out)
+    write_varint(len(payload), out)
+    out += payload
+    try:
+        os.makedirs(store_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=store_dir, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(out)
+            os.replace(tmp, _path(name, prec))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except OSError:
+        pass
+
+
+def remove(name, prec):
+    """Remove the value stored under name at precision prec."""
+    try:
+        os.unlink(_path(name, prec))
+    except (OSError, TypeError):
+        pass
+
+
+def _to_int(data):
+    return MPZ(int.from_bytes(data, 'little'))
+
+
+def load_fixed(name, prec):
+    """Look for a nonnegative fixed-point value stored under name at a
+    precision of at least prec bits.  Return (stored_prec, value), or
+    None if there is none."""
+    for p in precisions(name):
+        if p >= prec:
+            value = read(name, p, _to_int)
+            if value is not None:
+                return p, value
+    return None
+
+
+def save_fixed(name, prec, value):
+    """Store the nonnegative fixed-point value with precision prec
+    under name, replacing values stored at lower precisions."""
+    value = int(value)
+    write(name, prec, value.to_bytes((value.bit_length() + 7) >> 3,
+                                     'little'))
+    for p in precisions(name):
+        if p < prec:
+            remove(name, p)
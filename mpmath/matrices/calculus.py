@@ -306,7 +306,7 @@ def sqrtm(ctx, A, _may_rotate=2):
             ...   [-0,0,-1,2,-1],
             ...   [-0,-0,-0,-1,2]])
             >>> mnorm(sqrtm(X) - Y)
-            4.53155328326114e-19
+            4.53087038330821e-19
 
         """
         A = ctx.matrix(A)
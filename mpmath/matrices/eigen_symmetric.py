@@ -806,26 +806,25 @@ def gauss_quadrature(ctx, n, qtype = "legendre", alpha = 0, beta = 0):
     Mathematical Software algorithm 726.
     """
 
+    if qtype in ("legendre", "legendre01"):
+        # the Legendre rules are computed directly from the roots of the
+        # Legendre polynomial, which takes O(n) rather than O(n^2) time
+        nodes = sorted(ctx._gauss_legendre.legendre_nodes(n, ctx.prec))
+        d = ctx.matrix([x for x, w in nodes])
+        z = ctx.matrix([w for x, w in nodes])
+        if qtype == "legendre01":
+            for i in range(n):
+                d[i] = (d[i] + 1) / 2
+                z[i] = z[i] / 2
+        return (d, z)
+
     d = ctx.zeros(n, 1)
     e = ctx.zeros(n, 1)
     z = ctx.zeros(1, n)
 
     z[0,0] = 1
 
-    if qtype == "legendre":
-        # legendre on the range -1 +1 , abramowitz, table 25.4, p.916
-        w = 2
-        for i in range(n):
-            j = i + 1
-            e[i] = ctx.sqrt(j * j / (4 * j * j - ctx.mpf(1)))
-    elif qtype == "legendre01":
-        # legendre shifted to 0 1        , abramowitz, table 25.8, p.921
-        w = 1
-        for i in range(n):
-            d[i] = 1 / ctx.mpf(2)
-            j = i + 1
-            e[i] = ctx.sqrt(j * j / (16 * j * j - ctx.mpf(4)))
-    elif qtype == "hermite":
+    if qtype == "hermite":
         # hermite on the range -inf +inf , abramowitz, table 25.10,p.924
         w = ctx.sqrt(ctx.pi)
         for i in range(n):
@@ -26,15 +26,15 @@
 
     >>> residual(A, x, b)
     matrix(
-    [['3.46944695195361e-18'],
-     ['3.46944695195361e-18']])
+    [['0.0'],
+     ['0.0']])
     >>> str(eps)
     '2.22044604925031e-16'
 
-As you can see, the solution is quite accurate. The error is caused by the
-inaccuracy of the internal floating-point arithmetic. Though, it's even smaller
-than the current machine epsilon, which basically means you can trust the
-result.
+As you can see, the solution is accurate here.  In general, the residual is
+nonzero because of the inaccuracy of the internal floating-point arithmetic.
+If it is smaller than the current machine epsilon, this basically means you
+can trust the result.
 
 If you need more speed, use NumPy, or ``fp.lu_solve`` for a floating-point computation.
 
@@ -169,7 +169,7 @@ def L_solve(ctx, L, b, p=None):
         # solve
         for i in range(1, n):
             for j in range(i):
-                b[i] -= L[i,j] * b[j]
+                b[i] = ctx.fma(-L[i,j], b[j], b[i])
         return b
 
     def U_solve(ctx, U, y):
@@ -184,7 +184,7 @@ def U_solve(ctx, U, y):
         x = copy(y)
         for i in range(n - 1, -1, -1):
             for j in range(i + 1, n):
-                x[i] -= U[i,j] * x[j]
+                x[i] = ctx.fma(-U[i,j], x[j], x[i])
             x[i] /= U[i,i]
         return x
 
@@ -0,0 +1,158 @@
+import pickle
+import random
+
+import pytest
+
+from mpmath import ball, inf, iv, mp, mpb, mpf, mpi
+
+
+def test_ball_identity():
+    assert mpb(2) == ball.mpf(2)
+    assert mpb(2) != mpb(2, 1)
+    assert not (mpb(2) != mpb(2))
+    assert mpb(2).rad == 0
+    assert mpb(2, 0.5).rad == 0.5
+    assert mpb(2, 0.5).mid == 2
+    assert mpb(2, 0.5).a == 1.5
+    assert mpb(2, 0.5).b == 2.5
+    u = mpb(1, 2)
+    assert -1 in u
+    assert 3 in u
+    assert -1.1 not in u
+    assert 3.1 not in u
+    assert mpb(0, 1) in u
+    assert mpb(1, 3) not in u
+    assert mpb('0.1').rad > 0
+    assert mpi('0.1') in iv.mpf(mpb('0.1'))
+
+def test_ball_exact():
+    # Exactly representable results have zero radius
+    assert mpb(2) + 3 == 5
+    assert (mpb(2) * 3).rad == 0
+    assert (mpb(3) / 4).rad == 0
+    assert (mpb(3) / 4) == 0.75
+    assert mpb(2)**10 == 1024
+    assert ball.sqrt(4) == 2
+    assert ball.exp(0) == 1
+    assert ball.mpc(1, 2) * ball.mpc(3, 4) == ball.mpc(-5, 10)
+    assert abs(ball.mpc(3, 4)) == 5
+
+def test_ball_arithmetic():
+    x = mpb(2, 0.5) + mpb(3, 0.25)
+    assert x.mid == 5 and 0.75 <= x.rad < 0.76
+    x = mpb(2, 0.5) * mpb(3, 0.25)
+    assert 6 in x and 4.375 in x and 8.125 in x
+    x = 1 / mpb(2, 0.5)
+    assert 0.4 in x and 0.66 in x
+    assert 1 / mpb(0, 1) == ball.nan
+    assert 1 / mpb(1, 1) == ball.nan
+    assert ball.isnan(1 / mpb(0))
+    assert mpb(1, 1) > -1
+    assert mpb(1, 1) < 3
+    pytest.raises(ValueError, lambda: mpb(1, 1) > 0)
+    pytest.raises(ValueError, lambda: mpb(1, 1) < 1)
+
+@pytest.mark.parametrize('prec', [53, 200, 1000])
+def test_ball_functions(prec):
+    ball.prec = mp.prec = prec
+    for x in ['0.3', '2', '7.25', '-3.5']:
+        b, m = mpb(x), mpf(x)
+        assert mp.sqrt(abs(m)) in ball.sqrt(abs(b))
+        assert mp.exp(m) in ball.exp(b)
+        assert mp.log(abs(m)) in ball.log(abs(b))
+        assert mp.sin(m) in ball.sin(b)
+        assert mp.cos(m) in ball.cos(b)
+        assert mp.tan(m) in ball.tan(b)
+        assert mp.atan(m) in ball.atan(b)
+        assert mp.gamma(m) in ball.gamma(b)
+        assert mp.cbrt(abs(m)) in abs(b) ** (ball.mpf(1)/3)
+        assert ball.sqrt(abs(b)).rad < abs(m) * 2**(4-prec)
+        assert ball.exp(b).rad < mp.exp(m) * 2**(4-prec)
+    assert mp.pi in ball.pi
+    assert mp.e in ball.e
+    assert ball.pi.rad <= 2**(2-prec)
+    ball.prec = mp.prec = 53
+
+def test_ball_complex():
+    z = ball.mpc(1, 2)
+    w = mp.mpc(1, 2)
+    assert w*w in z*z
+    assert 1/w in 1/z
+    assert mp.sqrt(w) in ball.sqrt(z)
+    assert mp.exp(w) in ball.exp(z)
+    assert mp.log(w) in ball.log(z)
+    assert mp.sin(w) in ball.sin(z)
+    assert mp.cos(w) in ball.cos(z)
+    assert mp.gamma(w) in ball.gamma(z)
+    assert mp.sqrt(-2) in ball.sqrt(-2)
+    assert ball.sqrt(-4) == ball.mpc(0, 2)
+    assert mp.log(-2) in ball.log(-2)
+    pytest.raises(TypeError, lambda: z < 1)
+
+@pytest.mark.parametrize('prec', [53, 100])
+def test_ball_atan2_log(prec):
+    rng = random.Random(prec)
+    ball.prec = prec
+    try:
+        for k in range(200):
+            y = rng.uniform(-10, 10)
+            x = rng.uniform(-10, 10)
+            r = rng.choice([0, 0, 1e-20, 1e-5])
+            yb = mpb(y, r)
+            xb = mpb(x, r)
+            z = ball.mpc(xb, yb)
+            with mp.workprec(prec + 100):
+                for u in [mpf(y) - r, mpf(y) + r, mpf(y)]:
+                    for v in [mpf(x) - r, mpf(x) + r, mpf(x)]:
+                        assert mp.atan2(u, v) in ball.atan2(yb, xb)
+                        w = mp.log(mp.mpc(v, u))
+                        assert w.real in ball.log(z).real
+                        assert w.imag in ball.log(z).imag
+        # Inexact results of exact arguments have a nonzero radius
+        assert ball.atan2(-6.78958297309986, 9.68543513083662).rad > 0
+        assert ball.atan2(0, 2) == 0
+        assert ball.log(ball.mpc(1, 0)) == 0
+        # Balls around the origin and crossing the branch cut
+        assert mp.pi in ball.atan2(mpb(0, 1e-10), -1)
+        assert -mp.pi in ball.atan2(mpb(0, 1e-10), -1)
+        assert mp.pi/2 in ball.atan2(1, mpb(0, 2))
+        assert ball.atan2(mpb(0, 1), mpb(0, 1)).rad >= 3
+    finally:
+        ball.prec = 53
+
+def test_ball_matrix():
+    mp.dps = ball.dps = 30
+    n = 6
+    A = ball.matrix(n, n)
+    B = mp.matrix(n, n)
+    for i in range(n):
+        for j in range(n):
+            A[i, j] = ball.one / (i + j + 1)
+            B[i, j] = mp.one / (i + j + 1)
+    b = ball.matrix([ball.sqrt(i + 2) for i in range(n)])
+    x = ball.lu_solve(A, b)
+    with mp.workprec(300):
+        y = mp.lu_solve(B, [mp.sqrt(i + 2) for i in range(n)])
+    for i in range(n):
+        assert y[i] in x[i]
+        assert x[i].rad < 1e-10
+    mp.dps = ball.dps = 15
+
+def test_ball_str():
+    x = mpb('0.1')
+    assert str(mpb(2)) == '2.0'
+    assert str(x) == '[0.100000000000000006 +- 1.44e-17]'
+    assert repr(x) == "mpb('0.10000000000000001', '1.3877787808e-17')"
+    assert x in eval(repr(x), {"mpb": mpb})
+    assert str(mpb(1, inf)) == '[+- inf]'
+    assert ball.nstr(ball.pi, 5) == '[3.1416 +- 7.35e-6]'
+    for y in [x, mpb(2), ball.pi, ball.mpc(1, '0.1')]:
+        assert pickle.loads(pickle.dumps(y)) == y
+
+def test_ball_convert():
+    assert ball.convert(mpi(1, 2)) == mpb('1.5', '0.5')
+    assert ball.convert(mpi('0.1')).a <= mpi('0.1').a
+    assert ball.mpf([1, 2]) == mpb('1.5', '0.5')
+    assert ball.mpf('[2 +- 0.5]') == mpb(2, 0.5)
+    assert iv.mpf(mpb(2, 0.5)) == mpi(1.5, 2.5)
+    assert ball.mpc(2j) == ball.mpc(0, 2)
@@ -813,3 +813,105 @@ def worker(index):
             thread.join()
 
         assert not bad
+
+
+def test_shared_caches_threads():
+    # Threads sharing the libmp memo tables, with a small budget to
+    # force concurrent eviction
+    def work(index):
+        ctx = mpmath.MPContext()
+        res = []
+        for dps in (15, 30, 50, 80):
+            ctx.dps = dps + index % 3
+            res.append((ctx.bernoulli(40 + index % 5), ctx.gamma(ctx.mpf(1)/3),
+                        ctx.zeta(3 + index % 4), ctx.log(7 + index),
+                        ctx.cos(ctx.mpf(index)/7), +ctx.pi, +ctx.euler))
+        return res
+
+    n = 16
+    expected = [work(i) for i in range(n)]
+    info = mpmath.libmp.libcache
+    old = info.budget
+    try:
+        for budget in (None, 20000):
+            mpmath.cache_clear()
+            mpmath.set_cache_budget(budget)
+            with ThreadPoolExecutor(max_workers=n) as tpe:
+                results = list(tpe.map(work, range(n)))
+            assert results == expected
+            assert info.total_bytes == sum(c.nbytes
+                                           for c in info.registry.values())
+    finally:
+        mpmath.set_cache_budget(old)
+
+
+def test_vector():
+    xs = [mpf(1)/3, -2, mpf('1e100'), mpf('1e-100'), 0, inf, -inf, nan, 7]
+    ys = [3, mpf(2)/7, mpf('-1e-100'), mpf('1e100'), -1, 2, inf, 1, 7]
+    vx, vy = mpmath.vector(xs), mpmath.vector(ys)
+    assert len(vx) == len(xs)
+    assert vx[0] == xs[0] and vx[-2] is not nan and isnan(vx[-2])
+    assert vx[1:3] == mpmath.vector(xs[1:3])
+    for prec in [10, 53, 300]:
+        mp.prec = prec
+        for op in [operator.add, operator.sub, operator.mul]:
+            for r, x, y in zip(op(vx, vy), xs, ys):
+                assert r == op(x, y) or (isnan(r) and isnan(op(x, y)))
+            for r, x in zip(op(vx, 3), xs):
+                assert r == op(x, 3) or (isnan(r) and isnan(op(x, 3)))
+            for r, x in zip(op(mpf(3), vx), xs):
+                assert r == op(3, x) or (isnan(r) and isnan(op(3, x)))
+        for r, x, y in zip(vx[:4]/vy[:4], xs, ys):
+            assert r == x/y
+        for r, x in zip(2/vx[:4], xs):
+            assert r == 2/x
+        for r, x in zip(-vx, xs):
+            assert r == -x or isnan(r)
+        va = mpmath.vector([abs(x) for x in xs])
+        for r, x in zip(va.sqrt(), va):
+            assert r == x.sqrt() or isnan(r)
+    mp.prec = 53
+    with pytest.raises(mpmath.libmp.ComplexResult):
+        mpmath.vector([-1]).sqrt()
+    with pytest.raises(ValueError):
+        vx + vy[1:]
+    with pytest.raises(TypeError):
+        mpmath.vector([1j])
+    with pytest.raises(TypeError):
+        vx + 1j
+    v = mpmath.vector(range(3))
+    v[1] = '0.1'
+    assert v.tolist() == [0, mpf('0.1'), 2]
+    assert str(v) == '[0.0, 0.1, 2.0]'
+    mp.dps = 30
+    v = mpmath.vector([mpf(1)/3])
+    assert v[0] == mpf(1)/3
+    mp.prec = 20
+    assert v[0] != mpf(1)/3
+    assert (+v)[0] == mpf(1)/3
+
+
+def test_fma():
+    x = 1 + mpf(2)**-30
+    assert mpmath.fma(x, x, -1) == mpf(2)**-29 + mpf(2)**-60
+    assert x*x - 1 == mpf(2)**-29
+    assert mpmath.fma(x, x, -1, prec=10) == mpf(2)**-29
+    assert mpmath.fma(2, 3, 1, exact=True) == 7
+    assert mpmath.fma(1, 1, mpf(2)**-60, rounding='u') == 1 + mpf(2)**-52
+    assert mpmath.fma(1, 1, mpf(2)**-60, dps=30) == fadd(1, mpf(2)**-60,
+                                                         exact=True)
+    assert mpmath.fma(2+3j, 1j, 0.5) == mpc(-2.5, 2)
+    assert mpmath.fma(2, mpc(1, 2), 1) == mpc(3, 4)
+    assert mpmath.fma(1j, 1j, 1) == 0
+    assert isnan(mpmath.fma(inf, 0, 1))
+    assert mpmath.fma(inf, 2, 1) == inf
+    mp.rounding = 'f'
+    assert mpmath.fma(1, 1, -mpf(2)**-60) == 1 - mpf(2)**-53
+    mp.rounding = 'n'
+    with pytest.raises(OverflowError):
+        mpmath.fma(1, 1, '1e-100000000000000000000', exact=True)
+    for ctx in [fp, iv]:
+        assert ctx.fma(2, 3, 1) == 7
+    assert fp.fma(1j, 1j, 1) == 0
+    assert fp.fma(1e300, 1e300, 1) == fp.inf
+    assert fp.fma(-1e300, 1e300, 1) == fp.ninf
@@ -0,0 +1,37 @@
+import json
+import subprocess
+import sys
+
+from mpmath import benchmarks
+from mpmath.libmp import BACKEND
+
+
+def test_run():
+    res = benchmarks.run('libmpf.mpf_add', [53, 1000], min_time=0.001,
+                         repeat=1)
+    assert list(res) == ['libmpf.mpf_add']
+    assert set(res['libmpf.mpf_add']) == {'53', '1000'}
+    assert all(t > 0 for t in res['libmpf.mpf_add'].values())
+    assert ('eigen.eig', 100000) not in benchmarks.select('eig', [100000])
+    assert ('libmpf.mpf_div', 333333) in benchmarks.select('mpf_div')
+    assert ('libmpf.mpf_add', 333333) not in benchmarks.select('mpf_add')
+    assert benchmarks.select('mpf_div', [53]) == [('libmpf.mpf_div', 53)]
+    old = benchmarks.report(res)
+    assert list(old['results']) == [BACKEND]
+    new = json.loads(json.dumps(old))
+    new['results'][BACKEND]['libmpf.mpf_add']['53'] *= 2
+    rows, slower = benchmarks.compare(old, new)
+    assert len(rows) == 2
+    assert [(r[1], r[2]) for r in slower] == [('libmpf.mpf_add', 53)]
+
+
+def test_main(tmp_path):
+    old = tmp_path / 'old.json'
+    cmd = [sys.executable, '-m', 'mpmath.benchmarks', '-k', 'mpf_mul',
+           '-p', '53', '--min-time', '0.001']
+    subprocess.run(cmd + ['-o', str(old)], check=True, capture_output=True)
+    assert 'libmpf.mpf_mul' in json.loads(old.read_text())['results'][BACKEND]
+    out = subprocess.run(cmd + ['-c', str(old), str(old)], text=True,
+                         capture_output=True)
+    assert out.returncode == 0
+    assert 'libmpf.mpf_mul' in out.stdout
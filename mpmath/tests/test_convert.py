@@ -9,6 +9,7 @@
 from mpmath.libmp import (fhalf, from_float, from_rational, from_str,
                           round_ceiling, round_floor, round_nearest,
                           to_rational, to_str)
+from mpmath.libmp.libintmath import numeral, numeral_to_int
 
 
 def test_basic_string():
@@ -115,6 +116,25 @@ def test_tight_string_conversion():
     assert from_str('0.5', 10, round_floor) == fhalf
     assert from_str('0.5', 10, round_ceiling) == fhalf
 
+def test_huge_string_conversion():
+    # Exercise the divide-and-conquer radix conversion
+    random.seed(1)
+    digits = '1' + ''.join(random.choice('0123456789') for _ in range(20000))
+    p = numeral_to_int(digits)
+    assert numeral(p, size=len(digits)) == digits
+    assert numeral_to_int('-' + digits) == -p
+    for s, a, b in [(digits[:3] + '.' + digits[3:], p, 10**(len(digits) - 3)),
+                    ('-0.000' + digits, -p, 10**(len(digits) + 3))]:
+        for rnd in [round_floor, round_ceiling, round_nearest]:
+            for prec in [53, 10000, 70000]:
+                assert from_str(s, prec, rnd) == from_rational(a, b, prec, rnd)
+    x = from_str(digits[:3] + '.' + digits[3:], 50000)
+    man, exp = x[1], x[2]
+    ctx = decimal.Context(prec=12000, rounding=decimal.ROUND_HALF_EVEN)
+    d = ctx.scaleb(Decimal(int(man * 5**-exp)), exp)
+    assert to_str(x, 12000) == str(d)
+    assert from_str(str(d), 50000) == from_str(to_str(x, 12000), 50000)
+
 def test_eval_repr_invariant():
     """Test that eval(repr(x)) == x"""
     random.seed(123)
@@ -289,3 +309,52 @@ def test_compatibility():
 
 def test_issue465():
     assert mpf(Fraction(1, 3)) == mpf('0.33333333333333331')
+
+def test_npconvert_array():
+    np = pytest.importorskip("numpy")
+    x = mp.npconvert(np.array([[1, 2], [3, -4]], dtype=np.int8))
+    assert x.dtype == object and x.shape == (2, 2)
+    assert x[1, 1] == -4 and type(x[1, 1]) is mpf
+    x = mp.npconvert(np.array([0.1, np.inf, 1+2j]))
+    assert x[0] == mpf(0.1) and x[1] == inf and x[2] == mpc(1, 2)
+    mp.prec = 20
+    assert mp.npconvert(np.array([0.1]))[0] == mpf(0.1)
+    mp.prec = 53
+    x = mp.npconvert(np.array(['0.1', 2, mpf(3)], dtype=object))
+    assert list(x) == [mpf('0.1'), 2, 3]
+    if hasattr(np, "float128"):
+        x = np.array([np.float128(1) / 3])
+        mp.prec = 64
+        assert mp.npconvert(x)[0] == mp.npconvert(x[0]) != float(x[0])
+    pytest.raises(TypeError, lambda: mp.npconvert(np.array(['a', 'b'])))
+
+def _sum_diff(x, y):
+    return x + y, x - y
+
+@pytest.mark.parametrize('workers', [None, 2])
+def test_vectorize(workers):
+    np = pytest.importorskip("numpy")
+    x = np.linspace(0.5, 5, 7)
+    f = mp.vectorize(mp.gamma, dps=30, workers=workers, chunksize=3)
+    y = f(x)
+    assert y.dtype == object and y.shape == (7,)
+    assert mp.prec == 53
+    mp.dps = 30
+    assert all(y[i] == mp.gamma(x[i]) for i in range(7))
+    mp.dps = 15
+    z = np.empty(7)
+    assert f(x, out=z, prec=53) is z
+    assert (z == [float(mp.gamma(t)) for t in x]).all()
+    f = mp.vectorize(_sum_diff, nout=2, workers=workers)
+    s, d = f(np.array([[1], [2]]), [0.5, 1.5, 2.5])
+    assert s.shape == d.shape == (2, 3)
+    assert s[1, 2] == 4.5 and d[0, 1] == -0.5
+    s, d = f(1, mpc(2, 1))
+    assert s == mpc(3, 1) and d == mpc(-1, -1)
+    mp.pretty = True
+    y = mp.vectorize(mp.sqrt, workers=workers, prec=200)(np.array([-4, 2]))
+    assert y[0] == mpc(0, 2) and y[1] == mp.sqrt(2, prec=200)
+    pytest.raises(ValueError, lambda: mp.vectorize(mp.exp, prec=10, dps=5))
+    pytest.raises(ValueError, lambda: mp.vectorize(mp.exp)([1, 2],
+                                                            out=np.empty(3)))
+    pytest.raises(ValueError, lambda: mp.vectorize(mp.exp)([1, 2], [1, 2, 3]))
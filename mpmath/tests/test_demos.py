@@ -138,3 +138,11 @@ def test_taylor():
     assert c.expect_exact('Enter the number of terms n (e.g. 10): ') == 0
     assert c.send('10\n') == 3
     assert c.expect_exact('[2.7182818011463827368, 2.7182818011463862895]') == 0
+
+
+def test_threads():
+    result = subprocess.run([f'{sys.executable}',
+                             'demo/threads.py', '4', '3', '20000'],
+                            capture_output=True, text=True)
+    assert result.returncode == 0
+    assert '4 threads:' in result.stdout
@@ -1,9 +1,10 @@
-from random import choice, randint, seed
+from random import choice, getrandbits, randint, seed
 
 from mpmath import mpf
-from mpmath.libmp import (from_int, from_str, mpf_div, mpf_mul, round_ceiling,
-                          round_down, round_floor, round_nearest, round_up)
-from mpmath.libmp.libintmath import trailing
+from mpmath.libmp import (from_int, from_man_exp, from_str, libintmath, libmpf,
+                          mpf_div, mpf_mul, round_ceiling, round_down,
+                          round_floor, round_nearest, round_up)
+from mpmath.libmp.libintmath import idivmod_python, trailing
 from mpmath.libmp.libmpf import mpf_rdiv_int
 
 
@@ -137,3 +138,27 @@ def test_mod():
 def test_div_negative_rnd_bug():
     assert (-3) / mpf('0.1531879017645047') == mpf('-19.583791966887116')
     assert mpf('-2.6342475750861301') / mpf('0.35126216427941814') == mpf('-7.4993775104985909')
+
+def test_newton_division(monkeypatch):
+    seed(1)
+    rnds = [round_floor, round_ceiling, round_down, round_up, round_nearest]
+    cases = []
+    for i in range(200):
+        a = getrandbits(randint(1, 4000))
+        b = getrandbits(randint(1, 2000)) | 1
+        if i % 3 == 0:
+            a = b*getrandbits(randint(1, 2000)) - (i % 2)
+        x = from_man_exp(a, randint(-10, 10))
+        y = from_man_exp(-b if i % 5 == 0 else b, randint(-10, 10))
+        cases.append((a, b, x, y, randint(1, 3000), choice(rnds)))
+    expected = [mpf_div(x, y, prec, rnd) for a, b, x, y, prec, rnd in cases]
+    expected_rdiv = [mpf_rdiv_int(a, y, prec, rnd)
+                     for a, b, x, y, prec, rnd in cases]
+    monkeypatch.setattr(libintmath, 'DIVISION_CUTOFF', 20)
+    monkeypatch.setattr(libintmath, 'RECIPROCAL_CUTOFF', 100)
+    monkeypatch.setattr(libmpf, 'DIVISION_CUTOFF', 20)
+    monkeypatch.setattr(libmpf, 'idivmod', idivmod_python)
+    for (a, b, x, y, prec, rnd), z, w in zip(cases, expected, expected_rdiv):
+        assert idivmod_python(a, b) == divmod(a, b)
+        assert mpf_div(x, y, prec, rnd) == z
+        assert mpf_rdiv_int(a, y, prec, rnd) == w
@@ -21,9 +21,11 @@
 
 """
 
+import math
+
 import pytest
 
-from mpmath import fp
+from mpmath import fp, mp
 
 
 def ae(x, y, tol=1e-12):
@@ -1820,3 +1822,64 @@ def test_issue_493():
     assert ae(fp.beta(1100, 1), 1/1100)
     assert ae(fp.binomial(5, 2), 10.0)
     pytest.raises(OverflowError, lambda: fp.binomial(1100, 550))
+
+@pytest.mark.parametrize('name', ['exp', 'log', 'sqrt', 'cos', 'sin', 'tan',
+                                  'atan', 'asin', 'acosh', 'cbrt', 'sinpi',
+                                  'cospi', 'gamma', 'rgamma', 'loggamma',
+                                  'erf', 'erfc', 'zeta'])
+def test_fp_numpy_arrays(name):
+    np = pytest.importorskip("numpy")
+    f = getattr(fp, name)
+    x = np.array([0.25, 0.5, 1.5, 2.0, 3.75, 12.5, 30.0])
+    if name in ('log', 'sqrt', 'asin', 'acosh', 'cbrt', 'gamma', 'rgamma',
+                'zeta'):
+        # Negative elements give complex results for some functions
+        x = np.concatenate([x, -x[:3]])
+    y = f(x)
+    assert isinstance(y, np.ndarray) and y.shape == x.shape
+    for xi, yi in zip(x, y):
+        assert ae(yi, f(float(xi)), 1e-13)
+    y = f(x.reshape(-1, 1))
+    assert y.shape == (len(x), 1)
+    # Arrays of one element are not converted to scalars
+    y = f(x[3:4])
+    assert isinstance(y, np.ndarray) and y.shape == (1,)
+    assert ae(y[0], f(float(x[3])), 1e-13)
+
+def test_fp_numpy_special():
+    np = pytest.importorskip("numpy")
+    x = np.array([[-30.5, -2.25, 0.0], [1e-5, 7.5, 125.0]])
+    for n in [0, 1, -3, 10]:
+        y = fp.besselj(n, x)
+        assert y.shape == x.shape and y.dtype == float
+        for xi, yi in zip(x.flat, y.flat):
+            assert abs(yi - mp.besselj(n, xi)) <= 1e-13*max(abs(yi), 1e-300)
+    x = np.linspace(-8.0, 8.0, 1601)
+    for f, g in [(fp.erf, math.erf), (fp.erfc, math.erfc)]:
+        y = f(x)
+        for xi, yi in zip(x, y):
+            assert ae(yi, g(xi), 1e-13)
+    assert (fp.erf(np.array([0.0, -np.inf, 40.0])) == [0.0, -1.0, 1.0]).all()
+    assert (fp.erfc(np.array([0.0, -np.inf, 40.0])) == [1.0, 2.0, 0.0]).all()
+    assert np.isnan(fp.erf(np.array([np.nan]))).all()
+    x = np.array([[-30.5, -2.25, 0.0], [1e-5, 7.5, 125.0]])
+    # Exact values, poles and complex arguments
+    assert (fp.gamma(np.array([1.0, 5.0, -1.0, 0.0])) ==
+            [1.0, 24.0, fp.inf, fp.inf]).all()
+    assert (fp.zeta(np.array([2.0, -2.0, 0.0])) ==
+            [fp.zeta(2), 0.0, -0.5]).all()
+    z = np.array([1+2j, -0.5+0.25j])
+    for f in [fp.gamma, fp.exp, fp.erf]:
+        y = f(z)
+        assert y.dtype == complex
+        assert ae(y[1], f(complex(z[1])))
+    # Functions without a vectorized version are evaluated elementwise
+    y = fp.besselk(1, x[1])
+    assert y.dtype == float and ae(y[1], fp.besselk(1, 7.5))
+    y = fp.besselj(0.5, x[0])
+    assert y.dtype == complex and ae(y[1], fp.besselj(0.5, -2.25))
+    y = fp.hyp2f1(1, 2, 3, np.array([0.25, 0.5]))
+    assert ae(y[0], fp.hyp2f1(1, 2, 3, 0.25))
+    assert ae(fp.power(np.array([-8.0, 4.0]), 0.5)[0], 2.8284271247461903j)
+    assert (fp.power(np.array([-8.0, 4.0]), 2) == [64.0, 16.0]).all()
+    pytest.raises(TypeError, lambda: fp.exp([1.0, 2.0]))
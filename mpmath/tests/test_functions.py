@@ -1,23 +1,24 @@
 import cmath
 import math
 import random
+from functools import partial
 
 import pytest
 
 from mpmath import (acos, acosh, acot, acoth, acsc, acsch, arange, arg, asec,
                     asech, asin, asinh, atan, atan2, atanh, catalan, cbrt,
-                    ceil, conj, cos, cos_sin, cosh, cospi, cospi_sinpi, cot,
-                    coth, csc, csch, cyclotomic, degree, degrees, e, eps,
-                    euler, exp, exp2, expj, expjpi, expm1, fabs, fadd, fib,
-                    fibonacci, floor, fmod, fp, frexp, glaisher, hypot, im,
-                    inf, isnan, j, khinchin, ldexp, linspace, ln, ln2, ln10,
-                    log, log1p, log2, log10, mertens, mp, mpc, mpf, nan,
-                    nthroot, phi, pi, power, powm1, radians, rand, re, root,
-                    sec, sech, sign, sin, sinc, sincpi, sinh, sinpi, sqrt, tan,
-                    tanh, twinprime, unitroots)
-from mpmath.libmp import (MPZ, ComplexResult, from_int, mpf_gt, mpf_lt,
-                          mpf_mul, mpf_pow_int, mpf_sqrt, round_ceiling,
-                          round_down, round_nearest, round_up)
+                    ceil, conj, cos, cos_sin, cos_sin_many, cosh, cospi,
+                    cospi_sinpi, cot, coth, csc, csch, cyclotomic, degree,
+                    degrees, e, eps, euler, exp, exp2, exp_many, expj, expjpi,
+                    expm1, fabs, fadd, fib, fibonacci, floor, fmod, fp, frexp,
+                    glaisher, hypot, im, inf, isnan, j, khinchin, ldexp,
+                    linspace, ln, ln2, ln10, log, log1p, log2, log10, log_many,
+                    mertens, mp, mpc, mpf, nan, nthroot, phi, pi, power, powm1,
+                    radians, rand, re, root, sec, sech, sign, sin, sinc,
+                    sincpi, sinh, sinpi, sqrt, tan, tanh, twinprime, unitroots)
+from mpmath.libmp import (MPZ, ComplexResult, from_int, gammazeta, libelefun,
+                          mpf_gt, mpf_lt, mpf_mul, mpf_pow_int, mpf_sqrt,
+                          round_ceiling, round_down, round_nearest, round_up)
 from mpmath.libmp.libmpf import mpf_rand
 
 
@@ -80,6 +81,41 @@ def test_constants():
     assert pi > 3
     assert pi < 4
 
+def test_constant_workers(monkeypatch):
+    monkeypatch.setattr(libelefun, 'BS_PARALLEL_PREC', 0)
+    monkeypatch.setattr(libelefun, 'BS_WORKERS', 1)
+    mp.set_constant_workers(3)
+    assert libelefun.BS_WORKERS == 3
+    pytest.raises(ValueError, lambda: mp.set_constant_workers(0))
+    cases = [(partial(libelefun.bs_chudnovsky, level=0, verbose=False),
+              libelefun.bs_chudnovsky_merge),
+             (libelefun.bspe, libelefun.bspe_merge),
+             (partial(libelefun.bsp_acot, MPZ(26), hyperbolic=True),
+              libelefun.bsp_acot_merge),
+             (gammazeta.bs_apery, gammazeta.bs_pqt_merge),
+             (gammazeta.bs_catalan, gammazeta.bs_pqt_merge)]
+    for bs, merge in cases:
+        for n in [5, 6, 100]:
+            assert libelefun.bs_parallel(bs, merge, 0, n, 100) == bs(0, n)
+
+def test_apery_high_precision():
+    # Reference value from the series 5/2*sum (-1)^(k+1)/(k^3*C(2k,k)),
+    # summed with enough guard bits that the rounding errors of the
+    # terms do not matter
+    for prec in [5000, 20000]:
+        wp = prec + 64
+        one = MPZ(1) << wp
+        s, c, k = 0, 1, 1
+        while 1:
+            c = c*2*(2*k-1)//k
+            t = one // (k**3*c)
+            if not t:
+                break
+            s += t if k % 2 else -t
+            k += 1
+        ref = (5*s) >> (wp - prec + 1)
+        assert abs(gammazeta.apery_fixed(prec) - ref) <= 1
+
 def test_exact_sqrts():
     for i in range(20000):
         assert sqrt(mpf(i*i)) == i
@@ -238,6 +274,29 @@ def test_log():
     assert log(mpc(-inf, -inf)) == log1p(mpc(-inf, -inf)) == mpc(inf, -3*pi/4)
 
 
+def test_many():
+    xs = [mpf(0), mpf(1), mpf(-2.5), mpf('1e-30'), mpf(1)/3, mpf(10)**5,
+          mpf('-1e10'), 2*pi, mpf(2)**-1000, mpf(7)**100, inf, -inf]
+    for prec in [20, 53, 100, 333, 1000]:
+        for rnd in [round_nearest, round_down, round_up, round_ceiling]:
+            kw = dict(prec=prec, rounding=rnd)
+            assert exp_many(xs, **kw) == [exp(x, **kw) for x in xs]
+            ys = [x for x in xs if x > 0]
+            assert log_many(ys, **kw) == [ln(x, **kw) for x in ys]
+            cs = cos_sin_many(xs[:-2], **kw)
+            assert cs == [cos_sin(x, **kw) for x in xs[:-2]]
+    assert exp_many([]) == log_many([]) == cos_sin_many([]) == []
+    assert isnan(exp_many([nan])[0]) and isnan(log_many([nan])[0])
+    assert exp_many([1, 2j], dps=30) == [exp(1, dps=30), exp(2j, dps=30)]
+    assert log_many([2, -1]) == [ln(2), ln(-1)]
+    mp.trap_complex = True
+    try:
+        pytest.raises(ComplexResult, lambda: log_many([2, -1]))
+    finally:
+        mp.trap_complex = False
+    pytest.raises(ValueError, lambda: exp_many([1], prec=10, dps=10))
+
+
 def test_trig_hyperb_basic():
     for x in (list(range(100)) + list(range(-100,0))):
         t = x / 4.1
@@ -1,5 +1,8 @@
+import marshal
+import os
 import platform
 import sys
+from fractions import Fraction
 
 import pytest
 
@@ -17,7 +20,7 @@
                     polylog, qp, quadts, shi, si, spherharm, spherical_in,
                     spherical_jn, spherical_kn, spherical_yn,  sqrt, struveh,
                     struvel, upper_gamma, whitm, whitw, zeta)
-from mpmath.libmp import BACKEND, NoConvergence
+from mpmath.libmp import BACKEND, NoConvergence, libhyper, libstore
 
 
 def test_bessel():
@@ -2551,3 +2554,197 @@ def test_issue_496():
 def test_issue_1142():
     assert spherical_jn(8, 5).ae(+spherical_jn(8, -5))
     assert spherical_jn(9, 5).ae(-spherical_jn(9, -5))
+
+def test_profile():
+    mp.dps = 15
+    with mp.profile() as p:
+        v = hyperu(2.5, 3.25, 20)
+    assert v == hyperu(2.5, 3.25, 20)
+    assert mp._profile is None
+    stats = p.stats['mpmath.functions.hypergeometric.hypercomb']
+    assert stats.calls == 1 and stats.precs == {53: 1}
+    assert stats.time > 0
+    stats = p.stats['mpmath.libmp.gammazeta.mpf_rgamma']
+    assert stats.calls == sum(stats.precs.values()) > 0
+    # The cancellation in the combination is detected and the
+    # precision is raised
+    e = p.escalations[-1]
+    assert e.source == 'hypercomb' and e.target == 53 and e.prec > 53
+    assert e.reason.startswith('cancellation of ')
+    assert max(stats.precs) >= e.prec
+    assert 'hypercomb: target 53, prec %i' % e.prec in p.report()
+    f = mp.autoprec(lambda x: mpf(1)/3 - x, maxprec=200)
+    with mp.profile() as p:
+        with pytest.raises(NoConvergence):
+            f(mpf(1)/3)
+    assert [(e.source, e.prec) for e in p.escalations] == [
+        ('autoprec', 200), ('autoprec', None)]
+    with mp.profile() as p:
+        with pytest.raises(NoConvergence):
+            hyp2f0(1, 1, 10, maxterms=20)
+    assert p.escalations[0] == ('hypsum', 53, None, 'maxterms')
+    assert all(e.source == 'hypsum' and e.reason == 'maxterms'
+               for e in p.escalations)
+    with mp.profile() as p:
+        with pytest.raises(ValueError):
+            hyp2f1(3, 4, 8, 0.999, maxprec=150)
+    assert any(e.source == 'hypsum' and e.reason == 'maxprec'
+               for e in p.escalations)
+    e = p.escalations[-1]
+    assert e.source == 'hypercomb' and e.reason == 'maxprec'
+    assert e.prec is None
+    with mp.profile() as p:
+        with mp.profile() as q:
+            v = zeta(3)
+        w = zeta(3.5)
+    assert mp._profile is None
+    # Nested blocks do not share the calls
+    assert q.stats['mpmath.functions.zeta.zeta'].calls == 1
+    assert p.stats['mpmath.functions.zeta.zeta'].calls == 1
+    assert 'mpmath.libmp.gammazeta.mpf_zeta_int' in q.stats
+    assert 'mpmath.libmp.gammazeta.mpf_zeta_int' not in p.stats
+
+
+def test_hyp_summator_store(tmp_path):
+    stats = libhyper.summator_stats
+    key = (2, 1, ('Q', 'Q', 'Q'), 'R')
+    expected = hyp2f1(0.25, 1.5, 2.5, 0.75)
+    assert stats['requests'][key] > 0
+    mp.set_cache_dir(tmp_path)
+    try:
+        for loaded in range(3):
+            mp.cache_clear('hyp_summators')
+            compiled = stats['compiled']
+            libhyper.prebuild_summators(maxp=2, maxq=1, types='Q')
+            assert stats['compiled'] == compiled + (12 if loaded == 0 else 0)
+            assert mp.cache_info()['hyp_summators'].entries == 12
+            assert hyp2f1(0.25, 1.5, 2.5, 0.75) == expected
+        files = os.listdir(tmp_path)
+        assert len(files) == 12 and all(f.startswith('hypsum-') for f in files)
+        # Invalid files are ignored
+        for f in files:
+            (tmp_path / f).write_bytes(b'')
+        mp.cache_clear('hyp_summators')
+        compiled = stats['compiled']
+        assert hyp2f1(0.25, 1.5, 2.5, 0.75) == expected
+        assert stats['compiled'] == compiled + 1
+        # So are files with a corrupt payload
+        for payload in [b'\xe3', marshal.dumps(1), b'\x00']:
+            for f in files:
+                libstore.write(f[:-6], 0, payload)
+            mp.cache_clear('hyp_summators')
+            compiled = stats['compiled']
+            assert hyp2f1(0.25, 1.5, 2.5, 0.75) == expected
+            assert stats['compiled'] == compiled + 1
+    finally:
+        mp.set_cache_dir(None)
+        mp.cache_clear('hyp_summators')
+
+
+def test_hyper_many():
+    mp.dps = 30
+    try:
+        zs = [0, 0.25, -0.5, -3, 2.5j, mpc(0.25, -0.75), 100, -50]
+        for f, args in [(hyp0f1, (2.5,)), (hyp1f1, (0.5, (3, 2))),
+                        (hyp1f1, (-3, 1.5)), (hyp1f1, (1, mpc(2, 1))),
+                        (hyp1f1, (0.5, mpf(-2.5) + 1e-10)),
+                        (hyp1f2, (1, 2, 3.5)), (hyp2f2, (1, 2, 3, 4.5)),
+                        (hyp2f3, (1, 2, 3, 4.5, 5))]:
+            values = f(*args, zs)
+            assert len(values) == len(zs)
+            for v, z in zip(values, zs):
+                w = f(*args, z)
+                assert type(v) is type(w)
+                assert v == w or abs(v - w) <= abs(w)*eps
+        zs = (0.5, -0.75, 0.5j, 2, 0.99)
+        values = hyp2f1(0.25, 1.5, mpc(2.5, 1), zs)
+        assert values == [hyp2f1(0.25, 1.5, mpc(2.5, 1), z) for z in zs]
+        zs = [0.5, 2j, -4, mpc(2, 3)]
+        values = hyper([1, (1, 3), 0.5], [4, 2.5, 3j, 5], zs)
+        assert values == [hyper([1, (1, 3), 0.5], [4, 2.5, 3j, 5], z)
+                          for z in zs]
+        requests = libhyper.summator_stats['requests']
+        assert requests[(1, 1, ('Q', 'Q'), 'R*')] > 0
+        assert requests[(1, 1, ('Q', 'Q'), 'C*')] > 0
+        # Poles
+        assert hyper([1, 2], [-3], [0.5, 0.25]) == [inf, inf]
+        pytest.raises(ZeroDivisionError, lambda: hyp1f1(1, -3, [0.5, 0.25]))
+        assert hyp1f1(-3, -5, [0.5]) == [hyp1f1(-3, -5, 0.5)]
+        assert hyp1f1(1, 2, []) == []
+        assert isnan(hyp1f1(1, 2, [nan])[0])
+        # Arguments for which the series fails use the same fallbacks
+        # as single evaluations
+        mp.dps = 15
+        zs = [0.999, 0.5, -0.99]
+        assert hyper([1, 1, 1], [2, 2], zs) == [hyper([1, 1, 1], [2, 2], z)
+                                                for z in zs]
+        zs = [0.5, 0.75]
+        assert hyper([1, 1, 1], [2, 2], zs, maxterms=20) == \
+            [hyper([1, 1, 1], [2, 2], z, maxterms=20) for z in zs]
+        assert fp.hyp1f1(0.5, 1.5, [0.5, -1]) == [fp.hyp1f1(0.5, 1.5, 0.5),
+                                                   fp.hyp1f1(0.5, 1.5, -1)]
+    finally:
+        mp.dps = 15
+
+
+def test_hypsum_rect(monkeypatch):
+    cutoff = libhyper.HYPSUM_RECT_CUTOFF
+    mp.prec = cutoff
+    try:
+        cases = [(hyp0f1, (3, -30)), (hyp0f1, ((1, 3), mpc(2, -5))),
+                 (hyp1f1, ((1, 3), (2, 3), 1.25)), (hyp1f1, (-20, 3, 7)),
+                 (hyp1f1, (-3, -5, 0.5)), (hyp2f1, ((1, 4), 2, 2.5, 0.75)),
+                 (hyp2f1, (-9, (1, 2), (5, 2), mpc(0.25, 0.5))),
+                 (hyper, ([], [], -10)), (hyp1f2, (1, -2.5, 3, 2.5))]
+        values = [f(*args) for f, args in cases]
+        monkeypatch.setattr(libhyper, 'HYPSUM_RECT_CUTOFF', inf)
+        for (f, args), v in zip(cases, values):
+            w = f(*args)
+            assert type(v) is type(w)
+            assert abs(v - w) <= abs(w)*eps
+        monkeypatch.setattr(libhyper, 'HYPSUM_RECT_CUTOFF', cutoff)
+        assert hyper([], [], -10).ae(exp(-10))
+        pytest.raises(ZeroDivisionError, lambda: hyp1f1(1, -3, 0.5))
+        # Parameters close to poles are handled by the usual summator
+        b = -3 + mpf(2)**-100
+        assert hyp1f1(1, b, 0.5).ae(hyp1f1(1, b, 0.5, maxprec=10**5))
+    finally:
+        mp.dps = 15
+
+
+def test_hypsum_bsplit(monkeypatch):
+    cutoff = libhyper.HYPSUM_BSPLIT_CUTOFF
+    mp.prec = cutoff
+    try:
+        cases = [(hyp0f1, (3, Fraction(-30, 7))), (hyp0f1, (3, -30)),
+                 (hyp1f1, ((1, 3), (2, 3), 1.25)),
+                 (hyp1f1, ((1, 3), (2, 3), Fraction(5, 3))),
+                 (hyp1f1, ((1, 3), (2, 3), mpc(5, -3)/4)),
+                 (hyp1f1, (-20, 3, 7)), (hyp1f1, (-3, -5, 0.5)),
+                 (hyp2f1, ((1, 2), (1, 2), 1, Fraction(1, 4))),
+                 (hyp2f1, ((1, 4), 2, 2.5, 0.75)),
+                 (hyper, ([1, 2], [(5, 2)], Fraction(-1, 3))),
+                 (erf, (0.75,)), (erf, (-5,)), (besselj, (0, 3)),
+                 (besselj, (5, mpf(-7)/8)), (besselj, (-3, 20))]
+        values = [f(*args) for f, args in cases]
+        monkeypatch.setattr(libhyper, 'HYPSUM_BSPLIT_CUTOFF', inf)
+        for (f, args), v in zip(cases, values):
+            w = f(*args[:-1], mpf(args[-1]) if isinstance(args[-1], Fraction)
+                  else args[-1])
+            assert type(v) is type(w)
+            assert abs(v - w) <= abs(w)*eps
+        monkeypatch.setattr(libhyper, 'HYPSUM_BSPLIT_CUTOFF', cutoff)
+        pytest.raises(ZeroDivisionError, lambda: hyp1f1(1, -3, 0.5))
+        # Exact rational arguments at low precision
+        mp.dps = 15
+        assert mp.hypsum(1, 1, ('Q', 'Z'), [Fraction(1, 3), 2],
+                         Fraction(1, 3)).ae(hyp1f1((1, 3), 2, mpf(1)/3))
+        assert hyp1f1((1, 3), 2, Fraction(1, 3)) == hyp1f1((1, 3), 2, mpf(1)/3)
+        # Other methods are used if the series converges too slowly
+        monkeypatch.setattr(libhyper, 'HYPSUM_BSPLIT_CUTOFF', 0)
+        assert hyper([1, 1, 1], [2, 2], Fraction(999, 1000)).ae(
+            hyper([1, 1, 1], [2, 2], mpf(999)/1000))
+        assert hyper([1, 1, 1], [2, 2], Fraction(3, 4), maxterms=20).ae(
+            hyper([1, 1, 1], [2, 2], 0.75))
+    finally:
+        mp.dps = 15
@@ -1,14 +1,20 @@
+import os
+import subprocess
+import sys
+
 import pytest
 
 from mpmath import (altzeta, apery, barnesg, bell, bernfrac, bernoulli,
-                    bernpoly, beta, binomial, catalan, digamma, e, euler,
-                    eulerpoly, fac, fac2, factorial, fadd, ff, findroot, fp,
-                    fraction, gamma, gammaprod, harmonic, hyperfac, inf, isnan,
-                    j, log, loggamma, mp, mpc, mpf, mpmathify, nan, pi,
-                    polyexp, polylog, primezeta, psi, rf, rgamma, sech,
-                    secondzeta, siegelz, sinc, sqrt, stieltjes, superfac, zeta)
-from mpmath.libmp import from_float, round_up
-from mpmath.libmp.gammazeta import mpf_zeta_int
+                    bernpoly, beta, binomial, cache_clear, cache_info, catalan,
+                    digamma, e, euler, eulerpoly, exp, fac, fac2, factorial,
+                    fadd, ff, findroot, fp, fraction, gamma, gammaprod,
+                    harmonic, hyperfac, inf, isnan, j, log, loggamma, mp, mpc,
+                    mpf, mpmathify, nan, pi, polyexp, polylog, primezeta, psi,
+                    rf, rgamma, sech, secondzeta, set_cache_budget,
+                    set_cache_dir, siegelz, sinc, sqrt, stieltjes, superfac,
+                    zeta)
+from mpmath.libmp import from_float, libstore, round_up
+from mpmath.libmp.gammazeta import bernoulli_saved, mpf_bernoulli, mpf_zeta_int
 
 
 def test_zeta_int_bug():
@@ -705,3 +711,89 @@ def test_issue_471():
 def test_issue_472():
     assert bernpoly(4, mpc(inf, 1e-50)) == mpc(inf, 0)
     assert mpc(inf, 2)**4 == mpc(inf, 0)
+
+def test_cache_budget():
+    cache_clear()
+    try:
+        for dps in [15, 100, 200]:
+            mp.dps = dps
+            gamma(mpf(1)/3)
+            exp(mpf(1)/3)
+        info = cache_info()
+        assert info['bernoulli_cache'].entries == 3
+        total = sum(x.nbytes for x in info.values())
+        assert total > 0
+        hits = sum(x.hits for x in info.values())
+        assert gamma(mpf(1)/3) == gamma(mpf(1)/3)
+        assert sum(x.hits for x in cache_info().values()) > hits
+        set_cache_budget(total // 2)
+        info = cache_info()
+        assert 0 < sum(x.nbytes for x in info.values()) <= total // 2
+        mp.dps = 300
+        assert (gamma(mpf(1)/3)*gamma(mpf(2)/3)).ae(2*pi/sqrt(3))
+        assert sum(x.nbytes for x in cache_info().values()) <= total // 2
+    finally:
+        set_cache_budget(None)
+        mp.dps = 15
+    cache_clear('bernoulli_cache')
+    assert cache_info()['bernoulli_cache'] == (0, 0, 0, 0)
+    cache_clear()
+    assert all(x == (0, 0, 0, 0) for x in cache_info().values())
+
+def test_bernoulli_cache_size():
+    # The table of Bernoulli numbers is extended in place, and only the
+    # size of the new numbers is added
+    from mpmath.libmp import libcache
+    from mpmath.libmp.gammazeta import bernoulli_cache
+    cache_clear('bernoulli_cache')
+    for n in range(0, 400, 2):
+        mpf_bernoulli(n, 200)
+    (key, value), = bernoulli_cache.items()
+    size = libcache.sizeof(key) + libcache.sizeof(value)
+    assert abs(bernoulli_cache.nbytes - size) < size // 50
+    assert bernoulli_cache.info().misses == 1
+    nbytes, total = bernoulli_cache.nbytes, libcache.total_bytes
+    bernoulli_cache.adjust_size(key, 100)
+    bernoulli_cache.adjust_size('spam', 100)
+    assert bernoulli_cache.nbytes == nbytes + 100
+    assert libcache.total_bytes == total + 100
+    cache_clear('bernoulli_cache')
+
+def test_cache_dir(tmp_path, monkeypatch):
+    # Constants saved by one process are loaded by the next one
+    code = ("from mpmath import mp; mp.dps = 4000; "
+            "print(mp.pi, mp.euler, mp.ln2)")
+    env = dict(os.environ, MPMATH_CACHE_DIR=str(tmp_path))
+    outs = [subprocess.run([sys.executable, '-c', code], env=env,
+                           capture_output=True, text=True).stdout
+            for _ in range(2)]
+    assert outs[0] == outs[1] != ''
+    mp.dps = 4000
+    try:
+        assert outs[0].split() == [str(mp.pi), str(mp.euler), str(mp.ln2)]
+    finally:
+        mp.dps = 15
+    names = sorted(f.split('-')[0] for f in os.listdir(tmp_path))
+    assert names == ['euler_fixed', 'ln2_fixed', 'pi_fixed']
+    # Tables of Bernoulli numbers
+    monkeypatch.setattr(libstore, 'STORE_MIN_PREC', 100)
+    expected = [mpf_bernoulli(n, 200) for n in range(0, 42, 2)]
+    set_cache_dir(tmp_path)
+    try:
+        cache_clear('bernoulli_cache')
+        bernoulli_saved.clear()
+        assert [mpf_bernoulli(n, 200) for n in range(0, 42, 2)] == expected
+        assert any(f.startswith('bernoulli-') for f in os.listdir(tmp_path))
+        cache_clear('bernoulli_cache')
+        assert mpf_bernoulli(40, 200) == expected[-1]
+        assert cache_info()['bernoulli_cache'].entries == 1
+        # Invalid files are ignored
+        for name in os.listdir(tmp_path):
+            with open(tmp_path / name, 'r+b') as f:
+                f.truncate(20)
+        cache_clear('bernoulli_cache')
+        assert mpf_bernoulli(40, 200) == expected[-1]
+    finally:
+        set_cache_dir(None)
+        cache_clear('bernoulli_cache')
+        bernoulli_saved.clear()
@@ -2,6 +2,9 @@
 Modules checks, in particular some hacks for Issue #657
 """
 
+import subprocess
+import sys
+
 from pytest import raises
 
 import mpmath
@@ -16,3 +19,38 @@ def test_erroneous_module_setting():
         mpmath.pretty = True
     with raises(AttributeError):
         mpmath.trap_complex = True
+
+
+def test_import_time_dependencies():
+    # Modules that are slow to import should not be loaded eagerly.
+    # Only those imported by mpmath itself count, not those imported by
+    # the backend library (gmpy2 imports importlib.metadata).
+    code = ("import importlib, os, sys\n"
+            "if 'MPMATH_NOGMPY' not in os.environ:\n"
+            "    for name in ['gmpy2', 'gmp']:\n"
+            "        try:\n"
+            "            importlib.import_module(name)\n"
+            "            break\n"
+            "        except ImportError:\n"
+            "            pass\n"
+            "before = set(sys.modules)\n"
+            "import mpmath\n"
+            "print(sorted({'inspect', 'tempfile', 'mmap', 'concurrent', "
+            "'multiprocessing', 'mpmath.identification', "
+            "'mpmath.visualization'} & (set(sys.modules) - before)))")
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                         text=True, check=True)
+    assert out.stdout == '[]\n'
+
+
+def test_lazy_attributes():
+    code = ("import sys, mpmath; "
+            "from mpmath import *; "
+            "assert identify is mpmath.identify; "
+            "assert mpmath.identify(0.75) == '(3/4)'; "
+            "assert mpmath.fp.identify(0.75) == '(3/4)'; "
+            "print(mpmath.mp.plot_ignore[-1].__name__, splot.__name__)")
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                         text=True, check=True)
+    assert out.stdout == 'NoConvergence splot\n'
+    raises(AttributeError, lambda: mpmath.spam)
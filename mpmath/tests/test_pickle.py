@@ -1,12 +1,132 @@
+import functools
+import io
+import os
 import pickle
+import time
 
 import pytest
 
-from mpmath import matrix, mpc, mpf, mpi, sin
+from mpmath import (dump, dumps, inf, iterload, load, loads, matrix, mp, mpc,
+                    mpf, mpi, sin, vector)
 
 
 @pytest.mark.parametrize('protocol', range(pickle.HIGHEST_PROTOCOL + 1))
 @pytest.mark.parametrize('obj', [mpf('0.5'), mpc('0.5','0.2'), mpi(10, 30),
-                                 matrix([1, sin(1)]), matrix([[1, 2], [3, 4]])])
+                                 matrix([1, sin(1)]), matrix([[1, 2], [3, 4]]),
+                                 vector([1, sin(1), inf])])
 def test_pickle(obj, protocol):
     assert obj == pickle.loads(pickle.dumps(obj, protocol))
+
+
+@pytest.mark.parametrize('obj', [mpf('0.5'), mpc('0.5','0.2'), mpf(-inf),
+                                 mpf('nan'), mpc(0, inf), mpf('1e-100000000000'),
+                                 matrix([1, sin(1)]), matrix([[1, 2j], [0, 4]]),
+                                 vector([1, -sin(1), inf, 0])])
+def test_dumps(obj):
+    x = loads(dumps(obj))
+    assert type(x) is type(obj)
+    assert repr(x) == repr(obj)
+
+
+def test_dumps_list():
+    mp.prec = 200
+    try:
+        xs = [mpf(k)**-k for k in range(1, 50)] + [0, -2**1000]
+        s = dumps(xs)
+    finally:
+        mp.prec = 53
+    ys = loads(s)
+    assert [y._mpf_ for y in ys] == [mpf(x, prec=200)._mpf_ for x in xs]
+    assert len(s) < len(pickle.dumps(ys))
+    xs = [1, 2j, [matrix(2), (mpf(3),)], 'x']
+    pytest.raises(TypeError, lambda: dumps(xs))
+    xs.pop()
+    assert loads(dumps(xs)) == [1, 2j, [matrix(2), [3]]]
+    s = dumps(xs)
+    pytest.raises(ValueError, lambda: loads(s[:-1]))
+    pytest.raises(ValueError, lambda: loads(s + b'\0'))
+    pytest.raises(ValueError, lambda: loads(b'abc'))
+
+
+def test_dump_stream():
+    f = io.BytesIO()
+    for k in range(10):
+        dump(mpf(k)/3, f)
+    dump(matrix([[1, 2]]), f)
+    f.seek(0)
+    xs = list(iterload(f))
+    assert xs[:-1] == [mpf(k)/3 for k in range(10)]
+    assert xs[-1] == matrix([[1, 2]])
+    f.seek(0)
+    assert load(f) == 0
+    f = io.BytesIO(dumps(1)[:-1])
+    pytest.raises(ValueError, lambda: load(f))
+    pytest.raises(EOFError, lambda: load(io.BytesIO()))
+
+
+def _norm_and_arg(z):
+    return {'norm': abs(z), 'arg': mp.arg(z), 'tag': 'z'}
+
+def _settings(x):
+    return mp.prec, mp.rounding, mp.pretty, repr(x)
+
+def _fail_at_three(n):
+    if n == 3:
+        raise ZeroDivisionError
+    return mpf(n)
+
+def _fail_at_three_first(path, n):
+    # The first item is finished only after the failure.
+    if n == 3:
+        open(path, 'w').close()
+        raise ZeroDivisionError
+    if n == 0:
+        deadline = time.monotonic() + 30
+        while not os.path.exists(path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+    return mpf(n)
+
+
+def test_pack():
+    from mpmath.usertools import _pack, _unpack
+    mp.prec = 300
+    obj = [(mpf(1)/3, 'a'), {'x': mpc(2, mp.pi)}, matrix([[1, 2], [3, 4]])]
+    data = _pack(mp, obj)
+    mp.prec = 53
+    x = _unpack(mp, data)
+    mp.prec = 300
+    assert x[0] == (mpf(1)/3, 'a') and x[1]['x'] == mpc(2, mp.pi)
+    assert x[2] == matrix([[1, 2], [3, 4]])
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_parallel_map(workers, tmp_path):
+    mp.dps = 30
+    xs = [mpc(k, 1) for k in range(10)]
+    ys = mp.parallel_map(_norm_and_arg, xs, workers=workers, chunksize=3)
+    assert ys == [_norm_and_arg(z) for z in xs]
+    assert mp.parallel_map(mp.zeta, [3, 4], workers=workers) == [mp.zeta(3),
+                                                                 mp.zeta(4)]
+    mp.dps = 15
+    mp.pretty = True
+    mp.rounding = 'u'
+    ys = mp.parallel_map(mp.exp, iter(range(7)), workers=workers, stream=True)
+    assert not isinstance(ys, list)
+    assert list(ys) == [mp.exp(k) for k in range(7)]
+    ys = mp.parallel_map(_settings, [mpf(1)/3], workers=workers, stream=True)
+    mp.prec = 100
+    assert list(ys) == [(53, 'u', True, '0.333333333333333')]
+    mp.prec = 53
+    mp.pretty = False
+    mp.rounding = 'n'
+    ys = mp.parallel_map(mp.sqrt, range(9), workers=workers, stream=True,
+                         ordered=False, chunksize=2)
+    assert sorted(ys) == [(k, mp.sqrt(k)) for k in range(9)]
+    f = _fail_at_three
+    if workers > 1:
+        f = functools.partial(_fail_at_three_first, str(tmp_path / 'failed'))
+    ys = mp.parallel_map(f, range(6), workers=workers, stream=True,
+                         chunksize=1)
+    assert next(ys) == 0
+    pytest.raises(ZeroDivisionError, lambda: list(ys))
+    pytest.raises(ValueError, lambda: mp.parallel_map(mp.exp, [1], workers=0))
@@ -1,7 +1,9 @@
+import os
+
 import pytest
 
-from mpmath import (airyai, airyaizero, atan, cos, cosh, e, euler, exp, inf, j,
-                    log, mp, pi, quad, quadgl, quadosc, quadts, sign, sin,
+from mpmath import (airyai, airyaizero, atan, cos, cosh, e, euler, exp, fp, inf,
+                    j, log, mp, pi, quad, quadgl, quadosc, quadts, sign, sin,
                     sinh, sqrt, tan)
 
 
@@ -89,6 +91,155 @@ def test_expmath_integrals():
         assert ae(quadts(lambda x: x**2/sqrt(exp(x)-1), [0, inf]),          4*pi*(log(2)**2 + pi**2/12))
         assert ae(quadts(lambda x: x*exp(-x)*sqrt(1-exp(-2*x)), [0, inf]),  pi*(1+2*log(2))/8)
 
+def _gauss2(x, y):
+    return exp(-x*x - y*y)
+
+def _fp_gauss2(x, y):
+    return fp.exp(-x*x - y*y)
+
+def _rational2(x, y):
+    return 1/(1 + x*y)
+
+@pytest.mark.parametrize('method', ['tanh-sinh', 'gauss-legendre'])
+def test_quad_executor(method):
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    calls = []
+    def f(x):
+        calls.append(x)
+        return fp.exp(-x) * fp.sin(x)
+    serial = fp.quad(f, [0, 1, inf], method=method, error=True)
+    n = len(calls)
+    with ThreadPoolExecutor(3) as pool:
+        assert fp.quad(f, [0, 1, inf], method=method, error=True,
+                       executor=pool) == serial
+        assert len(calls) == 2*n
+        # Threads would share the working precision of mp
+        pytest.raises(ValueError, lambda: quad(exp, [0, 1], executor=pool))
+        pytest.raises(ValueError, lambda: quad(exp, [0, 1], workers=2,
+                                               executor=pool))
+    mp.dps = 30
+    v = quad(_gauss2, [-inf, inf], [0, 1], method=method, maxdegree=4)
+    with ProcessPoolExecutor(2) as pool:
+        assert quad(_gauss2, [-inf, inf], [0, 1], method=method,
+                    maxdegree=4, executor=pool) == v
+    mp.dps = 15
+    v = quad(_gauss2, [0, 1], [0, 2], method=method)
+    assert quad(_gauss2, [0, 1], [0, 2], method=method, workers=2) == v
+    assert quad(exp, [0, 1], workers=2) == quad(exp, [0, 1])
+    # The inner integrals are computed in the context of the outer one
+    v = fp.quad(_fp_gauss2, [0, 1], [0, 2], method=method)
+    assert fp.quad(_fp_gauss2, [0, 1], [0, 2], method=method,
+                   workers=2) == v
+    ctx = mp.clone()
+    ctx.prec = 100
+    v = ctx.quad(_rational2, [0, 1], [0, 2], method=method)
+    assert ctx.quad(_rational2, [0, 1], [0, 2], method=method,
+                    workers=2) == v
+
+@pytest.mark.parametrize('method', ['tanh-sinh', 'gauss-legendre'])
+def test_node_store(method, tmp_path, monkeypatch):
+    from mpmath.calculus import quadrature
+    from mpmath.libmp import libstore
+    monkeypatch.setattr(quadrature, 'NODE_STORE_MIN_PREC', 200)
+    rule = {'tanh-sinh': mp._tanh_sinh,
+            'gauss-legendre': mp._gauss_legendre}[method]
+    mp.prec = 300
+    f = lambda x: exp(-x*x)
+    rule.clear()
+    v = quad(f, [0, 2], method=method, maxdegree=4)
+    mp.set_cache_dir(tmp_path)
+    try:
+        rule.clear()
+        assert quad(f, [0, 2], method=method, maxdegree=4) == v
+        names = sorted(os.listdir(tmp_path))
+        assert names == ['quad-%s-%i-300.bin' % (method, d)
+                         for d in range(1, 5)]
+        # The nodes are now loaded from the store
+        rule.clear()
+        def fail(*args):
+            raise AssertionError
+        monkeypatch.setattr(rule, 'calc_nodes', fail)
+        assert quad(f, [0, 2], method=method, maxdegree=4) == v
+        monkeypatch.undo()
+        monkeypatch.setattr(quadrature, 'NODE_STORE_MIN_PREC', 200)
+        built = list(quadrature.prebuild_nodes([300, 400], [method],
+                                               maxdegree=5))
+        assert sorted(b[:3] for b in built) == sorted(
+            [(method, 5, 300)] + [(method, d, 400) for d in range(1, 6)])
+        assert len(os.listdir(tmp_path)) == 10
+        pytest.raises(ValueError, lambda: list(
+            quadrature.prebuild_nodes([100], [method])))
+    finally:
+        mp.set_cache_dir(None)
+        rule.clear()
+    libstore.set_store(None)
+    pytest.raises(ValueError, lambda: list(
+        quadrature.prebuild_nodes([300], [method])))
+
+def test_quad_node_cache(monkeypatch):
+    from mpmath.calculus import quadrature
+    from mpmath.libmp import libcache
+    monkeypatch.setattr(quadrature, 'TRANSFORMED_NODES_MAX', 10)
+    mp.dps = 30
+    f = lambda x: exp(-x)
+    mp.cache_clear('quad_nodes_cache')
+    mp.cache_clear('quad_transformed_cache')
+    assert ae(quad(f, [0, 1]), 1-exp(-1))
+    info = mp.cache_info()['quad_nodes_cache']
+    assert info.hits == 0
+    assert info.misses == info.entries > 0
+    assert info.nbytes > 0
+    # Only the nodes for [-1, 1] are cached
+    for k in range(1, 20):
+        assert ae(quad(f, [k, k+1]), exp(-k)-exp(-k-1))
+    new = mp.cache_info()['quad_nodes_cache']
+    assert new.entries == info.entries
+    assert new.nbytes == info.nbytes
+    assert new.hits >= 19*info.entries
+    # The transformed nodes of the last intervals are kept
+    assert mp.cache_info()['quad_transformed_cache'].entries == 10
+    assert ae(quad(f, [0, inf]), 1)
+    info = mp.cache_info()['quad_nodes_cache']
+    transformed = mp.cache_info()['quad_transformed_cache']
+    assert ae(quad(f, [0, inf]), 1)
+    assert mp.cache_info()['quad_nodes_cache'] == info
+    assert mp.cache_info()['quad_transformed_cache'].hits > transformed.hits
+    with pytest.deprecated_call():
+        nodes = mp._tanh_sinh.transformed_cache
+    assert (-1, 1, 1, mp.prec) in nodes
+    assert (0, inf, 1, mp.prec) in nodes
+    # Clearing one rule keeps the nodes of the other
+    assert ae(quadgl(f, [0, 1]), 1-exp(-1))
+    assert mp.cache_info()['quad_nodes_cache'].entries > info.entries
+    mp._gauss_legendre.clear()
+    assert mp.cache_info()['quad_nodes_cache'].entries == info.entries
+    old = libcache.budget
+    try:
+        mp.cache_clear()
+        mp.set_cache_budget(200000)
+        for dps in [15, 30, 45, 60]:
+            mp.dps = dps
+            assert ae(quad(f, [0, 1]), 1-exp(-1))
+            assert libcache.total_bytes <= 200000
+    finally:
+        mp.set_cache_budget(old)
+        mp.dps = 15
+
+@pytest.mark.parametrize('n', [1, 2, 5, 6, 31, 96, 200])
+@pytest.mark.parametrize('dps', [15, 100, 400])
+def test_legendre_nodes(n, dps):
+    mp.dps = dps + 10
+    nodes = mp._gauss_legendre.legendre_nodes(n, mp.prec - 30)
+    assert len(nodes) == n
+    tol = mp.mpf(10)**(-dps)
+    for x, w in nodes[:4] + nodes[-4:]:
+        p, dp = mp.legendre(n, x), mp.diff(lambda t: mp.legendre(n, t), x)
+        y = x - p/dp
+        assert abs(x-y) < tol
+        assert abs(w - 2/((1-y**2)*dp**2)) < tol
+    assert abs(mp.fsum(w for x, w in nodes) - 2) < tol
+    mp.dps = 15
+
 # Do not reach full accuracy
 @pytest.mark.xfail
 def test_expmath_fail():
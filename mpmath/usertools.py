@@ -1,3 +1,10 @@
+import io
+import pickle
+import sys
+from collections import namedtuple
+from itertools import islice
+from timeit import default_timer as clock
+
 
 def monitor(f, input='print', output='print'):
     """
@@ -93,3 +100,421 @@ def timing(f, *args, **kwargs):
         t2=clock()
         t=min(t,(t2-t1)/10)
     return t
+
+
+Escalation = namedtuple('Escalation', 'source target prec reason')
+
+
+class FunctionStats:
+    """
+    Statistics for one function recorded by :class:`Profile`: the number
+    of *calls*, the cumulative *time* in seconds (including the time
+    spent in functions it calls) and *precs*, a dict mapping each
+    working precision in bits to the number of calls made with it.
+    """
+    __slots__ = ('calls', 'time', 'precs', '_active', '_start')
+
+    def __init__(self):
+        self.calls = 0
+        self.time = 0.0
+        self.precs = {}
+        self._active = 0
+        self._start = 0.0
+
+    def __repr__(self):
+        return "<FunctionStats: %i calls, %.6f s>" % (self.calls, self.time)
+
+
+class Profile:
+    """
+    Profiling data collected while a :func:`~mpmath.profile` block is
+    active.
+
+    *stats* maps the qualified name of every function of mpmath that
+    was called to its :class:`FunctionStats`, and *escalations* is the
+    list of precision increases made by retry loops, as named tuples
+    ``(source, target, prec, reason)``.
+    """
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+        self.stats = {}
+        self.escalations = []
+        self._codes = {}
+        self._stack = []
+        self._saved = None
+
+    def __enter__(self):
+        self._saved = self.ctx._profile, sys.getprofile()
+        self.ctx._profile = self
+        sys.setprofile(self._hook)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        ctx_profile, sys_profile = self._saved
+        sys.setprofile(sys_profile)
+        self.ctx._profile = ctx_profile
+        t = clock()
+        while self._stack:
+            self._leave(self._stack.pop()[1], t)
+
+    def escalate(self, source, target, prec, reason):
+        """Record that *source* retries with working precision *prec*
+        to reach the precision *target*, or gives up if *prec* is None."""
+        self.escalations.append(Escalation(source, target, prec, reason))
+
+    def _entry(self, frame):
+        code = frame.f_code
+        module = frame.f_globals.get('__name__', '')
+        if not module.startswith('mpmath.') or module == __name__:
+            return None
+        # Comprehensions are accounted to the enclosing function
+        if code.co_name in ('<listcomp>', '<dictcomp>', '<setcomp>',
+                            '<genexpr>'):
+            return None
+        name = module + '.' + getattr(code, 'co_qualname', code.co_name)
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = FunctionStats()
+        args = code.co_varnames[:code.co_argcount + code.co_kwonlyargcount]
+        if 'prec' in args:
+            kind = 'prec'
+        elif args[:1] == ('ctx',):
+            kind = 'ctx'
+        else:
+            kind = None
+        return stats, kind
+
+    def _hook(self, frame, event, arg):
+        if event == 'call':
+            code = frame.f_code
+            try:
+                entry = self._codes[code]
+            except KeyError:
+                entry = self._codes[code] = self._entry(frame)
+            if entry is None:
+                return
+            stats, kind = entry
+            stats.calls += 1
+            if not stats._active:
+                stats._start = clock()
+            stats._active += 1
+            if kind is not None:
+                try:
+                    if kind == 'prec':
+                        prec = frame.f_locals['prec']
+                    else:
+                        prec = frame.f_locals['ctx'].prec
+                except (KeyError, AttributeError):
+                    prec = None
+                if type(prec) is int:
+                    stats.precs[prec] = stats.precs.get(prec, 0) + 1
+            self._stack.append((frame, stats))
+        elif event == 'return':
+            stack = self._stack
+            if stack and stack[-1][0] is frame:
+                self._leave(stack.pop()[1], clock())
+
+    def _leave(self, stats, t):
+        stats._active -= 1
+        if not stats._active:
+            stats.time += t - stats._start
+
+    def report(self, limit=20):
+        """
+        Return a table of the *limit* functions with the largest
+        cumulative time (all of them with ``limit=None``), followed by
+        the logged precision escalations.
+        """
+        items = sorted(self.stats.items(), key=lambda x: -x[1].time)
+        if limit is not None:
+            items = items[:limit]
+        lines = ["%10s %12s  %-28s %s" % ("calls", "time", "precisions",
+                                          "function")]
+        for name, stats in items:
+            precs = sorted(stats.precs.items(), key=lambda x: -x[1])
+            hist = " ".join("%i:%i" % x for x in precs[:3])
+            if len(precs) > 3:
+                hist += " ..."
+            lines.append("%10i %12.6f  %-28s %s" % (stats.calls, stats.time,
+                                                    hist, name))
+        if self.escalations:
+            lines.append("")
+            lines.append("precision escalations:")
+            for e in self.escalations:
+                prec = "gave up" if e.prec is None else "prec %i" % e.prec
+                lines.append("  %s: target %i, %s (%s)" % (e.source, e.target,
+                                                          prec, e.reason))
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.report()
+
+
+# Evaluation in worker processes.  Functions are sent to the workers by
+# pickling, except for the functions of the context, which are closures
+# and are sent by name.  Numbers are sent in the format of dumps().
+
+_STATE_ATTRS = ('prec', 'rounding', 'trap_complex', 'pretty', 'pretty_dps')
+
+
+def _context_state(ctx):
+    return {name: getattr(ctx, name) for name in _STATE_ATTRS}
+
+
+def _set_context_state(ctx, state):
+    for name, value in state.items():
+        setattr(ctx, name, value)
+
+
+class _ContextFunction:
+    """
+    Picklable reference to the function *name* of the ``mp`` context.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __call__(self, *args, **kwargs):
+        from mpmath import mp
+        return getattr(mp, self.name)(*args, **kwargs)
+
+
+def _portable(ctx, f):
+    name = getattr(f, '__name__', None)
+    if name and getattr(ctx, name, None) == f:
+        return _ContextFunction(name)
+    return f
+
+
+class _Pickler(pickle.Pickler):
+    # Takes the numbers out of the pickled objects; they are stored
+    # separately with dumps().
+
+    def __init__(self, file, types):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.types = types
+        self.numbers = []
+
+    def persistent_id(self, x):
+        if type(x) in self.types:
+            self.numbers.append(x)
+            return len(self.numbers) - 1
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+
+    def __init__(self, file, numbers):
+        super().__init__(file)
+        self.numbers = numbers
+
+    def persistent_load(self, pid):
+        return self.numbers[pid]
+
+
+def _pack(ctx, obj):
+    file = io.BytesIO()
+    pickler = _Pickler(file, ctx.types)
+    pickler.dump(obj)
+    return file.getvalue(), ctx.dumps(pickler.numbers)
+
+
+def _unpack(ctx, data):
+    obj, numbers = data
+    return _Unpickler(io.BytesIO(obj), ctx.loads(numbers)).load()
+
+
+def _map_chunk(state, f, data):
+    from mpmath import mp
+    _set_context_state(mp, state)
+    return _pack(mp, [f(x) for x in _unpack(mp, data)])
+
+
+def _parallel_map(ctx, f, iterable, workers, chunksize, ordered):
+    # The settings are read at the time of the call, not when the
+    # results are first requested.
+    state = _context_state(ctx)
+    if workers == 1:
+        results = _serial_map_gen(ctx, state, f, iterable)
+        return results if ordered else enumerate(results)
+    return _parallel_map_gen(ctx, state, _portable(ctx, f), iter(iterable),
+                             workers, chunksize, ordered)
+
+
+def _serial_map_gen(ctx, state, f, items):
+    for x in items:
+        saved = _context_state(ctx)
+        _set_context_state(ctx, state)
+        try:
+            y = f(x)
+        finally:
+            _set_context_state(ctx, saved)
+        yield y
+
+
+def _parallel_map_gen(ctx, state, f, items, workers, chunksize, ordered):
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    pool = ProcessPoolExecutor(workers)
+    pending = {}
+    finished = {}
+    start = 0
+    position = 0
+    try:
+        while True:
+            # Keep two chunks per worker in flight, so that the
+            # iterable is not consumed all at once.
+            while len(pending) < 2*workers:
+                chunk = list(islice(items, chunksize))
+                if not chunk:
+                    break
+                future = pool.submit(_map_chunk, state, f, _pack(ctx, chunk))
+                pending[future] = start
+                start += len(chunk)
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                first = pending.pop(future)
+                if ordered:
+                    # An exception is only raised once the results
+                    # before it have been yielded.
+                    finished[first] = future
+                else:
+                    for k, y in enumerate(_unpack(ctx, future.result())):
+                        yield first + k, y
+            while position in finished:
+                results = _unpack(ctx, finished.pop(position).result())
+                yield from results
+                position += len(results)
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def _executor_map(ctx, executor, f, xs):
+    # Returns [f(x) for x in xs], computed with a concurrent.futures
+    # executor.  Processes are sent the settings of the context with
+    # each chunk, as in parallel_map().  Threads would share the
+    # context, whose precision mpmath's functions change while they
+    # run, so they are only allowed with a fixed precision.
+    from concurrent.futures import ProcessPoolExecutor
+    if not isinstance(executor, ProcessPoolExecutor):
+        if not ctx._fixed_precision:
+            raise ValueError("the executor must be a ProcessPoolExecutor, "
+                             "as threads would share the precision")
+        return list(executor.map(f, xs))
+    workers = getattr(executor, '_max_workers', None) or 1
+    chunksize = -(-len(xs) // (4*workers)) or 1
+    if not hasattr(ctx, 'dumps'):
+        return list(executor.map(f, xs, chunksize=chunksize))
+    state = _context_state(ctx)
+    f = _portable(ctx, f)
+    futures = [executor.submit(_map_chunk, state, f,
+                               _pack(ctx, xs[i:i+chunksize]))
+               for i in range(0, len(xs), chunksize)]
+    return [y for future in futures for y in _unpack(ctx, future.result())]
+
+
+def _vectorized_chunk(state, f, nout, data):
+    from mpmath import mp
+    _set_context_state(mp, state)
+    results = [f(*args) for args in zip(*mp.loads(data))]
+    if nout > 1:
+        results = [list(r) for r in zip(*results)]
+    return mp.dumps(results)
+
+
+class Vectorized:
+    """
+    Callable returned by :func:`~mpmath.vectorize`.
+    """
+
+    def __init__(self, ctx, f, nout, prec, dps, workers, chunksize):
+        if prec is not None and dps is not None:
+            raise ValueError("prec and dps can't be specified together")
+        if nout < 1:
+            raise ValueError("nout must be positive")
+        self.ctx = ctx
+        self.f = f
+        self.nout = nout
+        self.prec = prec
+        self.dps = dps
+        self.workers = workers
+        self.chunksize = chunksize
+        self.__name__ = getattr(f, '__name__', 'vectorized')
+        self.__doc__ = getattr(f, '__doc__', None)
+
+    def __repr__(self):
+        return "<vectorized %s>" % self.__name__
+
+    def __call__(self, *args, out=None, prec=None, dps=None):
+        import numpy as np
+        ctx = self.ctx
+        if prec is None and dps is None:
+            prec, dps = self.prec, self.dps
+        elif prec is not None and dps is not None:
+            raise ValueError("prec and dps can't be specified together")
+        if dps is not None:
+            manager = ctx.workdps(dps)
+        else:
+            manager = ctx.workprec(ctx.prec if prec is None else prec)
+        with manager:
+            args = [ctx._npconvert_array(np.asarray(a)) for a in args]
+            shape = np.broadcast_shapes(*[a.shape for a in args])
+            columns = [np.broadcast_to(a, shape).ravel().tolist()
+                       for a in args]
+            results = self._evaluate(columns, int(np.prod(shape)))
+        nout = self.nout
+        if nout == 1:
+            results = [results]
+            if out is not None:
+                out = (out,)
+        elif out is None:
+            out = (None,) * nout
+        elif len(out) != nout:
+            raise ValueError("out must be a tuple of %i arrays" % nout)
+        arrays = []
+        for values, array in zip(results, out or (None,) * nout):
+            a = np.empty(len(values), dtype=object)
+            a[:] = values
+            a = a.reshape(shape)
+            if array is not None:
+                if array.shape != shape:
+                    raise ValueError("out has shape %s, expected %s" %
+                                     (array.shape, shape))
+                array[...] = a
+                a = array
+            elif not shape:
+                a = a[()]
+            arrays.append(a)
+        if nout == 1:
+            return arrays[0]
+        return tuple(arrays)
+
+    def _evaluate(self, columns, size):
+        # Returns a list of results, or nout lists if nout > 1
+        f = self.f
+        nout = self.nout
+        workers = self.workers
+        if not workers or workers < 2 or size < 2:
+            results = [f(*args) for args in zip(*columns)]
+            if nout > 1:
+                results = [list(r) for r in zip(*results)]
+                if not results:
+                    results = [[] for _ in range(nout)]
+            return results
+        from concurrent.futures import ProcessPoolExecutor
+        ctx = self.ctx
+        chunksize = self.chunksize or -(-size // (4*workers))
+        state = _context_state(ctx)
+        f = _portable(ctx, f)
+        chunks = [ctx.dumps([c[i:i+chunksize] for c in columns])
+                  for i in range(0, size, chunksize)]
+        with ProcessPoolExecutor(min(workers, len(chunks))) as pool:
+            parts = list(pool.map(_vectorized_chunk, [state]*len(chunks),
+                                  [f]*len(chunks), [nout]*len(chunks),
+                                  chunks))
+        parts = [ctx.loads(p) for p in parts]
+        if nout == 1:
+            return [x for p in parts for x in p]
+        return [[x for p in parts for x in p[k]] for k in range(nout)]